@@ -0,0 +1,191 @@
+"""Buffered, transaction-aware audit log writer.
+
+``record`` never inserts on its own when a unit of work is active: entries
+are collected and written with a single ``bulk_create`` when the unit ends.
+A unit is a request (``AuditMiddleware``) or an explicit ``batch()`` block,
+e.g. one scan command batch.
+
+Model changes are stored as field-level diffs (see ``encode_changes``):
+``after_json`` holds only the fields a save changed, keyed by attname, and
+``before_json`` their previous values. Folding the ``after_json`` of an
+entity's entries in order, from its latest ``AuditSnapshot`` on, rebuilds its
+state at any point (``entity_state``).
+
+Entries recorded inside a transaction are only collected once it commits
+(``transaction.on_commit``), so work that rolls back, including a rolled-back
+savepoint, leaves no audit trail. A ``batch()`` opened inside a transaction
+collects directly and flushes inside that same transaction instead.
+A ``batch()`` opened outside a transaction, such as a request, only ever
+holds entries for committed work. It writes them even when the block raises.
+"""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.db.models.fields.files import FieldFile
+
+from .models import AuditLog, AuditSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Replaying this many entries in one reconstruction stores a snapshot.
+SNAPSHOT_INTERVAL = 50
+
+_current_unit = ContextVar("audit_unit", default=None)
+_encoder = DjangoJSONEncoder()
+
+
+class AuditUnit:
+    """Entries collected for one unit of work."""
+
+    def __init__(self, ip_address=None, in_atomic=False):
+        self.ip_address = ip_address
+        self.in_atomic = in_atomic
+        self.entries = []
+
+    def add(self, entry):
+        if entry.ip_address is None:
+            entry.ip_address = self.ip_address
+        self.entries.append(entry)
+
+    def flush(self):
+        entries, self.entries = self.entries, []
+        _write(entries)
+
+
+def _write(entries):
+    # AuditLog requires a tenant; entries for legacy rows without one are dropped.
+    valid = [entry for entry in entries if entry.tenant_id]
+    if len(valid) < len(entries):
+        logger.warning("Dropped %d audit entries without a tenant.", len(entries) - len(valid))
+    if valid:
+        AuditLog.objects.bulk_create(valid)
+
+
+def _collect(entry):
+    unit = _current_unit.get()
+    if unit is None:
+        _write([entry])
+    else:
+        unit.add(entry)
+
+
+@contextmanager
+def batch(ip_address=None):
+    """Collect audit entries recorded in the block and write them in one INSERT.
+
+    Nested blocks join the outermost one. Inside a transaction nothing is
+    written if the block raises, as the audited work rolls back with it.
+    Outside one, every collected entry belongs to work that has already
+    committed. Those entries are written even if the block raises, and a
+    failure to write them is logged rather than raised.
+    """
+    unit = _current_unit.get()
+    if unit is not None:
+        yield unit
+        return
+    unit = AuditUnit(ip_address, transaction.get_connection().in_atomic_block)
+    token = _current_unit.set(unit)
+    completed = False
+    try:
+        yield unit
+        completed = True
+    finally:
+        _current_unit.reset(token)
+        if unit.in_atomic:
+            if completed:
+                unit.flush()
+        else:
+            _flush_committed(unit)
+
+
+def _flush_committed(unit):
+    count = len(unit.entries)
+    try:
+        unit.flush()
+    except DatabaseError:
+        logger.exception("Could not write %d audit entries for committed changes.", count)
+
+
+def record(tenant, actor, entity_type, entity_id, action, notes="", before=None, after=None, ip_address=None):
+    """Queue an audit entry and return the (not yet saved) ``AuditLog``."""
+    entry = AuditLog(
+        tenant=tenant,
+        actor=actor,
+        entity_type=entity_type,
+        entity_id=str(entity_id),
+        action=action,
+        notes=notes,
+        before_json=before,
+        after_json=after,
+        ip_address=ip_address,
+    )
+    unit = _current_unit.get()
+    if unit is not None and unit.in_atomic:
+        unit.add(entry)
+    elif transaction.get_connection().in_atomic_block:
+        transaction.on_commit(partial(_collect, entry))
+    else:
+        _collect(entry)
+    return entry
+
+
+def _json_value(value):
+    if value is None or isinstance(value, (str, int, float, bool, dict, list)):
+        return value
+    if isinstance(value, FieldFile):
+        return value.name or None
+    return _encoder.default(value)
+
+
+def encode_changes(changes, created=False):
+    """``(before, after)`` JSON dicts for a ``ChangeTrackingMixin.saved_changes`` mapping.
+
+    For a created row ``before`` is ``None`` and empty fields are left out of ``after``.
+    """
+    after = {name: _json_value(new) for name, (old, new) in changes.items()}
+    if created:
+        return None, {name: value for name, value in after.items() if value not in (None, "")}
+    before = {name: _json_value(old) for name, (old, new) in changes.items()}
+    return before, after
+
+
+def entity_state(tenant, entity_type, entity_id, at=None, snapshot_after=SNAPSHOT_INTERVAL):
+    """The audited field values of an entity as of ``at`` (default: now).
+
+    Starts from the latest ``AuditSnapshot`` taken by then and replays the
+    entries after it. When that replays ``snapshot_after`` entries or more,
+    a snapshot of the result is stored so later reads replay fewer.
+    """
+    lookup = {"tenant": tenant, "entity_type": entity_type, "entity_id": str(entity_id)}
+    snapshots = AuditSnapshot.objects.filter(**lookup)
+    entries = AuditLog.objects.filter(after_json__isnull=False, **lookup)
+    if at is not None:
+        snapshots = snapshots.filter(taken_at__lte=at)
+        entries = entries.filter(created_at__lte=at)
+    state = {}
+    snapshot = snapshots.order_by("-taken_at", "-last_entry_id").first()
+    if snapshot is not None:
+        state.update(snapshot.state)
+        # The created_at bound alone lets PostgreSQL skip older partitions.
+        entries = entries.filter(created_at__gte=snapshot.taken_at).filter(
+            Q(created_at__gt=snapshot.taken_at) | Q(id__gt=snapshot.last_entry_id)
+        )
+    rows = list(entries.order_by("created_at", "id").values_list("id", "created_at", "after_json"))
+    for _, _, after in rows:
+        state.update(after)
+    if rows and len(rows) >= snapshot_after:
+        last_id, last_created_at, _ = rows[-1]
+        AuditSnapshot.objects.create(
+            taken_at=last_created_at, last_entry_id=last_id, state=state, **lookup
+        )
+    return state
+
+
+def take_snapshot(tenant, entity_type, entity_id):
+    """Store a snapshot of the entity's current audited state if it has entries since the last one."""
+    return entity_state(tenant, entity_type, entity_id, snapshot_after=1)
@@ -0,0 +1,41 @@
+"""File helpers shared by the apps."""
+import hashlib
+
+from django.core.files import File
+
+
+class HashingFile(File):
+    """Wrap a file so that storing it also computes its digest and size.
+
+    Storages read their content through ``chunks()``/``read()``; each chunk
+    updates the digest on its way to storage, so an upload is read once and
+    never held in memory whole. Rewinding to the start resets the digest.
+
+    The wrapper does not expose ``temporary_file_path()``, so a
+    ``TemporaryUploadedFile`` is streamed like an in-memory upload instead of
+    being moved into place without being read.
+    """
+
+    def __init__(self, file, algorithm="sha256"):
+        super().__init__(file, name=getattr(file, "name", None))
+        self.algorithm = algorithm
+        self._reset()
+
+    def _reset(self):
+        self._digest = hashlib.new(self.algorithm)
+        self.bytes_read = 0
+
+    def read(self, *args, **kwargs):
+        data = self.file.read(*args, **kwargs)
+        self._digest.update(data.encode() if isinstance(data, str) else data)
+        self.bytes_read += len(data)
+        return data
+
+    def seek(self, offset, whence=0):
+        result = self.file.seek(offset, whence)
+        if offset == 0 and whence == 0:
+            self._reset()
+        return result
+
+    def hexdigest(self):
+        return self._digest.hexdigest()
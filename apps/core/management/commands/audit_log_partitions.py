@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming monthly audit log partitions and archive partitions past retention "
+        "to gzipped CSV files (PostgreSQL only)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead", type=int, default=3, help="Months of partitions to create ahead (default 3)."
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=settings.AUDIT_LOG_RETENTION_MONTHS,
+            help=f"Months kept online before archiving (default {settings.AUDIT_LOG_RETENTION_MONTHS}).",
+        )
+        parser.add_argument(
+            "--archive-dir", default=str(settings.AUDIT_LOG_ARCHIVE_DIR), help="Directory for archive files."
+        )
+        parser.add_argument("--dry-run", action="store_true", help="List the changes without making them.")
+
+    def handle(self, *args, **options):
+        if not partitions.is_partitioned():
+            self.stdout.write("The audit log is not partitioned on this database; nothing to do.")
+            return
+        if options["retain_months"] < 1:
+            raise CommandError("--retain-months must be at least 1.")
+        today = timezone.now().date()
+
+        if options["dry_run"]:
+            existing = {partition.month for partition in partitions.list_partitions()}
+            upcoming = [partitions.add_months(partitions.month_start(today), n) for n in range(options["months_ahead"] + 1)]
+            for month in upcoming:
+                if month not in existing:
+                    self.stdout.write(f"  would create {partitions.partition_name(month)}")
+        else:
+            for name in partitions.ensure_partitions(today, options["months_ahead"]):
+                self.stdout.write(f"  created {name}")
+
+        for partition in partitions.expired_partitions(today, options["retain_months"]):
+            if options["dry_run"]:
+                self.stdout.write(f"  would archive {partition.name}")
+                continue
+            path = partitions.archive_partition(partition, options["archive_dir"])
+            self.stdout.write(f"  archived {partition.name} to {path}")
+        self.stdout.write(self.style.SUCCESS("Audit log partitions up to date."))
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from apps.core import audit
+from apps.core.models import AuditLog, AuditSnapshot
+from apps.tenancy.models import Tenant
+
+
+class Command(BaseCommand):
+    help = (
+        "Snapshot the audited state of entities with many audit entries since their last snapshot, "
+        "so point-in-time reconstruction replays few entries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=7, help="Only consider entries from the last N days (default 7)."
+        )
+        parser.add_argument(
+            "--min-entries",
+            type=int,
+            default=audit.SNAPSHOT_INTERVAL // 2,
+            help=f"Entries since the last snapshot that warrant a new one (default {audit.SNAPSHOT_INTERVAL // 2}).",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 1 or options["min_entries"] < 1:
+            raise CommandError("--days and --min-entries must be at least 1.")
+        latest_snapshot = AuditSnapshot.objects.filter(
+            tenant_id=OuterRef("tenant_id"),
+            entity_type=OuterRef("entity_type"),
+            entity_id=OuterRef("entity_id"),
+        ).order_by("-taken_at").values("taken_at")[:1]
+        candidates = (
+            AuditLog.objects.filter(
+                created_at__gte=timezone.now() - timedelta(days=options["days"]),
+                after_json__isnull=False,
+            )
+            .annotate(snapshot_at=Subquery(latest_snapshot))
+            .filter(Q(snapshot_at__isnull=True) | Q(created_at__gt=F("snapshot_at")))
+            .order_by()
+            .values("tenant_id", "entity_type", "entity_id")
+            .annotate(entries=Count("id"))
+            .filter(entries__gte=options["min_entries"])
+        )
+        tenants = Tenant.objects.in_bulk()
+        taken = 0
+        for row in candidates.iterator():
+            audit.take_snapshot(tenants[row["tenant_id"]], row["entity_type"], row["entity_id"])
+            taken += 1
+        self.stdout.write(self.style.SUCCESS(f"Took {taken} audit snapshots."))
@@ -0,0 +1,15 @@
+from . import audit
+
+
+class AuditMiddleware:
+    """Write the audit entries recorded while handling a request in one INSERT.
+
+    Entries for changes that committed are written even if the view raises afterwards.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with audit.batch(ip_address=request.META.get("REMOTE_ADDR") or None):
+            return self.get_response(request)
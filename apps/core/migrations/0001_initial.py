@@ -0,0 +1,92 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+from apps.core import partitions
+
+MONTHS_AHEAD = 3
+
+
+def superseded_index_names(model):
+    """Names Django gave the unnamed indexes of tables created before this migration."""
+    for fields in (["tenant", "action"], ["entity_type", "entity_id"]):
+        index = models.Index(fields=fields)
+        index.set_name_with_model(model)
+        yield index.name
+
+
+def create_audit_log_table(apps, schema_editor):
+    """Create the audit log table, or adopt one created before this app had migrations."""
+    model = apps.get_model("core", "AuditLog")
+    connection = schema_editor.connection
+    exists = partitions.TABLE in connection.introspection.table_names()
+    if connection.vendor != "postgresql":
+        if not exists:
+            schema_editor.create_model(model)
+            return
+        with connection.cursor() as cursor:
+            present = connection.introspection.get_constraints(cursor, partitions.TABLE)
+        for index in model._meta.indexes:
+            if index.name not in present:
+                schema_editor.add_index(model, index)
+        for name in superseded_index_names(model):
+            if name in present:
+                schema_editor.execute(f"DROP INDEX {schema_editor.quote_name(name)}")
+        return
+
+    today = timezone.now().date()
+    if exists:
+        # Existing rows stay where they are, as the partition before next month.
+        first_month = partitions.add_months(partitions.month_start(today), 1)
+        statements = [f"DROP INDEX IF EXISTS {name}" for name in superseded_index_names(model)]
+        statements += partitions.adopt_table_statements(model, connection, first_month)
+        statements.append(partitions.create_partition_statement(first_month))
+    else:
+        statements = partitions.create_table_statements(model, connection)
+    for statement in statements + partitions.index_statements(model):
+        schema_editor.execute(statement)
+    partitions.ensure_partitions(today, MONTHS_AHEAD, using=connection.alias)
+
+
+def drop_audit_log_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model("core", "AuditLog"))
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('tenancy', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='AuditLog',
+                    fields=[
+                        ('created_at', models.DateTimeField(auto_now_add=True)),
+                        ('updated_at', models.DateTimeField(auto_now=True)),
+                        ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                        ('entity_type', models.CharField(max_length=100)),
+                        ('entity_id', models.CharField(max_length=100)),
+                        ('action', models.CharField(choices=[('CREATE', 'Create'), ('UPDATE', 'Update'), ('STATE_CHANGE', 'State Change'), ('UPLOAD', 'Upload'), ('EMAIL_SENT', 'Email Sent'), ('OTHER', 'Other')], default='OTHER', max_length=30)),
+                        ('before_json', models.JSONField(blank=True, null=True)),
+                        ('after_json', models.JSONField(blank=True, null=True)),
+                        ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                        ('notes', models.TextField(blank=True)),
+                        ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='audit_entries', to=settings.AUTH_USER_MODEL)),
+                        ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='audit_logs', to='tenancy.tenant')),
+                    ],
+                    options={
+                        'ordering': ['-created_at'],
+                        'indexes': [models.Index(fields=['tenant', 'action'], name='core_audit_tenant_action_idx'), models.Index(fields=['tenant', 'entity_type', 'entity_id', '-created_at'], name='core_audit_entity_trail_idx')],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_audit_log_table, drop_audit_log_table),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.11 on 2026-10-17 08:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('tenancy', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('entity_type', models.CharField(max_length=100)),
+                ('entity_id', models.CharField(max_length=100)),
+                ('taken_at', models.DateTimeField(help_text='created_at of the last audit entry included.')),
+                ('last_entry_id', models.BigIntegerField()),
+                ('state', models.JSONField()),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='audit_snapshots', to='tenancy.tenant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tenant', 'entity_type', 'entity_id', '-taken_at'], name='core_audit_snapshot_idx')],
+            },
+        ),
+    ]
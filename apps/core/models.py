@@ -28,6 +28,52 @@ class TenantAwareModel(models.Model):
         constraints = []  # We'll add tenant constraints manually per model
 
 
+class ChangeTrackingMixin:
+    """Remember field values as loaded so each save can be audited as a field-level diff.
+
+    After ``save()``, ``saved_changes`` maps the attname of every field the
+    save changed to ``(old, new)`` and ``saved_created`` tells whether it
+    inserted the row; for a new row every field is included, with ``old`` set
+    to ``None``. Timestamps are not tracked.
+    """
+
+    untracked_fields = ("created_at", "updated_at")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def _tracked_values(self, update_fields=None):
+        values = {}
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.name in self.untracked_fields:
+                continue
+            if update_fields is not None and field.name not in update_fields and field.attname not in update_fields:
+                continue
+            # Deferred fields that were never loaded are left alone.
+            if field.attname in self.__dict__:
+                values[field.attname] = getattr(self, field.attname)
+        return values
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        loaded = {} if adding else getattr(self, "_loaded_values", {})
+        current = self._tracked_values(kwargs.get("update_fields"))
+        super().save(*args, **kwargs)
+        self.saved_created = adding
+        if adding:
+            self.saved_changes = {name: (None, value) for name, value in current.items()}
+        else:
+            self.saved_changes = {
+                name: (loaded.get(name), value)
+                for name, value in current.items()
+                if name not in loaded or loaded[name] != value
+            }
+        self._loaded_values = {**loaded, **current}
+
+
 class AuditLog(TimeStampedModel):
     class Action(models.TextChoices):
         CREATE = "CREATE", "Create"
@@ -59,11 +105,40 @@ class AuditLog(TimeStampedModel):
     notes = models.TextField(blank=True)
 
     class Meta:
+        # On PostgreSQL the table is partitioned by month on created_at (see partitions.py).
         indexes = [
-            models.Index(fields=["tenant", "action"]),
-            models.Index(fields=["entity_type", "entity_id"]),
+            models.Index(fields=["tenant", "action"], name="core_audit_tenant_action_idx"),
+            models.Index(fields=["tenant", "entity_type", "entity_id", "-created_at"], name="core_audit_entity_trail_idx"),
         ]
         ordering = ["-created_at"]
 
     def __str__(self):
         return f"{self.entity_type}({self.entity_id}) {self.action}"
+
+
+class AuditSnapshot(TimeStampedModel):
+    """Audited state of an entity up to one audit log entry.
+
+    Reconstruction starts from the latest snapshot and replays only the
+    entries after it. ``last_entry_id`` is a plain integer because the
+    partitioned audit log has no single-column key to reference.
+    """
+
+    tenant = models.ForeignKey(
+        "tenancy.Tenant",
+        on_delete=models.PROTECT,
+        related_name="audit_snapshots",
+    )
+    entity_type = models.CharField(max_length=100)
+    entity_id = models.CharField(max_length=100)
+    taken_at = models.DateTimeField(help_text="created_at of the last audit entry included.")
+    last_entry_id = models.BigIntegerField()
+    state = models.JSONField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["tenant", "entity_type", "entity_id", "-taken_at"], name="core_audit_snapshot_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.entity_type}({self.entity_id}) @ {self.taken_at:%Y-%m-%d %H:%M}"
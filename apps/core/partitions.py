@@ -0,0 +1,178 @@
+"""Monthly range partitions of the ``AuditLog`` table on PostgreSQL.
+
+The table is partitioned by ``created_at``, one partition per calendar month
+(``core_auditlog_p202610`` holds October 2026), plus a default partition so
+an insert never fails for lack of one. ``audit_log_partitions`` creates the
+partitions for the coming months ahead of time and archives partitions past
+retention: their rows are copied to a gzipped CSV file, then the partition is
+detached and dropped. Other backends keep a single table.
+
+A table created before partitioning is adopted in place: it is attached as
+the ``core_auditlog_legacy`` partition holding everything before the first
+monthly partition, so no rows are copied.
+"""
+import gzip
+import os
+from collections import namedtuple
+from datetime import date
+
+from django.db import connections, transaction
+
+TABLE = "core_auditlog"
+LEGACY_PARTITION = f"{TABLE}_legacy"
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_PREFIX = f"{TABLE}_p"
+
+Partition = namedtuple("Partition", ["name", "month"])
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+def partition_month(name):
+    """The month a monthly partition holds, or ``None`` for the legacy and default partitions."""
+    suffix = name[len(PARTITION_PREFIX):]
+    if not name.startswith(PARTITION_PREFIX) or len(suffix) != 6 or not suffix.isdigit():
+        return None
+    return date(int(suffix[:4]), int(suffix[4:]), 1)
+
+
+def create_table_statements(model, connection):
+    """DDL for a new partitioned table; the primary key must include the partition key."""
+    tenant, actor = model._meta.get_field("tenant"), model._meta.get_field("actor")
+    return [
+        f"""
+        CREATE TABLE {TABLE} (
+            id bigint GENERATED BY DEFAULT AS IDENTITY,
+            created_at timestamp with time zone NOT NULL,
+            updated_at timestamp with time zone NOT NULL,
+            tenant_id {_foreign_key(tenant, connection)} NOT NULL,
+            actor_id {_foreign_key(actor, connection)} NULL,
+            entity_type varchar(100) NOT NULL,
+            entity_id varchar(100) NOT NULL,
+            action varchar(30) NOT NULL,
+            before_json jsonb NULL,
+            after_json jsonb NULL,
+            ip_address inet NULL,
+            notes text NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """,
+        f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT",
+    ]
+
+
+def _foreign_key(field, connection):
+    target = field.target_field
+    return (
+        f"{field.db_type(connection)} REFERENCES {target.model._meta.db_table} ({target.column}) "
+        "DEFERRABLE INITIALLY DEFERRED"
+    )
+
+
+def adopt_table_statements(model, connection, first_month):
+    """DDL turning an existing plain table into the legacy partition of a new partitioned table."""
+    return [
+        f"ALTER TABLE {TABLE} RENAME TO {LEGACY_PARTITION}",
+        f"ALTER TABLE {LEGACY_PARTITION} ALTER COLUMN id DROP IDENTITY IF EXISTS",
+        *create_table_statements(model, connection),
+        f"ALTER TABLE {TABLE} ATTACH PARTITION {LEGACY_PARTITION} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{first_month.isoformat()}')",
+        f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+        f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {LEGACY_PARTITION}), false)",
+    ]
+
+
+def create_partition_statement(month):
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def index_statements(model):
+    """``CREATE INDEX`` on the parent for each model index; it cascades to every partition."""
+    statements = []
+    for index in model._meta.indexes:
+        columns = []
+        for field_name in index.fields:
+            column = model._meta.get_field(field_name.lstrip("-")).column
+            columns.append(f"{column} DESC" if field_name.startswith("-") else column)
+        statements.append(f"CREATE INDEX {index.name} ON {TABLE} ({', '.join(columns)})")
+    return statements
+
+
+def is_partitioned(using="default"):
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABLE])
+        row = cursor.fetchone()
+    return row is not None and row[0] == "p"
+
+
+def list_partitions(using="default"):
+    """Monthly partitions of the table, oldest first."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(%s)",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = [Partition(name, partition_month(name)) for name in names]
+    return sorted((p for p in partitions if p.month is not None), key=lambda p: p.month)
+
+
+def ensure_partitions(today, months_ahead, using="default"):
+    """Create the partitions from ``today``'s month through ``months_ahead`` months on.
+
+    Months before the oldest monthly partition are never created: right after
+    an adopted table is attached, they belong to the legacy partition.
+    """
+    first = month_start(today)
+    months = [add_months(first, offset) for offset in range(months_ahead + 1)]
+    existing = {partition.month for partition in list_partitions(using)}
+    missing = [month for month in months if month not in existing and (not existing or month > min(existing))]
+    with connections[using].cursor() as cursor:
+        for month in missing:
+            cursor.execute(create_partition_statement(month))
+    return [partition_name(month) for month in missing]
+
+
+def expired_partitions(today, retain_months, using="default"):
+    """Monthly partitions that end before the retention window starts."""
+    cutoff = add_months(month_start(today), -retain_months)
+    return [partition for partition in list_partitions(using) if partition.month < cutoff]
+
+
+def archive_partition(partition, directory, using="default"):
+    """Copy a partition's rows to ``<directory>/<name>.csv.gz``, then detach and drop it.
+
+    Returns the archive path. The partition is only dropped once the archive
+    is written completely, so a failure leaves it attached.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{partition.name}.csv.gz")
+    connection = connections[using]
+    with connection.cursor() as cursor, gzip.open(f"{path}.part", "wb") as archive:
+        with cursor.copy(f"COPY {partition.name} TO STDOUT WITH (FORMAT csv, HEADER)") as copy:
+            for chunk in copy:
+                archive.write(chunk)
+    os.replace(f"{path}.part", path)
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {partition.name}")
+        cursor.execute(f"DROP TABLE {partition.name}")
+    return path
@@ -0,0 +1,55 @@
+"""Content-addressed file storage."""
+import os
+import posixpath
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+from .files import HashingFile
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Store each distinct file content once, named by its SHA-256.
+
+    The directory of the requested name is kept as a namespace and the file
+    name is replaced by the digest, sharded by its first two byte pairs:
+    saving ``docs/7/scan.pdf`` stores ``docs/7/ab/cd/abcd…``. Saving bytes
+    already stored under a namespace returns the existing name without
+    writing a second copy. Content is streamed through ``HashingFile`` into
+    a temporary file and moved into place once its digest is known; pass a
+    ``HashingFile`` to read the digest and size afterwards.
+    """
+
+    temp_dir = "tmp"
+
+    def blob_name(self, namespace, digest):
+        return posixpath.join(namespace, digest[:2], digest[2:4], digest)
+
+    def get_available_name(self, name, max_length=None):
+        # Equal names mean equal content, so an existing name is never a conflict.
+        return name
+
+    def _save(self, name, content):
+        if not isinstance(content, HashingFile):
+            content = HashingFile(content)
+        temp_dir = self.path(self.temp_dir)
+        os.makedirs(temp_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                for chunk in content.chunks():
+                    temp_file.write(chunk)
+            name = self.blob_name(posixpath.dirname(name), content.hexdigest())
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
@@ -113,13 +113,20 @@ class RemedialDocumentAdmin(admin.ModelAdmin):
     list_display = ('doc_type', 'entity_type', 'entity_id', 'version', 'uploaded_by', 'uploaded_at')
     list_filter = ('entity_type', 'is_confidential', 'uploaded_at')
     search_fields = ('doc_type', 'entity_id')
-    readonly_fields = ['id', 'created_at', 'updated_at', 'uploaded_at', 'file_hash']
+    readonly_fields = ['id', 'created_at', 'updated_at', 'uploaded_at', 'file_hash', 'file_size', 'blob']
+
+
+@admin.register(models.DocumentBlob)
+class DocumentBlobAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'tenant', 'size', 'ref_count', 'created_at')
+    search_fields = ('sha256',)
+    readonly_fields = ['id', 'sha256', 'name', 'size', 'ref_count', 'created_at', 'updated_at']
 
 
 @admin.register(models.NotificationRule)
 class NotificationRuleAdmin(admin.ModelAdmin):
-    list_display = ('rule_code', 'status', 'email_to_role', 'template_code', 'created_at')
-    list_filter = ('status', 'created_at')
+    list_display = ('rule_code', 'status', 'delivery_mode', 'email_to_role', 'template_code', 'created_at')
+    list_filter = ('status', 'delivery_mode', 'created_at')
     search_fields = ('rule_code', 'template_code')
     readonly_fields = ['id', 'created_at', 'updated_at']
 
@@ -132,6 +139,14 @@ class NotificationLogAdmin(admin.ModelAdmin):
     readonly_fields = ['id', 'created_at', 'updated_at']
 
 
+@admin.register(models.NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ('rule_code', 'entity_type', 'sent_to', 'status', 'attempts', 'next_attempt_at')
+    list_filter = ('status', 'rule_code')
+    search_fields = ('rule_code', 'entity_type', 'entity_id', 'sent_to')
+    readonly_fields = ['id', 'created_at', 'updated_at', 'idempotency_key', 'sent_at']
+
+
 @admin.register(models.AuditLog)
 class AuditLogAdmin(admin.ModelAdmin):
     list_display = ('entity_type', 'entity_id', 'actor', 'action', 'created_at')
@@ -139,3 +154,17 @@ class AuditLogAdmin(admin.ModelAdmin):
     search_fields = ('entity_type', 'entity_id', 'notes')
     readonly_fields = ['id', 'created_at', 'updated_at', 'tenant', 'actor', 'entity_type', 'entity_id', 'action', 'before_json', 'after_json']
     exclude = ['tenant']
+
+
+@admin.register(models.ScanCheckpoint)
+class ScanCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('command', 'tenant', 'shard', 'last_pk', 'processed_count', 'started_at', 'completed_at')
+    list_filter = ('command',)
+    readonly_fields = ['id', 'created_at', 'updated_at']
+
+
+@admin.register(models.PortfolioSummary)
+class PortfolioSummaryAdmin(admin.ModelAdmin):
+    list_display = ('tenant', 'metric', 'day', 'stage', 'status', 'count', 'amount')
+    list_filter = ('metric', 'tenant')
+    readonly_fields = ['id', 'created_at', 'updated_at']
@@ -1,7 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class RemedialConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.remedial"
     verbose_name = "Remedial Recovery"
+
+    def ready(self):
+        from . import signals, tenant_settings  # noqa: F401
+        from .search import ensure_sqlite_triggers
+
+        post_migrate.connect(ensure_sqlite_triggers, sender=self)
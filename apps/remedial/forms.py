@@ -1,12 +1,13 @@
 import json
 from django import forms
 from django.core.exceptions import ValidationError
+from django.urls import reverse
 from django.utils import timezone
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Submit, Field, Div, HTML
 from crispy_forms.bootstrap import PrependedText
 
-from . import models
+from . import models, selectors
 
 
 # ===== CORE MODEL FORMS =====
@@ -382,6 +383,10 @@ class RemedialDocumentForm(forms.ModelForm):
             self.fields["entity_type"].initial = self.entity_type
             self.fields["entity_type"].widget = forms.HiddenInput()
         
+        # A new file is a new document version; existing documents keep theirs.
+        if self.instance.pk:
+            del self.fields["file"]
+        
         self.helper = FormHelper()
         self.helper.form_tag = True
         self.helper.form_method = "post"
@@ -390,7 +395,7 @@ class RemedialDocumentForm(forms.ModelForm):
                 Field("entity_type"),
                 Field("entity_id"),
                 Field("doc_type"),
-                Field("file"),
+                *([Field("file")] if "file" in self.fields else []),
                 Div(
                     Field("is_confidential"),
                     css_class="form-check"
@@ -426,7 +431,7 @@ class NotificationRuleForm(forms.ModelForm):
         model = models.NotificationRule
         fields = [
             "rule_code", "status", "days_before", "days_after", 
-            "email_to_role", "email_to_specific", "template_code"
+            "email_to_role", "email_to_specific", "template_code", "delivery_mode"
         ]
 
     def __init__(self, *args, **kwargs):
@@ -443,6 +448,7 @@ class NotificationRuleForm(forms.ModelForm):
                 Field("email_to_role"),
                 Field("email_to_specific"),
                 Field("template_code"),
+                Field("delivery_mode"),
                 Submit("submit", "Save Rule"),
             )
         )
@@ -470,14 +476,30 @@ class RemedialAccountSearchForm(forms.Form):
         widget=forms.Select(attrs={"class": "form-select"})
     )
     assigned_officer = forms.ModelChoiceField(
-        queryset=models.User.objects.all(),
+        queryset=models.User.objects.none(),
         required=False,
         empty_label="All Officers",
         widget=forms.Select(attrs={"class": "form-select"})
     )
     
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, tenant=None, **kwargs):
         super().__init__(*args, **kwargs)
+        # Only the selected officer is rendered; the full tenant-scoped list is
+        # fetched over HTMX the first time the picker is focused.
+        officer_field = self.fields["assigned_officer"]
+        officer_field.queryset = models.User.objects.filter(
+            assigned_remedial_accounts__tenant=tenant
+        ).distinct()
+        selected = self.data.get("assigned_officer") if self.is_bound else None
+        officers = dict(selectors.get_tenant_officers(tenant)) if selected else {}
+        officer_field.widget.choices = [("", officer_field.empty_label)] + [
+            (pk, name) for pk, name in officers.items() if str(pk) == selected
+        ]
+        officer_field.widget.attrs.update({
+            "hx-get": reverse("remedial:officer-options") + (f"?selected={selected}" if selected else ""),
+            "hx-trigger": "focus once",
+            "hx-target": "this",
+        })
         self.helper = FormHelper()
         self.helper.form_tag = True
         self.helper.form_method = "get"
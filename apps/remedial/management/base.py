@@ -0,0 +1,263 @@
+"""Shared locking, chunked iteration and worker pool for remedial scan commands."""
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models.functions import Mod
+from django.utils import timezone
+
+from apps.core import audit
+from apps.remedial import models, services
+from apps.tenancy.config import get_tenant_config
+from apps.tenancy.models import Tenant
+
+from .workers import ScanPartition, init_worker, scan_partition_in_worker
+
+
+@contextmanager
+def advisory_lock(lock_id, sub_key=None):
+    """Hold a PostgreSQL session advisory lock; other backends always acquire.
+
+    With ``sub_key`` the two-key form ``pg_try_advisory_lock(int, int)`` is used,
+    so per-partition locks never collide with the command-wide lock.
+    """
+    if connection.vendor != "postgresql":
+        yield True
+        return
+    keys = [lock_id] if sub_key is None else [lock_id, sub_key]
+    placeholders = ", ".join(["%s"] * len(keys))
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT pg_try_advisory_lock({placeholders})", keys)
+        locked = cursor.fetchone()[0]
+        try:
+            yield locked
+        finally:
+            if locked:
+                cursor.execute(f"SELECT pg_advisory_unlock({placeholders})", keys)
+
+
+def iter_keyset_batches(queryset, batch_size, after=None):
+    """Yield lists of rows ordered by primary key, one bounded query per batch."""
+    queryset = queryset.order_by("pk")
+    while True:
+        page = queryset.filter(pk__gt=after) if after is not None else queryset
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+        yield batch
+        after = batch[-1].pk
+
+
+class ScanCommand(BaseCommand):
+    """Base class for scan commands processed in checkpointed, per-tenant batches.
+
+    Subclasses implement ``get_queryset`` and ``process_batch``, with the
+    partition tenant's settings available as ``self.config``; each batch runs
+    in its own transaction together with the checkpoint update, so a crashed run
+    resumes after the last committed batch when rerun the same day with the
+    same parameters (see ``run_key``). With ``--workers`` the partitions are
+    spread over a process pool, each guarded by its own advisory lock derived
+    from ``lock_id``. Parallel mode needs PostgreSQL; on other backends the
+    partitions run serially.
+    """
+
+    lock_id = None
+    rule_code = None
+    batch_size = 500
+    lock_message = "Skipping scan: lock already held."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=self.batch_size,
+            help=f"Rows per batch/transaction (default {self.batch_size}).",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore saved checkpoints and scan from the beginning.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of worker processes (PostgreSQL only); partitions run serially when 1.",
+        )
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=1,
+            help="Split each tenant into N hashed primary-key shards.",
+        )
+
+    @property
+    def command_name(self):
+        return self.__module__.rsplit(".", 1)[-1]
+
+    def prepare(self, options):
+        """Load run-wide state; return False to skip the run."""
+        return True
+
+    def run_parameters(self):
+        """Values set by ``prepare`` that select the rows of a run, such as a target date."""
+        return ()
+
+    def run_key(self):
+        """Identify a run by its start date and parameters; only its own checkpoints are resumed."""
+        return ":".join([timezone.now().date().isoformat(), *(str(value) for value in self.run_parameters())])
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def process_batch(self, batch):
+        """Process one batch and return a Counter of outcomes."""
+        raise NotImplementedError
+
+    def exclude_notified(self, rows, entity_type, since, entity_id=lambda row: row.pk):
+        """Drop rows already notified under ``rule_code`` since ``since`` (one query per batch)."""
+        notified = services.NotificationService.already_notified(
+            self.rule_code, entity_type, [entity_id(row) for row in rows], since
+        )
+        return [row for row in rows if entity_id(row) not in notified]
+
+    def finalize(self):
+        """Run once after every partition succeeded; releases digests collected for ``rule_code``."""
+        if self.rule_code:
+            services.NotificationService.release_digests([self.rule_code])
+
+    def get_partitions(self, shard_count=1):
+        # ``None`` covers legacy rows that were saved without a tenant.
+        tenants = [(None, "(no tenant)")]
+        tenants += list(Tenant.objects.order_by("pk").values_list("pk", "code"))
+        partitions = []
+        for tenant_id, code in tenants:
+            for shard in range(shard_count):
+                label = code if shard_count == 1 else f"{code}#{shard + 1}/{shard_count}"
+                partitions.append(ScanPartition(tenant_id, shard, shard_count, label))
+        return partitions
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1 or options["shards"] < 1:
+            raise CommandError("--workers and --shards must be at least 1.")
+        if options["workers"] > 1 and connection.vendor != "postgresql":
+            # Concurrent writers from several processes fail with "database is locked" on SQLite.
+            self.stdout.write(self.style.WARNING(
+                f"--workers needs PostgreSQL; running serially on {connection.vendor}."
+            ))
+            options["workers"] = 1
+        if not self.prepare(options):
+            return
+        with advisory_lock(self.lock_id) as locked:
+            if not locked:
+                self.stdout.write(self.style.WARNING(self.lock_message))
+                return
+            partitions = self.get_partitions(options["shards"])
+            if options["workers"] > 1:
+                results, failures = self.run_parallel(partitions, options)
+            else:
+                results = {partition: self.scan_partition(partition, options) for partition in partitions}
+                failures = {}
+            if not failures:
+                self.finalize()
+            self.report(results, failures)
+
+    def run_parallel(self, partitions, options):
+        worker_options = {key: value for key, value in options.items() if key not in ("stdout", "stderr")}
+        results, failures = {}, {}
+        # Spawned workers open their own connections; the parent keeps the command-wide lock.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=options["workers"], mp_context=context, initializer=init_worker
+        ) as pool:
+            futures = {
+                pool.submit(scan_partition_in_worker, self.command_name, partition, worker_options): partition
+                for partition in partitions
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                partition = futures[future]
+                try:
+                    totals, output = future.result()
+                except Exception as exc:
+                    failures[partition] = f"{exc.__class__.__name__}: {exc}"
+                    self.stderr.write(f"[{done}/{len(futures)}] {partition.label} failed: {failures[partition]}")
+                    continue
+                results[partition] = totals
+                if options["verbosity"] > 1 and output:
+                    self.stdout.write(output.rstrip())
+                self.stdout.write(f"[{done}/{len(futures)}] {partition.label}: {self._summarize(totals)}")
+        return results, failures
+
+    def scan_partition(self, partition, options):
+        with advisory_lock(self.lock_id, partition.lock_key) as locked:
+            if not locked:
+                self.stdout.write(self.style.WARNING(f"Skipping {partition.label}: partition lock held."))
+                return Counter(skipped_locked=1)
+            return self._scan_partition(partition, options)
+
+    def _scan_partition(self, partition, options):
+        # Tenant settings for the partition, read with plain lookups in process_batch.
+        self.config = get_tenant_config(partition.tenant_id)
+        checkpoint = self.load_checkpoint(partition, restart=options["restart"])
+        queryset = self.get_queryset().filter(tenant_id=partition.tenant_id)
+        if partition.shard_count > 1:
+            queryset = queryset.annotate(_shard=Mod("pk", partition.shard_count)).filter(_shard=partition.shard)
+        pk_field = queryset.model._meta.pk
+        after = pk_field.to_python(checkpoint.last_pk) if checkpoint.last_pk else None
+        totals = Counter()
+        for batch in iter_keyset_batches(queryset, options["batch_size"], after):
+            # Audit entries of the batch are written in one INSERT with its checkpoint.
+            with transaction.atomic(), audit.batch():
+                outcome = self.process_batch(batch)
+                checkpoint.last_pk = str(batch[-1].pk)
+                checkpoint.processed_count += len(batch)
+                checkpoint.save(update_fields=["last_pk", "processed_count", "updated_at"])
+            totals["scanned"] += len(batch)
+            totals.update(outcome or {})
+        checkpoint.last_pk = ""
+        checkpoint.completed_at = timezone.now()
+        checkpoint.save(update_fields=["last_pk", "completed_at", "updated_at"])
+        return totals
+
+    def load_checkpoint(self, partition, restart=False):
+        checkpoint, _ = models.ScanCheckpoint.objects.get_or_create(
+            command=self.command_name,
+            tenant_id=partition.tenant_id,
+            shard=partition.shard,
+            defaults={"shard_count": partition.shard_count},
+        )
+        run_key = self.run_key()
+        # A checkpoint left by another day, other parameters or another shard
+        # layout covers different rows and cannot be resumed.
+        resumable = checkpoint.shard_count == partition.shard_count and checkpoint.run_key == run_key
+        if checkpoint.last_pk and checkpoint.completed_at is None and resumable and not restart:
+            self.stdout.write(f"Resuming {self.command_name} for {partition.label} after pk {checkpoint.last_pk}.")
+            return checkpoint
+        checkpoint.shard_count = partition.shard_count
+        checkpoint.run_key = run_key
+        checkpoint.last_pk = ""
+        checkpoint.processed_count = 0
+        checkpoint.started_at = timezone.now()
+        checkpoint.completed_at = None
+        checkpoint.save()
+        return checkpoint
+
+    @staticmethod
+    def _summarize(totals):
+        return ", ".join(f"{key}={value}" for key, value in sorted((+totals).items())) or "nothing to process"
+
+    def report(self, results, failures=None):
+        grand_total = Counter()
+        for partition, totals in results.items():
+            totals = +totals
+            grand_total.update(totals)
+            if totals:
+                self.stdout.write(f"  {partition.label}: {self._summarize(totals)}")
+        self.stdout.write(self.style.SUCCESS(f"{self.command_name} complete: {self._summarize(grand_total)}."))
+        if failures:
+            for partition, error in failures.items():
+                self.stderr.write(f"  {partition.label}: {error}")
+            raise CommandError(f"{len(failures)} of {len(results) + len(failures)} partitions failed.")
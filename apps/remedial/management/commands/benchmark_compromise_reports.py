@@ -0,0 +1,104 @@
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from apps.remedial import models, selectors
+from apps.tenancy.models import Tenant
+
+
+class Command(BaseCommand):
+    help = "Benchmark compromise report aggregation on seeded data; all seed data is rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--agreements", type=int, default=50, help="Agreements to seed (default 50).")
+        parser.add_argument("--items", type=int, default=60, help="Schedule items per agreement (default 60).")
+        parser.add_argument("--payments", type=int, default=300, help="Payments per agreement (default 300).")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            tenant = self.seed(options["agreements"], options["items"], options["payments"])
+            expected_paid = models.CompromisePayment.objects.filter(compromise_agreement__tenant=tenant).aggregate(
+                total=Sum("amount")
+            )["total"]
+            self.stdout.write(f"Seeded tenant {tenant.code}; expected total paid {expected_paid}.")
+
+            # A datetime bound bypasses the portfolio summary and aggregates the raw tables.
+            until = timezone.make_aware(datetime.combine(date.today(), datetime.max.time()))
+            self.measure("report_compromise_performance", expected_paid, "total_paid",
+                         lambda: list(selectors.report_compromise_performance(tenant, end_date=until)))
+            self.measure("dashboard_compromise_summary", expected_paid, "total_paid",
+                         lambda: selectors.dashboard_compromise_summary(tenant))
+            self.measure("joined aggregate (previous)", expected_paid, "total_paid", lambda: list(
+                models.CompromiseAgreement.objects.filter(tenant=tenant)
+                .values("status")
+                .annotate(total_paid=Sum("payments__amount"), items=Count("schedule_items"))
+            ))
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS("Benchmark complete; seed data rolled back."))
+
+    def measure(self, label, expected_paid, paid_key, run):
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            started = time.perf_counter()
+            rows = run()
+            elapsed = time.perf_counter() - started
+        paid = sum(row[paid_key] or 0 for row in rows)
+        verdict = "ok" if paid == expected_paid else f"WRONG (got {paid})"
+        self.stdout.write(f"  {label}: {elapsed * 1000:.1f} ms, {len(queries)} queries, total paid {verdict}")
+
+    def seed(self, agreement_count, item_count, payment_count):
+        stamp = timezone.now().strftime("%Y%m%d%H%M%S%f")
+        tenant = Tenant.objects.create(name="Benchmark", code=f"bench-{stamp}")
+        user = get_user_model().objects.create(username=f"bench-{stamp}")
+        accounts = models.RemedialAccount.objects.bulk_create([
+            models.RemedialAccount(tenant=tenant, loan_account_no=f"BENCH-{stamp}-{index}", borrower_name="Benchmark")
+            for index in range(agreement_count)
+        ])
+        # bulk_create skips signals, keeping the seed fast and the summary table untouched.
+        agreements = models.CompromiseAgreement.objects.bulk_create([
+            models.CompromiseAgreement(
+                tenant=tenant,
+                remedial_account=account,
+                agreement_no=f"AG-{index}",
+                status=models.CompromiseStatus.ACTIVE,
+                settlement_amount=Decimal("60000.00"),
+                compromise_signed_date=date.today() - timedelta(days=400),
+                created_by=user,
+            )
+            for index, account in enumerate(accounts)
+        ])
+        models.CompromiseScheduleItem.objects.bulk_create([
+            models.CompromiseScheduleItem(
+                tenant=tenant,
+                compromise_agreement=agreement,
+                seq_no=seq_no,
+                due_date=date.today() - timedelta(days=30 * (item_count - seq_no)),
+                amount_due=Decimal("1000.00"),
+                status=models.ScheduleStatus.PAID if seq_no % 2 else models.ScheduleStatus.DUE,
+            )
+            for agreement in agreements
+            for seq_no in range(1, item_count + 1)
+        ], batch_size=1000)
+        models.CompromisePayment.objects.bulk_create([
+            models.CompromisePayment(
+                tenant=tenant,
+                compromise_agreement=agreement,
+                payment_date=date.today() - timedelta(days=number % 365),
+                amount=Decimal("25.00"),
+                received_by=user,
+            )
+            for agreement in agreements
+            for number in range(payment_count)
+        ], batch_size=1000)
+        return tenant
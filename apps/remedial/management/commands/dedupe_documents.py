@@ -0,0 +1,73 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from apps.core.files import HashingFile
+from apps.remedial import models, services
+
+
+class Command(BaseCommand):
+    help = (
+        "Move documents stored before content-addressed storage into shared blobs, "
+        "removing duplicate copies of the same file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200, help="Documents per batch (default 200).")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the documents to move.")
+
+    def handle(self, *args, **options):
+        pending = (
+            models.RemedialDocument.objects.filter(blob__isnull=True).exclude(file="")
+            .select_related("tenant").order_by("pk")
+        )
+        if options["dry_run"]:
+            self.stdout.write(f"{pending.count()} documents to move into blobs.")
+            return
+
+        storage = models.RemedialDocument._meta.get_field("file").storage
+        moved = missing = removed = 0
+        blobs = set()
+        last_pk = None
+        while True:
+            batch = pending.filter(pk__gt=last_pk) if last_pk else pending
+            batch = list(batch[:options["batch_size"]])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for document in batch:
+                old_name = document.file.name
+                if not storage.exists(old_name):
+                    self.stderr.write(f"  missing file for document {document.pk}: {old_name}")
+                    missing += 1
+                    continue
+                with storage.open(old_name, "rb") as old_file:
+                    content = HashingFile(old_file)
+                    new_name = storage.save(
+                        models.document_upload_path(document, os.path.basename(old_name)), content
+                    )
+                with transaction.atomic():
+                    blob = services.DocumentService.acquire_blob(
+                        document.tenant, new_name, content.hexdigest(), content.bytes_read
+                    )
+                    if document.is_deleted:
+                        # Soft-deleted documents hold the file but are not counted references.
+                        models.DocumentBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") - 1)
+                    models.RemedialDocument.objects.filter(pk=document.pk).update(
+                        file=blob.name,
+                        blob=blob,
+                        file_hash=content.hexdigest(),
+                        file_size=content.bytes_read,
+                        original_name=document.original_name or os.path.basename(old_name),
+                    )
+                moved += 1
+                blobs.add(blob.pk)
+                if old_name != blob.name and not models.RemedialDocument.objects.filter(file=old_name).exists():
+                    storage.delete(old_name)
+                    removed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"Moved {moved} documents into {len(blobs)} blobs; removed {removed} old files; "
+            f"{missing} files missing."
+        ))
@@ -0,0 +1,36 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from apps.remedial import services
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notifications from the outbox in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Outbox entries claimed and sent per mail connection (default 100).",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=0,
+            help="Stop after this many batches; 0 drains everything currently due.",
+        )
+
+    def handle(self, *args, **options):
+        totals = Counter()
+        batches = 0
+        while not options["max_batches"] or batches < options["max_batches"]:
+            counts = services.NotificationService.deliver_pending_notifications(batch_size=options["batch_size"])
+            if not any(counts.values()):
+                break
+            batches += 1
+            # Retried entries are rescheduled into the future, so the loop drains.
+            totals.update(counts)
+        summary = ", ".join(f"{key}={value}" for key, value in sorted((+totals).items())) or "nothing due"
+        self.stdout.write(self.style.SUCCESS(f"deliver_notifications complete: {summary}."))
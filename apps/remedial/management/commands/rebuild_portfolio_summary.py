@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.remedial import services
+from apps.tenancy.models import Tenant
+
+
+class Command(BaseCommand):
+    help = "Recompute the portfolio summary table from the source tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tenant",
+            action="append",
+            dest="tenants",
+            metavar="CODE",
+            help="Tenant code to rebuild (repeatable); all tenants when omitted.",
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.order_by("code")
+        if options["tenants"]:
+            tenants = tenants.filter(code__in=options["tenants"])
+            missing = set(options["tenants"]) - set(tenants.values_list("code", flat=True))
+            if missing:
+                raise CommandError(f"Unknown tenant code(s): {', '.join(sorted(missing))}")
+        for tenant in tenants:
+            rows = services.PortfolioSummaryService.rebuild(tenant)
+            self.stdout.write(f"  {tenant.code}: {len(rows)} summary rows")
+        self.stdout.write(self.style.SUCCESS("Portfolio summary rebuilt."))
@@ -1,83 +1,113 @@
-from django.core.management.base import BaseCommand
-from django.db import connection
+"""Repair lapsed LegalCase.next_hearing_date values and queue hearing reminders."""
+from collections import Counter
+from datetime import timedelta
+
+from django.db.models import Exists, F, OuterRef, Q, Subquery
 from django.utils import timezone
 
 from apps.remedial import models, services
+from apps.remedial.management.base import ScanCommand
+from apps.remedial.notifications import RecipientResolver
 
 
-class Command(BaseCommand):
-    help = "Rollup next hearing date for legal cases and update reminders."
+class Command(ScanCommand):
+    help = "Repair next hearing dates that have lapsed and send hearing reminders."
     lock_id = 280423
+    lock_message = "Skipping hearing date rollup: lock already held."
+    rule_code = "HEARING_REMINDER"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Verify every active case instead of only lapsed or upcoming dates.",
+        )
+
+    def prepare(self, options):
+        self.stdout.write("Rolling up next hearing dates for legal cases...")
+        self.today = timezone.now().date()
+        self.full = options["full"]
+        self.resolver = RecipientResolver()
+        return True
+
+    def run_parameters(self):
+        return (self.full,)
+
+    def get_queryset(self):
+        # Next scheduled hearing per case, resolved in the same query as the batch.
+        next_hearing = models.CourtHearing.objects.filter(
+            legal_case=OuterRef("pk"),
+            status="scheduled",
+            hearing_date__gte=self.today,
+        ).order_by("hearing_date", "pk")
+        cases = models.LegalCase.objects.filter(
+            status__in=[models.LegalCaseStatus.ACTIVE, models.LegalCaseStatus.FILED]
+        )
+        if not self.full:
+            # Hearing signals keep the date current; only dates that have lapsed
+            # or fall inside the reminder window need attention here, plus cases
+            # whose date was never set (e.g. rows predating the signals) although
+            # a hearing is scheduled.
+            cases = cases.filter(
+                Q(next_hearing_date__lte=self.today + timedelta(days=self.config["hearing_reminder_days"]))
+                | Q(Exists(next_hearing), next_hearing_date__isnull=True)
+            )
+        return (
+            cases
+            .only("pk", "tenant_id", "next_hearing_date")
+            .annotate(
+                upcoming_hearing_id=Subquery(next_hearing.values("pk")[:1]),
+                upcoming_hearing_date=Subquery(next_hearing.values("hearing_date")[:1]),
+                upcoming_reminder_sent_at=Subquery(next_hearing.values("reminder_sent_at")[:1]),
+                loan_account_no=F("remedial_account__loan_account_no"),
+            )
+        )
+
+    def process_batch(self, batch):
+        changed = []
+        for legal_case in batch:
+            if legal_case.next_hearing_date != legal_case.upcoming_hearing_date:
+                legal_case.next_hearing_date = legal_case.upcoming_hearing_date
+                changed.append(legal_case)
+        models.LegalCase.objects.bulk_update(changed, ["next_hearing_date"])
+
+        reminder_window_days = self.config["hearing_reminder_days"]
+        reminder_cutoff = self.today + timedelta(days=reminder_window_days)
+        due = [
+            legal_case
+            for legal_case in batch
+            if legal_case.upcoming_hearing_id
+            and legal_case.upcoming_hearing_date <= reminder_cutoff
+            and legal_case.upcoming_reminder_sent_at is None
+        ]
+        resolved = self.resolver.get(self.rule_code, batch[0].tenant_id)
+        if not (due and resolved and resolved.recipients):
+            return Counter(updated=len(changed))
+        due = self.exclude_notified(
+            due,
+            "CourtHearing",
+            timezone.now() - timedelta(days=reminder_window_days),
+            entity_id=lambda legal_case: legal_case.upcoming_hearing_id,
+        )
+        if not due:
+            return Counter(updated=len(changed))
 
-    def handle(self, *args, **options):
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT pg_try_advisory_lock(%s)", [self.lock_id])
-            locked = cursor.fetchone()[0]
-            if not locked:
-                self.stdout.write(self.style.WARNING("Skipping hearing date rollup: lock already held."))
-                return
-            try:
-                self.stdout.write("Rolling up next hearing dates for legal cases...")
-                
-                # Get all legal cases that need next hearing date updated
-                legal_cases = models.LegalCase.objects.filter(
-                    status__in=[models.LegalCaseStatus.ACTIVE, models.LegalCaseStatus.FILED]
-                ).select_related("remedial_account")
-                
-                updated_count = 0
-                
-                for legal_case in legal_cases:
-                    # Get next upcoming hearing
-                    next_hearing = models.CourtHearing.objects.filter(
-                        legal_case=legal_case,
-                        status="scheduled",
-                        hearing_date__gte=timezone.now().date()
-                    ).order_by("hearing_date").first()
-                    
-                    if next_hearing:
-                        # Update the legal case with next hearing date
-                        legal_case.next_hearing_date = next_hearing.hearing_date
-                        legal_case.save(update_fields=["next_hearing_date"])
-                        updated_count += 1
-                        
-                        # Check if reminder needs to be sent (7 days before)
-                        days_until_hearing = (next_hearing.hearing_date - timezone.now().date()).days
-                        
-                        if days_until_hearing <= 7 and days_until_hearing >= 0:
-                            if not next_hearing.reminder_sent_at:
-                                # Send reminder notification
-                                rule = models.NotificationRule.objects.filter(
-                                    rule_code="HEARING_REMINDER",
-                                    status=models.NotificationRuleStatus.ENABLED,
-                                ).first()
-                                
-                                if rule:
-                                    recipients = []
-                                    if rule.email_to_specific and rule.email_to_specific.email:
-                                        recipients.append(rule.email_to_specific.email)
-                                    elif rule.email_to_role:
-                                        recipients.append(f"{rule.email_to_role}@example.com")
-                                    
-                                    if recipients:
-                                        message = (
-                                            f"Upcoming hearing for {legal_case.remedial_account.loan_account_no} "
-                                            f"on {next_hearing.hearing_date}"
-                                        )
-                                        for recipient in recipients:
-                                            services.NotificationService.send_notification(
-                                                rule,
-                                                "CourtHearing",
-                                                next_hearing.pk,
-                                                recipient,
-                                                message,
-                                            )
-                                        
-                                        next_hearing.reminder_sent_at = timezone.now()
-                                        next_hearing.save(update_fields=["reminder_sent_at"])
-                
-                self.stdout.write(
-                    self.style.SUCCESS(f"Processed {len(legal_cases)} legal cases, updated {updated_count} next hearing dates.")
+        queued = services.NotificationService.queue_notifications(
+            resolved.rule,
+            "CourtHearing",
+            [
+                (
+                    legal_case.tenant_id,
+                    legal_case.upcoming_hearing_id,
+                    recipient,
+                    f"Upcoming hearing for {legal_case.loan_account_no} on {legal_case.upcoming_hearing_date}",
+                    (legal_case.loan_account_no, legal_case.upcoming_hearing_date),
                 )
-                
-            finally:
-                cursor.execute("SELECT pg_advisory_unlock(%s)", [self.lock_id])
\ No newline at end of file
+                for legal_case in due
+                for recipient in resolved.recipients
+            ],
+            columns=("Loan Account", "Hearing Date"),
+        )
+        models.CourtHearing.objects.filter(pk__in=queued).update(reminder_sent_at=timezone.now())
+        return Counter(updated=len(changed), reminded=len(queued))
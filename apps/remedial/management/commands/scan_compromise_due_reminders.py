@@ -1,60 +1,67 @@
 import logging
+from collections import Counter
 
-from django.core.management.base import BaseCommand
-from django.db import connection
 from django.utils import timezone
 
 from apps.remedial import models, services
+from apps.remedial.management.base import ScanCommand
+from apps.remedial.notifications import RecipientResolver
 
 logger = logging.getLogger(__name__)
 
 
-class Command(BaseCommand):
+class Command(ScanCommand):
     help = "Send compromise due reminders based on notification rules."
     lock_id = 280420
+    lock_message = "Skipping reminder scan: lock held."
+    rule_code = "COMPROMISE_DUE_REMINDER"
 
-    def handle(self, *args, **options):
-        rule = models.NotificationRule.objects.filter(
-            rule_code="COMPROMISE_DUE_REMINDER",
-            status=models.NotificationRuleStatus.ENABLED,
-        ).first()
-        if not rule or not rule.days_before:
+    def prepare(self, options):
+        self.resolver = RecipientResolver()
+        resolved = self.resolver.find(self.rule_code)
+        if not resolved or not resolved.rule.days_before:
             self.stdout.write(self.style.WARNING("Due reminder rule not configured."))
-            return
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT pg_try_advisory_lock(%s)", [self.lock_id])
-            locked = cursor.fetchone()[0]
-            if not locked:
-                self.stdout.write(self.style.WARNING("Skipping reminder scan: lock held."))
-                return
-            try:
-                target_date = timezone.now().date() + timezone.timedelta(days=rule.days_before)
-                items = models.CompromiseScheduleItem.objects.filter(
-                    due_date=target_date,
-                    status=models.ScheduleStatus.DUE,
-                ).select_related("compromise_agreement")
-                for item in items:
-                    recipients = []
-                    if rule.email_to_specific and rule.email_to_specific.email:
-                        recipients.append(rule.email_to_specific.email)
-                    elif rule.email_to_role:
-                        recipients.append(f"{rule.email_to_role}@example.com")
-                    if not recipients:
-                        continue
-                    message = (
-                        f"{item.compromise_agreement.remedial_account.loan_account_no} "
-                        f"payment due on {item.due_date}"
-                    )
-                    for recipient in recipients:
-                        services.send_notification(
-                            rule,
-                            "CompromiseScheduleItem",
-                            item.pk,
-                            recipient,
-                            message,
-                        )
-                    item.last_reminder_sent_at = timezone.now()
-                    item.save(update_fields=["last_reminder_sent_at"])
-                self.stdout.write(self.style.SUCCESS("Due reminders processed."))
-            finally:
-                cursor.execute("SELECT pg_advisory_unlock(%s)", [self.lock_id])
+            return False
+        self.target_date = timezone.now().date() + timezone.timedelta(days=resolved.rule.days_before)
+        # Any reminder sent within the lead window already covers this due date.
+        self.notified_since = timezone.now() - timezone.timedelta(days=resolved.rule.days_before)
+        return True
+
+    def run_parameters(self):
+        return (self.target_date,)
+
+    def get_queryset(self):
+        return models.CompromiseScheduleItem.objects.filter(
+            due_date=self.target_date,
+            status=models.ScheduleStatus.DUE,
+        ).select_related("compromise_agreement__remedial_account")
+
+    def process_batch(self, batch):
+        # Partitions are per tenant, so every row in a batch shares one tenant.
+        resolved = self.resolver.get(self.rule_code, batch[0].tenant_id)
+        if not resolved or not resolved.recipients:
+            return Counter()
+        scanned = len(batch)
+        batch = self.exclude_notified(batch, "CompromiseScheduleItem", self.notified_since)
+        outcome = Counter(skipped_duplicate=scanned - len(batch))
+        if not batch:
+            return outcome
+        queued = services.NotificationService.queue_notifications(
+            resolved.rule,
+            "CompromiseScheduleItem",
+            [
+                (
+                    item.tenant_id,
+                    item.pk,
+                    recipient,
+                    f"{item.compromise_agreement.remedial_account.loan_account_no} payment due on {item.due_date}",
+                    (item.compromise_agreement.remedial_account.loan_account_no, item.due_date, item.amount_due),
+                )
+                for item in batch
+                for recipient in resolved.recipients
+            ],
+            columns=("Loan Account", "Due Date", "Amount Due"),
+        )
+        models.CompromiseScheduleItem.objects.filter(pk__in=queued).update(last_reminder_sent_at=timezone.now())
+        outcome["reminded"] = len(queued)
+        return outcome
@@ -1,27 +1,54 @@
-from django.core.management.base import BaseCommand
-from django.db import connection
-from django.utils import timezone
+from collections import Counter
+
+from django.db.models import F
 
 from apps.remedial import models, services
+from apps.remedial.management.base import ScanCommand
 
 
-class Command(BaseCommand):
+class Command(ScanCommand):
     help = "Mark overdue compromise schedule items and trigger defaults."
     lock_id = 280419
 
-    def handle(self, *args, **options):
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT pg_try_advisory_lock(%s)", [self.lock_id])
-            locked = cursor.fetchone()[0]
-            if not locked:
-                self.stdout.write(self.style.WARNING("Skipping scan: lock already held."))
-                return
-            try:
-                self.stdout.write("Scanning compromise schedule items for overdue/default.")
-                items = models.CompromiseScheduleItem.objects.select_related("compromise_agreement").filter(
-                    status__in=[models.ScheduleStatus.DUE, models.ScheduleStatus.PARTIAL]
-                )
-                for item in items:
-                    services.detect_schedule_default(item)
-            finally:
-                cursor.execute("SELECT pg_advisory_unlock(%s)", [self.lock_id])
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--row-by-row",
+            action="store_true",
+            help="Fall back to the legacy per-item detection path.",
+        )
+
+    def prepare(self, options):
+        self.row_by_row = options["row_by_row"]
+        self.stdout.write("Scanning compromise schedule items for overdue/default.")
+        return True
+
+    def run_parameters(self):
+        return (self.row_by_row,)
+
+    def get_queryset(self):
+        if self.row_by_row:
+            return models.CompromiseScheduleItem.objects.select_related("compromise_agreement__tenant").filter(
+                status__in=[models.ScheduleStatus.DUE, models.ScheduleStatus.PARTIAL]
+            )
+        return models.CompromiseScheduleItem.objects.filter(
+            status__in=[
+                models.ScheduleStatus.DUE,
+                models.ScheduleStatus.PARTIAL,
+                models.ScheduleStatus.OVERDUE,
+            ],
+            amount_paid__lt=F("amount_due"),
+        ).only("pk")
+
+    def process_batch(self, batch):
+        if self.row_by_row:
+            return Counter(
+                overdue=sum(1 for item in batch if services.ScheduleItemService.detect_schedule_default(item))
+            )
+        counts = services.ScheduleItemService.mark_overdue_schedule_items(
+            models.CompromiseScheduleItem.objects.filter(pk__in=[item.pk for item in batch])
+        )
+        outcome = Counter()
+        for tenant_counts in counts.values():
+            outcome.update(tenant_counts)
+        return outcome
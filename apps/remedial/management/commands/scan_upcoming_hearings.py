@@ -1,52 +1,64 @@
-from django.core.management.base import BaseCommand
-from django.db import connection
+from collections import Counter
+
 from django.utils import timezone
 
 from apps.remedial import models, services
+from apps.remedial.management.base import ScanCommand
+from apps.remedial.notifications import RecipientResolver
 
 
-class Command(BaseCommand):
+class Command(ScanCommand):
     help = "Send reminders for upcoming court hearings."
     lock_id = 280421
+    lock_message = "Skipping hearing scan: lock held."
+    rule_code = "HEARING_REMINDER"
 
-    def handle(self, *args, **options):
-        rule = models.NotificationRule.objects.filter(
-            rule_code="HEARING_REMINDER",
-            status=models.NotificationRuleStatus.ENABLED,
-        ).first()
-        if not rule or not rule.days_before:
+    def prepare(self, options):
+        self.resolver = RecipientResolver()
+        resolved = self.resolver.find(self.rule_code)
+        if not resolved or not resolved.rule.days_before:
             self.stdout.write(self.style.WARNING("Hearing reminder rule not configured."))
-            return
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT pg_try_advisory_lock(%s)", [self.lock_id])
-            if not cursor.fetchone()[0]:
-                self.stdout.write(self.style.WARNING("Skipping hearing scan: lock held."))
-                return
-            try:
-                target_date = timezone.now().date() + timezone.timedelta(days=rule.days_before)
-                hearings = models.CourtHearing.objects.filter(
-                    hearing_date=target_date,
-                    status="scheduled",
-                ).select_related("legal_case")
-                for hearing in hearings:
-                    recipients = []
-                    if rule.email_to_specific and rule.email_to_specific.email:
-                        recipients.append(rule.email_to_specific.email)
-                    elif rule.email_to_role:
-                        recipients.append(f"{rule.email_to_role}@example.com")
-                    message = (
-                        f"Hearing for {hearing.legal_case.remedial_account.loan_account_no} on {hearing.hearing_date}"
-                    )
-                    for recipient in recipients:
-                        services.send_notification(
-                            rule,
-                            "CourtHearing",
-                            hearing.pk,
-                            recipient,
-                            message,
-                        )
-                    hearing.reminder_sent_at = timezone.now()
-                    hearing.save(update_fields=["reminder_sent_at"])
-                self.stdout.write(self.style.SUCCESS("Hearing reminders processed."))
-            finally:
-                cursor.execute("SELECT pg_advisory_unlock(%s)", [self.lock_id])
+            return False
+        self.target_date = timezone.now().date() + timezone.timedelta(days=resolved.rule.days_before)
+        # Any reminder sent within the lead window already covers this due date.
+        self.notified_since = timezone.now() - timezone.timedelta(days=resolved.rule.days_before)
+        return True
+
+    def run_parameters(self):
+        return (self.target_date,)
+
+    def get_queryset(self):
+        return models.CourtHearing.objects.filter(
+            hearing_date=self.target_date,
+            status="scheduled",
+        ).select_related("legal_case__remedial_account")
+
+    def process_batch(self, batch):
+        # Partitions are per tenant, so every row in a batch shares one tenant.
+        resolved = self.resolver.get(self.rule_code, batch[0].tenant_id)
+        if not resolved or not resolved.recipients:
+            return Counter()
+        scanned = len(batch)
+        batch = self.exclude_notified(batch, "CourtHearing", self.notified_since)
+        outcome = Counter(skipped_duplicate=scanned - len(batch))
+        if not batch:
+            return outcome
+        queued = services.NotificationService.queue_notifications(
+            resolved.rule,
+            "CourtHearing",
+            [
+                (
+                    hearing.tenant_id,
+                    hearing.pk,
+                    recipient,
+                    f"Hearing for {hearing.legal_case.remedial_account.loan_account_no} on {hearing.hearing_date}",
+                    (hearing.legal_case.remedial_account.loan_account_no, hearing.hearing_date, hearing.hearing_type),
+                )
+                for hearing in batch
+                for recipient in resolved.recipients
+            ],
+            columns=("Loan Account", "Hearing Date", "Hearing Type"),
+        )
+        models.CourtHearing.objects.filter(pk__in=queued).update(reminder_sent_at=timezone.now())
+        outcome["reminded"] = len(queued)
+        return outcome
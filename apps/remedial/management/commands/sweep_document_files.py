@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.remedial import services
+
+
+class Command(BaseCommand):
+    help = "Delete stored document files left behind by failed uploads or deleted blobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age-hours",
+            type=int,
+            default=24,
+            help="Only remove files older than this, so in-flight uploads are kept (default 24).",
+        )
+
+    def handle(self, *args, **options):
+        removed = services.DocumentService.sweep_unreferenced_files(
+            min_age=timedelta(hours=options["min_age_hours"])
+        )
+        for name in removed:
+            self.stdout.write(f"  removed {name}")
+        self.stdout.write(self.style.SUCCESS(f"Removed {len(removed)} unreferenced files."))
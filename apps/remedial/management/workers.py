@@ -0,0 +1,40 @@
+"""Process-pool plumbing for scan commands.
+
+Kept free of model imports so spawned workers can unpickle their tasks
+before ``django.setup()`` has run.
+"""
+import zlib
+from collections import Counter, namedtuple
+from io import StringIO
+
+
+class ScanPartition(namedtuple("ScanPartition", ["tenant_id", "shard", "shard_count", "label"])):
+    """One unit of scan work: a tenant, optionally split into hashed pk shards."""
+
+    __slots__ = ()
+
+    @property
+    def lock_key(self):
+        """Second advisory-lock key, combined with the command's ``lock_id``."""
+        digest = zlib.crc32(f"{self.tenant_id}:{self.shard}".encode())
+        return digest - (1 << 32) if digest >= (1 << 31) else digest
+
+
+def init_worker():
+    import django
+
+    django.setup()
+
+
+def scan_partition_in_worker(command_name, partition, options):
+    """Run one partition of ``command_name`` and return its totals and output."""
+    from django.core.management import load_command_class
+    from django.core.management.base import OutputWrapper
+
+    command = load_command_class("apps.remedial", command_name)
+    buffer = StringIO()
+    command.stdout = OutputWrapper(buffer)
+    if not command.prepare(options):
+        return Counter(), buffer.getvalue()
+    totals = command.scan_partition(partition, options)
+    return totals, buffer.getvalue()
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.11 on 2026-10-17 07:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('remedial', '0003_remove_compromiseagreement_terms_json_and_more'),
+        ('tenancy', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScanCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('command', models.CharField(max_length=100)),
+                ('last_pk', models.CharField(blank=True, max_length=64)),
+                ('processed_count', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('command', 'tenant'), name='unique_scan_checkpoint_per_tenant'), models.UniqueConstraint(condition=models.Q(('tenant__isnull', True)), fields=('command',), name='unique_scan_checkpoint_without_tenant')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.11 on 2026-10-17 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('remedial', '0004_scancheckpoint'),
+        ('tenancy', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='scancheckpoint',
+            name='unique_scan_checkpoint_per_tenant',
+        ),
+        migrations.RemoveConstraint(
+            model_name='scancheckpoint',
+            name='unique_scan_checkpoint_without_tenant',
+        ),
+        migrations.AddField(
+            model_name='scancheckpoint',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scancheckpoint',
+            name='shard_count',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddConstraint(
+            model_name='scancheckpoint',
+            constraint=models.UniqueConstraint(fields=('command', 'tenant', 'shard'), name='unique_scan_checkpoint_per_tenant'),
+        ),
+        migrations.AddConstraint(
+            model_name='scancheckpoint',
+            constraint=models.UniqueConstraint(condition=models.Q(('tenant__isnull', True)), fields=('command', 'shard'), name='unique_scan_checkpoint_without_tenant'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.11 on 2026-10-17 07:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('remedial', '0005_scancheckpoint_shard'),
+        ('tenancy', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='legalcase',
+            index=models.Index(fields=['status', 'next_hearing_date'], name='remedial_le_status_9d0f18_idx'),
+        ),
+    ]
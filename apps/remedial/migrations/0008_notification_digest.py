@@ -0,0 +1,43 @@
+# Generated by Django 5.2.11 on 2026-10-17 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('remedial', '0007_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationlog',
+            name='entity_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='entity_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='notificationrule',
+            name='delivery_mode',
+            field=models.CharField(choices=[('immediate', 'Immediate'), ('digest', 'Daily Digest')], default='immediate', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='notificationlog',
+            name='entity_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='notificationoutbox',
+            name='entity_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='notificationoutbox',
+            name='status',
+            field=models.CharField(choices=[('collecting', 'Collecting'), ('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=12),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-17 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('remedial', '0008_notification_digest'),
+        ('tenancy', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificationoutbox',
+            index=models.Index(fields=['rule_code', 'entity_type', 'entity_id'], name='remedial_no_rule_co_b719a5_idx'),
+        ),
+    ]
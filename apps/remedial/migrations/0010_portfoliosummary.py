@@ -0,0 +1,36 @@
+# Generated by Django 5.2.11 on 2026-10-17 07:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('remedial', '0009_notificationoutbox_entity_idx'),
+        ('tenancy', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('metric', models.CharField(choices=[('accounts', 'Accounts'), ('compromises', 'Compromises'), ('payments', 'Payments')], max_length=20)),
+                ('day', models.DateField(blank=True, null=True)),
+                ('stage', models.CharField(blank=True, max_length=20)),
+                ('status', models.CharField(blank=True, max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('paid_amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('schedule_items', models.IntegerField(default=0)),
+                ('schedule_items_paid', models.IntegerField(default=0)),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tenant', 'metric', 'day'], name='remedial_po_tenant__d2737e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,114 @@
+from django.db import migrations, transaction
+
+# Frozen copy of the search index as apps.remedial.search defined it when this
+# migration was written; later changes to that module need a new migration.
+FTS_TABLE = "remedial_search_fts"
+DOC_TABLE = "remedial_search_doc"
+
+# (entity_type, table, reference column, name column)
+SOURCES = (
+    ("remedial_account", "remedial_remedialaccount", "loan_account_no", "borrower_name"),
+    ("legal_case", "remedial_legalcase", "case_number", None),
+    ("compromise_agreement", "remedial_compromiseagreement", "agreement_no", None),
+)
+
+SQLITE_TABLES = [
+    f"CREATE TABLE IF NOT EXISTS {DOC_TABLE} ("
+    "id INTEGER PRIMARY KEY, entity_type TEXT NOT NULL, entity_id NOT NULL, "
+    "UNIQUE (entity_type, entity_id))",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "reference, name, tenant, tokenize = \"unicode61 tokenchars '-/._'\", prefix = '2 3 4')",
+]
+
+
+def sqlite_trigger_statements():
+    statements = []
+    for entity_type, table, reference, name in SOURCES:
+        name_sql = f"COALESCE(NEW.{name}, '')" if name else "''"
+        doc_id = f"(SELECT id FROM {DOC_TABLE} WHERE entity_type = '{entity_type}' AND entity_id = {{row}}.id)"
+        insert = (
+            f"INSERT INTO {DOC_TABLE} (entity_type, entity_id) VALUES ('{entity_type}', NEW.id); "
+            f"INSERT INTO {FTS_TABLE} (rowid, reference, name, tenant) "
+            f"VALUES ({doc_id.format(row='NEW')}, NEW.{reference}, {name_sql}, 't' || COALESCE(NEW.tenant_id, ''));"
+        )
+        delete = (
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = {doc_id.format(row='OLD')}; "
+            f"DELETE FROM {DOC_TABLE} WHERE entity_type = '{entity_type}' AND entity_id = OLD.id;"
+        )
+        indexed = ", ".join(column for column in (reference, name, "tenant_id") if column)
+        prefix = f"CREATE TRIGGER IF NOT EXISTS remedial_search_{entity_type}"
+        statements += [
+            f"{prefix}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+            f"{prefix}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+            f"{prefix}_au AFTER UPDATE OF {indexed} ON {table} BEGIN {delete} {insert} END",
+        ]
+    return statements
+
+
+def sqlite_backfill_statements():
+    statements = [f"DELETE FROM {FTS_TABLE}", f"DELETE FROM {DOC_TABLE}"]
+    for entity_type, table, reference, name in SOURCES:
+        name_sql = f"COALESCE(s.{name}, '')" if name else "''"
+        statements += [
+            f"INSERT INTO {DOC_TABLE} (entity_type, entity_id) SELECT '{entity_type}', id FROM {table}",
+            f"INSERT INTO {FTS_TABLE} (rowid, reference, name, tenant) "
+            f"SELECT d.id, s.{reference}, {name_sql}, 't' || COALESCE(s.tenant_id, '') FROM {table} s "
+            f"JOIN {DOC_TABLE} d ON d.entity_type = '{entity_type}' AND d.entity_id = s.id",
+        ]
+    return statements
+
+
+def postgresql_index_statements():
+    statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+    for _, table, reference, name in SOURCES:
+        statements.append(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_{reference}_prefix "
+            f"ON {table} (UPPER({reference}::text) text_pattern_ops)"
+        )
+        if name:
+            statements.append(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_{name}_trgm "
+                f"ON {table} USING gin (UPPER({name}::text) gin_trgm_ops)"
+            )
+    return statements
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        statements = SQLITE_TABLES + sqlite_trigger_statements() + sqlite_backfill_statements()
+        with transaction.atomic(using=schema_editor.connection.alias):
+            for statement in statements:
+                schema_editor.execute(statement)
+    elif vendor == "postgresql":
+        # Built concurrently (hence the non-atomic migration) so large tables stay writable.
+        for statement in postgresql_index_statements():
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for entity_type, _, _, _ in SOURCES:
+            for suffix in ("ai", "ad", "au"):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS remedial_search_{entity_type}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {DOC_TABLE}")
+    elif vendor == "postgresql":
+        for _, table, reference, name in SOURCES:
+            schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {table}_{reference}_prefix")
+            if name:
+                schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {table}_{name}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('remedial', '0010_portfoliosummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
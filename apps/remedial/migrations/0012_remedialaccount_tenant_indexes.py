@@ -0,0 +1,24 @@
+# Generated by Django 5.2.11 on 2026-10-17 07:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('remedial', '0011_search_index'),
+        ('tenancy', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='remedialaccount',
+            index=models.Index(fields=['tenant', 'stage', 'status'], name='remedial_re_tenant__89a8d8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='remedialaccount',
+            index=models.Index(fields=['tenant', 'assigned_officer', 'stage'], name='remedial_re_tenant__f691db_idx'),
+        ),
+    ]
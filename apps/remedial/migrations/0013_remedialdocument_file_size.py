@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-17 08:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('remedial', '0012_remedialaccount_tenant_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='remedialdocument',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.11 on 2026-10-17 08:22
+
+import apps.remedial.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('remedial', '0013_remedialdocument_file_size'),
+        ('tenancy', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='remedialdocument',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='remedialdocument',
+            name='file',
+            field=models.FileField(max_length=255, storage=apps.remedial.models.document_storage, upload_to=apps.remedial.models.document_upload_path),
+        ),
+        migrations.CreateModel(
+            name='DocumentBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sha256', models.CharField(max_length=64)),
+                ('name', models.CharField(max_length=255)),
+                ('size', models.PositiveBigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='remedialdocument',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='documents', to='remedial.documentblob'),
+        ),
+        migrations.AddConstraint(
+            model_name='documentblob',
+            constraint=models.UniqueConstraint(fields=('tenant', 'sha256'), name='remedial_blob_tenant_sha256_uniq'),
+        ),
+    ]
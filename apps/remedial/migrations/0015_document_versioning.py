@@ -0,0 +1,75 @@
+# Generated by Django 5.2.11 on 2026-10-17 08:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_document_versions(apps, schema_editor):
+    """Flag the newest live version of each document and seed its version counter."""
+    RemedialDocument = apps.get_model("remedial", "RemedialDocument")
+    DocumentVersionCounter = apps.get_model("remedial", "DocumentVersionCounter")
+    documents = RemedialDocument.objects.order_by(
+        "entity_type", "entity_id", "doc_type", "-version", "-uploaded_at", "-pk"
+    ).values_list("pk", "tenant_id", "entity_type", "entity_id", "doc_type", "version", "is_deleted")
+    counters = {}
+    latest = {}
+    for pk, tenant_id, entity_type, entity_id, doc_type, version, is_deleted in documents.iterator():
+        key = (entity_type, entity_id, doc_type)
+        if key not in counters:
+            counters[key] = DocumentVersionCounter(
+                tenant_id=tenant_id,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                doc_type=doc_type,
+                last_version=version,
+            )
+        if key not in latest and not is_deleted:
+            latest[key] = pk
+    DocumentVersionCounter.objects.bulk_create(counters.values(), batch_size=500)
+    latest = list(latest.values())
+    for start in range(0, len(latest), 500):
+        RemedialDocument.objects.filter(pk__in=latest[start:start + 500]).update(is_latest=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('remedial', '0014_document_blobs'),
+        ('tenancy', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentVersionCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('entity_type', models.CharField(max_length=50)),
+                ('entity_id', models.UUIDField()),
+                ('doc_type', models.CharField(max_length=128)),
+                ('last_version', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='remedialdocument',
+            name='is_latest',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='documentversioncounter',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant'),
+        ),
+        migrations.AddConstraint(
+            model_name='documentversioncounter',
+            constraint=models.UniqueConstraint(fields=('entity_type', 'entity_id', 'doc_type'), name='remedial_doc_counter_uniq'),
+        ),
+        migrations.RunPython(backfill_document_versions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='remedialdocument',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_latest', True)), fields=('tenant', 'entity_type', 'entity_id', 'doc_type'), name='remedial_document_latest_uniq'),
+        ),
+    ]
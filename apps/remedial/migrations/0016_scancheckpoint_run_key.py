@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-17 08:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('remedial', '0015_document_versioning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scancheckpoint',
+            name='run_key',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.11 on 2026-10-17 09:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # TenantAwareModel.tenant has always been declared blank=True, but 0002 recorded
+    # it without. This only brings the migration state in line; no SQL is run.
+
+    dependencies = [
+        ('remedial', '0016_scancheckpoint_run_key'),
+        ('tenancy', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='compromiseagreement',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant'),
+        ),
+        migrations.AlterField(
+            model_name='compromisepayment',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant'),
+        ),
+        migrations.AlterField(
+            model_name='compromisescheduleitem',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant'),
+        ),
+        migrations.AlterField(
+            model_name='courthearing',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant'),
+        ),
+        migrations.AlterField(
+            model_name='legalcase',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant'),
+        ),
+        migrations.AlterField(
+            model_name='notificationlog',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant'),
+        ),
+        migrations.AlterField(
+            model_name='notificationrule',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant'),
+        ),
+        migrations.AlterField(
+            model_name='recoveryaction',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant'),
+        ),
+        migrations.AlterField(
+            model_name='recoverymilestone',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant'),
+        ),
+        migrations.AlterField(
+            model_name='remedialaccount',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant'),
+        ),
+        migrations.AlterField(
+            model_name='remedialdocument',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant'),
+        ),
+        migrations.AlterField(
+            model_name='writeoffrequest',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_objects', to='tenancy.tenant'),
+        ),
+    ]
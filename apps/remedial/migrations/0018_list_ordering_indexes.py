@@ -0,0 +1,68 @@
+# Generated by Django 5.2.11 on 2026-10-17 09:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('remedial', '0017_tenant_blank'),
+        ('tenancy', '0002_tenantmembership'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='remedialaccount',
+            name='remedial_re_tenant__89a8d8_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='remedialaccount',
+            name='remedial_re_tenant__f691db_idx',
+        ),
+        migrations.AddIndex(
+            model_name='compromiseagreement',
+            index=models.Index(fields=['tenant', 'created_at', 'id'], name='remedial_co_tenant__bb936a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compromisepayment',
+            index=models.Index(fields=['tenant', 'payment_date', 'id'], name='remedial_co_tenant__d0766f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='courthearing',
+            index=models.Index(fields=['tenant', 'hearing_date', 'id'], name='remedial_co_tenant__1ba945_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='legalcase',
+            index=models.Index(fields=['tenant', 'created_at', 'id'], name='remedial_le_tenant__5e27bd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recoveryaction',
+            index=models.Index(fields=['tenant', 'initiated_at', 'id'], name='remedial_re_tenant__2cca06_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recoverymilestone',
+            index=models.Index(fields=['tenant', 'target_date', 'id'], name='remedial_re_tenant__df98c5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='remedialaccount',
+            index=models.Index(fields=['tenant', 'stage', 'status', 'created_at'], name='remedial_re_tenant__b1c794_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='remedialaccount',
+            index=models.Index(fields=['tenant', 'assigned_officer', 'stage', 'created_at'], name='remedial_re_tenant__8ba2dd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='remedialaccount',
+            index=models.Index(fields=['tenant', 'created_at', 'id'], name='remedial_re_tenant__9149fe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='remedialdocument',
+            index=models.Index(fields=['tenant', 'uploaded_at', 'id'], name='remedial_re_tenant__0f3c39_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='writeoffrequest',
+            index=models.Index(fields=['tenant', 'board_decision_date', 'id'], name='remedial_wr_tenant__f91062_idx'),
+        ),
+    ]
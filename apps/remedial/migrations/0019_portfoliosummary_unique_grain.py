@@ -0,0 +1,44 @@
+# Generated by Django 5.2.11 on 2026-10-17 09:13
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+SUMMARY_FIELDS = ("count", "amount", "paid_amount", "schedule_items", "schedule_items_paid")
+
+
+def merge_duplicate_grains(apps, schema_editor):
+    """Fold every grain's extra rows into its lowest-pk row before it becomes unique."""
+    PortfolioSummary = apps.get_model("remedial", "PortfolioSummary")
+    duplicates = (
+        PortfolioSummary.objects.values("tenant_id", "metric", "day", "stage", "status")
+        .annotate(rows=Count("pk"), keep=Min("pk"), **{f"total_{field}": Sum(field) for field in SUMMARY_FIELDS})
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for grain in list(duplicates):
+        rows = PortfolioSummary.objects.filter(
+            tenant_id=grain["tenant_id"], metric=grain["metric"], day=grain["day"],
+            stage=grain["stage"], status=grain["status"],
+        )
+        rows.exclude(pk=grain["keep"]).delete()
+        rows.filter(pk=grain["keep"]).update(**{field: grain[f"total_{field}"] for field in SUMMARY_FIELDS})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('remedial', '0018_list_ordering_indexes'),
+        ('tenancy', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_grains, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='portfoliosummary',
+            constraint=models.UniqueConstraint(fields=('tenant', 'metric', 'day', 'stage', 'status'), name='unique_portfolio_summary_grain'),
+        ),
+        migrations.AddConstraint(
+            model_name='portfoliosummary',
+            constraint=models.UniqueConstraint(condition=models.Q(('day__isnull', True)), fields=('tenant', 'metric', 'stage', 'status'), name='unique_portfolio_summary_grain_without_day'),
+        ),
+    ]
@@ -5,13 +5,19 @@ from django.contrib.auth import get_user_model
 from django.db import models
 from django.utils import timezone
 
-from apps.core.models import AuditLog, TenantAwareModel, TimeStampedModel
+from apps.core.models import AuditLog, ChangeTrackingMixin, TenantAwareModel, TimeStampedModel
+from apps.core.storage import ContentAddressedStorage
 
 User = get_user_model()
 
 
 def document_upload_path(instance, filename):
-    return f"remedial/{instance.entity_type.lower()}/{instance.entity_id}/{filename}"
+    # Only the directory is kept: document storage names files by content hash.
+    return f"remedial/{instance.tenant_id or 'shared'}/{filename}"
+
+
+def document_storage():
+    return ContentAddressedStorage()
 
 
 class RemedialStage(models.TextChoices):
@@ -83,12 +89,31 @@ class NotificationRuleStatus(models.TextChoices):
     DISABLED = "disabled", "Disabled"
 
 
+class PortfolioMetric(models.TextChoices):
+    ACCOUNTS = "accounts", "Accounts"
+    COMPROMISES = "compromises", "Compromises"
+    PAYMENTS = "payments", "Payments"
+
+
+class NotificationDeliveryMode(models.TextChoices):
+    IMMEDIATE = "immediate", "Immediate"
+    DIGEST = "digest", "Daily Digest"
+
+
 class NotificationLogStatus(models.TextChoices):
     SENT = "sent", "Sent"
     FAILED = "failed", "Failed"
 
 
-class RemedialAccount(TenantAwareModel, TimeStampedModel):
+class NotificationOutboxStatus(models.TextChoices):
+    COLLECTING = "collecting", "Collecting"
+    PENDING = "pending", "Pending"
+    SENDING = "sending", "Sending"
+    SENT = "sent", "Sent"
+    FAILED = "failed", "Failed"
+
+
+class RemedialAccount(ChangeTrackingMixin, TenantAwareModel, TimeStampedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     loan_account_no = models.CharField(max_length=64, unique=True)
     borrower_name = models.CharField(max_length=255)
@@ -111,6 +136,9 @@ class RemedialAccount(TenantAwareModel, TimeStampedModel):
         indexes = [
             models.Index(fields=["stage", "status"]),
             models.Index(fields=["assigned_officer", "stage"]),
+            models.Index(fields=["tenant", "stage", "status", "created_at"]),
+            models.Index(fields=["tenant", "assigned_officer", "stage", "created_at"]),
+            models.Index(fields=["tenant", "created_at", "id"]),
         ]
 
     def __str__(self):
@@ -121,16 +149,20 @@ class RemedialAccount(TenantAwareModel, TimeStampedModel):
 
         return reverse("remedial:account-detail", args=[self.pk])
     
-    def get_documents(self):
-        """Get all related documents for this account"""
-        return RemedialDocument.objects.filter(
+    def get_documents(self, latest_only=True):
+        """Current version of each of this account's documents, or every version"""
+        documents = RemedialDocument.objects.filter(
+            tenant_id=self.tenant_id,
             entity_type="remedial_account",
             entity_id=self.id,
             is_deleted=False
-        ).order_by("-version", "-uploaded_at")
+        )
+        if latest_only:
+            documents = documents.filter(is_latest=True)
+        return documents.order_by("-version", "-uploaded_at")
 
 
-class CompromiseAgreement(TenantAwareModel, TimeStampedModel):
+class CompromiseAgreement(ChangeTrackingMixin, TenantAwareModel, TimeStampedModel):
     remedial_account = models.ForeignKey(
         RemedialAccount,
         on_delete=models.CASCADE,
@@ -172,6 +204,7 @@ class CompromiseAgreement(TenantAwareModel, TimeStampedModel):
             ),
             models.UniqueConstraint(fields=["remedial_account", "agreement_no"], name="unique_compromise_per_account"),
         ]
+        indexes = [models.Index(fields=["tenant", "created_at", "id"])]
 
     def __str__(self):
         return f"{self.remedial_account.loan_account_no} – {self.agreement_no}"
@@ -182,7 +215,7 @@ class CompromiseAgreement(TenantAwareModel, TimeStampedModel):
         return reverse("remedial:compromise-approve", args=[self.pk])
 
 
-class CompromiseScheduleItem(TenantAwareModel, TimeStampedModel):
+class CompromiseScheduleItem(ChangeTrackingMixin, TenantAwareModel, TimeStampedModel):
     compromise_agreement = models.ForeignKey(
         CompromiseAgreement,
         on_delete=models.CASCADE,
@@ -205,7 +238,7 @@ class CompromiseScheduleItem(TenantAwareModel, TimeStampedModel):
         return f"{self.compromise_agreement} schedule #{self.seq_no}"
 
 
-class CompromisePayment(TenantAwareModel, TimeStampedModel):
+class CompromisePayment(ChangeTrackingMixin, TenantAwareModel, TimeStampedModel):
     compromise_agreement = models.ForeignKey(
         CompromiseAgreement,
         on_delete=models.CASCADE,
@@ -227,11 +260,14 @@ class CompromisePayment(TenantAwareModel, TimeStampedModel):
         related_name="compromise_payments",
     )
 
+    class Meta:
+        indexes = [models.Index(fields=["tenant", "payment_date", "id"])]
+
     def __str__(self):
         return f"Payment {self.pk} – {self.amount}"
 
 
-class LegalCase(TimeStampedModel, TenantAwareModel):
+class LegalCase(ChangeTrackingMixin, TimeStampedModel, TenantAwareModel):
     remedial_account = models.ForeignKey(
         RemedialAccount,
         on_delete=models.CASCADE,
@@ -254,6 +290,12 @@ class LegalCase(TimeStampedModel, TenantAwareModel):
         related_name="created_legal_cases",
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_hearing_date"]),
+            models.Index(fields=["tenant", "created_at", "id"]),
+        ]
+
     def __str__(self):
         return f"{self.remedial_account.loan_account_no} – {self.get_status_display()}"
 
@@ -277,13 +319,16 @@ class CourtHearing(TenantAwareModel, TimeStampedModel):
     escalation_sent_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
-        indexes = [models.Index(fields=["hearing_date", "status"])]
+        indexes = [
+            models.Index(fields=["hearing_date", "status"]),
+            models.Index(fields=["tenant", "hearing_date", "id"]),
+        ]
 
     def __str__(self):
         return f"Hearing {self.hearing_date} – {self.legal_case}"
 
 
-class RecoveryAction(TimeStampedModel, TenantAwareModel):
+class RecoveryAction(ChangeTrackingMixin, TimeStampedModel, TenantAwareModel):
     remedial_account = models.ForeignKey(
         RemedialAccount,
         on_delete=models.CASCADE,
@@ -300,11 +345,14 @@ class RecoveryAction(TimeStampedModel, TenantAwareModel):
     )
     initiated_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["tenant", "initiated_at", "id"])]
+
     def __str__(self):
         return f"{self.remedial_account.loan_account_no} – {self.action_type}"
 
 
-class RecoveryMilestone(TenantAwareModel, TimeStampedModel):
+class RecoveryMilestone(ChangeTrackingMixin, TenantAwareModel, TimeStampedModel):
     recovery_action = models.ForeignKey(
         RecoveryAction,
         on_delete=models.CASCADE,
@@ -323,13 +371,16 @@ class RecoveryMilestone(TenantAwareModel, TimeStampedModel):
     escalation_sent_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
-        indexes = [models.Index(fields=["target_date", "status"])]
+        indexes = [
+            models.Index(fields=["target_date", "status"]),
+            models.Index(fields=["tenant", "target_date", "id"]),
+        ]
 
     def __str__(self):
         return f"{self.recovery_action} – {self.milestone_type}"
 
 
-class WriteOffRequest(TimeStampedModel, TenantAwareModel):
+class WriteOffRequest(ChangeTrackingMixin, TimeStampedModel, TenantAwareModel):
     remedial_account = models.ForeignKey(
         RemedialAccount,
         on_delete=models.CASCADE,
@@ -348,11 +399,35 @@ class WriteOffRequest(TimeStampedModel, TenantAwareModel):
     board_decision_date = models.DateField(null=True, blank=True)
     notes = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["tenant", "board_decision_date", "id"])]
+
     def __str__(self):
         return f"Write-off {self.remedial_account.loan_account_no} – {self.get_status_display()}"
 
 
-class RemedialDocument(TenantAwareModel, TimeStampedModel):
+class DocumentBlob(TenantAwareModel, TimeStampedModel):
+    """A stored document file, shared by every document of the tenant with the same content.
+
+    ``ref_count`` counts the documents using it that are not soft-deleted;
+    the file itself is removed only once no document row refers to it.
+    """
+
+    sha256 = models.CharField(max_length=64)
+    name = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tenant", "sha256"], name="remedial_blob_tenant_sha256_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+
+class RemedialDocument(ChangeTrackingMixin, TenantAwareModel, TimeStampedModel):
     ENTITY_CHOICES = [
         ("remedial_account", "Remedial Account"),
         ("compromise_agreement", "Compromise Agreement"),
@@ -364,8 +439,17 @@ class RemedialDocument(TenantAwareModel, TimeStampedModel):
     entity_type = models.CharField(max_length=50, choices=ENTITY_CHOICES)
     entity_id = models.UUIDField()
     doc_type = models.CharField(max_length=128)
-    file = models.FileField(upload_to=document_upload_path)
+    file = models.FileField(upload_to=document_upload_path, storage=document_storage, max_length=255)
+    original_name = models.CharField(max_length=255, blank=True)
     file_hash = models.CharField(max_length=128, blank=True)
+    file_size = models.PositiveBigIntegerField(null=True, blank=True)
+    blob = models.ForeignKey(
+        "DocumentBlob",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="documents",
+    )
     uploaded_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.PROTECT,
@@ -373,6 +457,7 @@ class RemedialDocument(TenantAwareModel, TimeStampedModel):
     )
     uploaded_at = models.DateTimeField(auto_now_add=True)
     version = models.PositiveIntegerField(default=1)
+    is_latest = models.BooleanField(default=False)
     is_confidential = models.BooleanField(default=True)
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
@@ -385,12 +470,47 @@ class RemedialDocument(TenantAwareModel, TimeStampedModel):
     )
 
     class Meta:
-        indexes = [models.Index(fields=["entity_type", "entity_id"])]
+        indexes = [
+            models.Index(fields=["entity_type", "entity_id"]),
+            models.Index(fields=["tenant", "uploaded_at", "id"]),
+        ]
+        constraints = [
+            # Also the index behind current-version lookups.
+            models.UniqueConstraint(
+                fields=["tenant", "entity_type", "entity_id", "doc_type"],
+                condition=models.Q(is_latest=True),
+                name="remedial_document_latest_uniq",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.doc_type} v{self.version}"
 
 
+class DocumentVersionCounter(TenantAwareModel, TimeStampedModel):
+    """Last version number handed out for an entity's document type.
+
+    Uploads lock this row to number their version, so concurrent uploads of
+    the same document get distinct versions. The current version (newest not
+    deleted) is the document flagged ``is_latest``.
+    """
+
+    entity_type = models.CharField(max_length=50)
+    entity_id = models.UUIDField()
+    doc_type = models.CharField(max_length=128)
+    last_version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["entity_type", "entity_id", "doc_type"], name="remedial_doc_counter_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.entity_type}({self.entity_id}) {self.doc_type} v{self.last_version}"
+
+
 class NotificationRule(TenantAwareModel, TimeStampedModel):
     rule_code = models.CharField(max_length=64, unique=True)
     status = models.CharField(max_length=10, choices=NotificationRuleStatus.choices, default=NotificationRuleStatus.ENABLED)
@@ -405,6 +525,9 @@ class NotificationRule(TenantAwareModel, TimeStampedModel):
         related_name="notification_rules",
     )
     template_code = models.CharField(max_length=64)
+    delivery_mode = models.CharField(
+        max_length=10, choices=NotificationDeliveryMode.choices, default=NotificationDeliveryMode.IMMEDIATE
+    )
 
     def __str__(self):
         return self.rule_code
@@ -413,7 +536,9 @@ class NotificationRule(TenantAwareModel, TimeStampedModel):
 class NotificationLog(TenantAwareModel, TimeStampedModel):
     rule_code = models.CharField(max_length=64)
     entity_type = models.CharField(max_length=50)
-    entity_id = models.UUIDField()
+    # Digest deliveries cover several entities: entity_id is empty, entity_ids lists them.
+    entity_id = models.UUIDField(null=True, blank=True)
+    entity_ids = models.JSONField(default=list, blank=True)
     sent_to = models.CharField(max_length=255)
     sent_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=10, choices=NotificationLogStatus.choices)
@@ -424,3 +549,95 @@ class NotificationLog(TenantAwareModel, TimeStampedModel):
 
     def __str__(self):
         return f"{self.rule_code} → {self.sent_to}"
+
+
+class NotificationOutbox(TenantAwareModel, TimeStampedModel):
+    """Notification queued inside the scanning transaction, delivered later."""
+
+    idempotency_key = models.CharField(max_length=64, unique=True)
+    rule_code = models.CharField(max_length=64)
+    entity_type = models.CharField(max_length=50)
+    entity_id = models.UUIDField(null=True, blank=True)
+    entity_ids = models.JSONField(default=list, blank=True)
+    sent_to = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    status = models.CharField(
+        max_length=12, choices=NotificationOutboxStatus.choices, default=NotificationOutboxStatus.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+            models.Index(fields=["rule_code", "entity_type", "entity_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.rule_code} → {self.sent_to} ({self.status})"
+
+
+class PortfolioSummary(TenantAwareModel, TimeStampedModel):
+    """Pre-aggregated report figures per tenant, metric, day, stage and status.
+
+    Rows hold additive deltas and are always read through ``SUM()``. Each
+    grain has at most one row; ``day`` may be null, so the grain needs a
+    second constraint for rows without one.
+    """
+
+    metric = models.CharField(max_length=20, choices=PortfolioMetric.choices)
+    day = models.DateField(null=True, blank=True)
+    stage = models.CharField(max_length=20, blank=True)
+    status = models.CharField(max_length=20, blank=True)
+    count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    paid_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    schedule_items = models.IntegerField(default=0)
+    schedule_items_paid = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["tenant", "metric", "day"])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tenant", "metric", "day", "stage", "status"],
+                name="unique_portfolio_summary_grain",
+            ),
+            models.UniqueConstraint(
+                fields=["tenant", "metric", "stage", "status"],
+                condition=models.Q(day__isnull=True),
+                name="unique_portfolio_summary_grain_without_day",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.day} {self.stage}/{self.status}: {self.count}"
+
+
+class ScanCheckpoint(TenantAwareModel, TimeStampedModel):
+    """Resume position of a chunked scan command for one tenant."""
+
+    command = models.CharField(max_length=100)
+    shard = models.PositiveSmallIntegerField(default=0)
+    shard_count = models.PositiveSmallIntegerField(default=1)
+    # Start date and parameters of the run that owns ``last_pk``.
+    run_key = models.CharField(max_length=100, blank=True)
+    last_pk = models.CharField(max_length=64, blank=True)
+    processed_count = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["command", "tenant", "shard"], name="unique_scan_checkpoint_per_tenant"),
+            models.UniqueConstraint(
+                fields=["command", "shard"],
+                condition=models.Q(tenant__isnull=True),
+                name="unique_scan_checkpoint_without_tenant",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.command} @ {self.last_pk or 'start'}"
@@ -0,0 +1,109 @@
+"""Notification rule and recipient resolution shared by the reminder commands."""
+from collections import defaultdict, namedtuple
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from apps.tenancy.models import TenantMembership
+
+from . import models
+
+CACHE_KEY = "remedial:notification-recipients:{version}"
+CACHE_VERSION_KEY = "remedial:notification-recipients:version"
+CACHE_TIMEOUT = 300
+
+ResolvedRule = namedtuple("ResolvedRule", ["rule", "recipients"])
+
+
+def invalidate_recipient_cache():
+    """Drop cached rule/recipient snapshots, e.g. after a rule is edited."""
+    try:
+        cache.incr(CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(CACHE_VERSION_KEY, 2, None)
+
+
+def _load_rules():
+    """Enabled rules and ``{(tenant_id, role): [email, ...]}`` for the roles they name."""
+    rules = list(
+        models.NotificationRule.objects.filter(status=models.NotificationRuleStatus.ENABLED).select_related(
+            "email_to_specific"
+        )
+    )
+    roles = {rule.email_to_role for rule in rules if rule.email_to_role and not rule.email_to_specific_id}
+    role_emails = defaultdict(list)
+    if roles:
+        # Only members of a tenant receive its notices, even where group names are shared.
+        memberships = (
+            TenantMembership.objects.filter(user__groups__name__in=roles, user__is_active=True)
+            .exclude(user__email="")
+            .order_by("user__email")
+            .values_list("tenant_id", "user__groups__name", "user__email")
+        )
+        for tenant_id, role, email in memberships:
+            role_emails[(tenant_id, role)].append(email)
+    return rules, dict(role_emails)
+
+
+def _recipients(rule, role_emails, tenant_id):
+    if rule.email_to_specific and rule.email_to_specific.email:
+        return (rule.email_to_specific.email,)
+    if rule.email_to_role:
+        # Roles without members in the tenant fall back to the role mailbox alias.
+        return tuple(role_emails.get((tenant_id, rule.email_to_role)) or [f"{rule.email_to_role}@example.com"])
+    return ()
+
+
+class RecipientResolver:
+    """Enabled notification rules with their recipients, loaded once per run.
+
+    The snapshot costs two queries (rules, then role members) and is shared
+    across runs through the cache until a rule or membership changes or
+    ``CACHE_TIMEOUT`` elapses. Tenant-specific rules only apply to their own
+    tenant's rows; rules without a tenant apply everywhere. Role recipients
+    are the members of the tenant whose rows are being notified.
+    """
+
+    def __init__(self, use_cache=True):
+        self.use_cache = use_cache
+        self._snapshot = None
+        self._by_tenant = {}
+
+    @property
+    def snapshot(self):
+        if self._snapshot is None:
+            if self.use_cache:
+                key = CACHE_KEY.format(version=cache.get_or_set(CACHE_VERSION_KEY, 1, None))
+                self._snapshot = cache.get(key)
+                if self._snapshot is None:
+                    self._snapshot = _load_rules()
+                    cache.set(key, self._snapshot, CACHE_TIMEOUT)
+            else:
+                self._snapshot = _load_rules()
+        return self._snapshot
+
+    def find(self, rule_code):
+        """Return the enabled rule with ``rule_code`` regardless of tenant."""
+        rules, role_emails = self.snapshot
+        for rule in rules:
+            if rule.rule_code == rule_code:
+                return ResolvedRule(rule, _recipients(rule, role_emails, rule.tenant_id))
+        return None
+
+    def for_tenant(self, tenant_id):
+        """Map rule codes to the rules that apply to ``tenant_id``, with that tenant's recipients."""
+        if tenant_id not in self._by_tenant:
+            rules, role_emails = self.snapshot
+            self._by_tenant[tenant_id] = {
+                rule.rule_code: ResolvedRule(rule, _recipients(rule, role_emails, tenant_id))
+                for rule in rules
+                if rule.tenant_id in (None, tenant_id)
+            }
+        return self._by_tenant[tenant_id]
+
+    def get(self, rule_code, tenant_id):
+        return self.for_tenant(tenant_id).get(rule_code)
+
+    def recipients(self, rule_code, tenant_id):
+        resolved = self.get(rule_code, tenant_id)
+        return resolved.recipients if resolved else ()
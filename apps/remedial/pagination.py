@@ -0,0 +1,158 @@
+"""Keyset (cursor) pagination for remedial list views."""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import F, Q
+from django.http import Http404
+
+
+class CursorPage:
+    """One page of a keyset-paginated list, shaped like the parts of ``Page`` templates use."""
+
+    def __init__(self, object_list, has_next, next_cursor, has_previous, count=None, count_is_estimate=False):
+        self.object_list = object_list
+        self.has_next_page = has_next
+        self.next_cursor = next_cursor
+        self.has_previous_page = has_previous
+        self.count = count
+        self.count_is_estimate = count_is_estimate
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.has_next_page
+
+    def has_previous(self):
+        return self.has_previous_page
+
+    def has_other_pages(self):
+        return self.has_next_page or self.has_previous_page
+
+
+class CursorPaginationMixin:
+    """Replace OFFSET pagination on a ``ListView`` with keyset pagination.
+
+    The page boundary is the view's leading ``order_by`` field plus the primary
+    key as tiebreaker, carried in an opaque ``?cursor=`` token, so no page costs
+    more than the first and no ``COUNT(*)`` is issued. With a ``(tenant, field,
+    id)`` index each page of a non-null ordering is a single index range scan;
+    nullable fields sort nulls last, which a plain index cannot supply on
+    PostgreSQL for descending orders.
+    Set ``approximate_count`` to show a planner estimate (PostgreSQL) or a count
+    capped at ``count_cap`` rows elsewhere. HTMX requests render
+    ``rows_template_name`` so "load more" can append rows in place. The page
+    size comes from the tenant's ``list_page_size`` setting.
+    """
+
+    cursor_param = "cursor"
+    approximate_count = False
+    count_cap = 1000
+    rows_template_name = None
+
+    def get_paginate_by(self, queryset):
+        tenant = getattr(self.request, "tenant", None)
+        return tenant.config["list_page_size"] if tenant is not None else super().get_paginate_by(queryset)
+
+    def get_template_names(self):
+        if self.rows_template_name and getattr(self.request, "htmx", False):
+            return [self.rows_template_name]
+        return super().get_template_names()
+
+    def get_cursor_field(self, queryset):
+        ordering = [str(term) for term in queryset.query.order_by] or ["-pk"]
+        return ordering[0]
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_cursor_field(queryset)
+        descending = ordering.startswith("-")
+        field_name = ordering.lstrip("-")
+        field = queryset.model._meta.pk if field_name == "pk" else queryset.model._meta.get_field(field_name)
+        pk_name = queryset.model._meta.pk.name
+
+        is_pk = field_name == "pk" or field.primary_key
+        if is_pk:
+            order_by = [F(pk_name).desc() if descending else F(pk_name).asc()]
+        else:
+            # Only ask for nulls last where there can be nulls, so non-null
+            # orderings match the index exactly.
+            nulls_last = True if field.null else None
+            order_by = [
+                F(field_name).desc(nulls_last=nulls_last) if descending else F(field_name).asc(nulls_last=nulls_last),
+                F(pk_name).desc() if descending else F(pk_name).asc(),
+            ]
+        page_queryset = queryset.order_by(*order_by)
+
+        token = self.request.GET.get(self.cursor_param)
+        if token:
+            value, pk = self.decode_cursor(token, field, queryset.model._meta.pk)
+            page_queryset = page_queryset.filter(
+                self.keyset_filter(field_name, pk_name, value, pk, descending, is_pk, field.null)
+            )
+
+        rows = list(page_queryset[: page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = None
+        if has_next:
+            last = rows[-1]
+            value = None if field.primary_key or field.value_from_object(last) is None else field.value_to_string(last)
+            next_cursor = self.encode_cursor(value, last.pk)
+
+        count, estimated = (None, False)
+        if self.approximate_count:
+            count, estimated = self.estimate_count(queryset)
+        page = CursorPage(rows, has_next, next_cursor, bool(token), count, estimated)
+        return (None, page, rows, page.has_other_pages())
+
+    @staticmethod
+    def keyset_filter(field_name, pk_name, value, pk, descending, is_pk, nullable=True):
+        after, from_boundary = ("lt", "lte") if descending else ("gt", "gte")
+        pk_after = Q(**{f"{pk_name}__{after}": pk})
+        if is_pk:
+            return pk_after
+        if value is None:
+            # Nulls sort last, so only further nulls can follow a null boundary.
+            return Q(**{f"{field_name}__isnull": True}) & pk_after
+        # The inclusive bound on the field alone is what the index scan starts from.
+        following = Q(**{f"{field_name}__{from_boundary}": value}) & (
+            Q(**{f"{field_name}__{after}": value}) | (Q(**{field_name: value}) & pk_after)
+        )
+        if nullable:
+            following |= Q(**{f"{field_name}__isnull": True})
+        return following
+
+    @staticmethod
+    def encode_cursor(value, pk):
+        raw = json.dumps([value, str(pk)]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(token, field, pk_field):
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            value, pk = json.loads(raw)
+            value = None if value is None else field.to_python(value)
+            return value, pk_field.to_python(pk)
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            raise Http404("Invalid cursor.")
+
+    def estimate_count(self, queryset):
+        queryset = queryset.order_by()
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql":
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"]), True
+        capped = queryset[: self.count_cap + 1].count()
+        return min(capped, self.count_cap), capped > self.count_cap
@@ -0,0 +1,213 @@
+"""Indexed search over remedial accounts, legal cases and compromise agreements.
+
+PostgreSQL answers from expression indexes created in migration 0011: a
+``text_pattern_ops`` index on ``UPPER(reference)`` for reference-number
+prefixes and a ``pg_trgm`` GIN index on ``UPPER(borrower_name)`` for
+substring matches, ranked by trigram similarity. Both match the SQL Django
+emits for ``istartswith``/``icontains``, so the ORM lookups below use them.
+
+SQLite answers from the ``remedial_search_fts`` FTS5 table, kept in step with
+the source tables by triggers. ``remedial_search_doc`` maps each FTS row to
+its entity so triggers can find it through a unique index.
+"""
+from collections import namedtuple
+
+from django.db import connections
+from django.db.models import Case, F, FloatField, Func, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Upper
+
+from . import models
+
+FTS_TABLE = "remedial_search_fts"
+DOC_TABLE = "remedial_search_doc"
+MIN_QUERY_LENGTH = 2
+TYPEAHEAD_LIMIT = 10
+
+SearchTarget = namedtuple("SearchTarget", ["entity_type", "model", "reference", "name"])
+SearchHit = namedtuple("SearchHit", ["entity_type", "pk", "reference", "name"])
+
+TARGETS = (
+    SearchTarget("remedial_account", models.RemedialAccount, "loan_account_no", "borrower_name"),
+    SearchTarget("legal_case", models.LegalCase, "case_number", None),
+    SearchTarget("compromise_agreement", models.CompromiseAgreement, "agreement_no", None),
+)
+TARGETS_BY_TYPE = {target.entity_type: target for target in TARGETS}
+
+SQLITE_TABLES = [
+    f"CREATE TABLE IF NOT EXISTS {DOC_TABLE} ("
+    "id INTEGER PRIMARY KEY, entity_type TEXT NOT NULL, entity_id NOT NULL, "
+    "UNIQUE (entity_type, entity_id))",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "reference, name, tenant, tokenize = \"unicode61 tokenchars '-/._'\", prefix = '2 3 4')",
+]
+
+
+def _source(target):
+    return target.entity_type, target.model._meta.db_table, target.reference, target.name
+
+
+def sqlite_trigger_statements():
+    """Triggers keeping the FTS table in step with each source table."""
+    statements = []
+    for target in TARGETS:
+        entity_type, table, reference, name = _source(target)
+        name_sql = f"COALESCE(NEW.{name}, '')" if name else "''"
+        doc_id = f"(SELECT id FROM {DOC_TABLE} WHERE entity_type = '{entity_type}' AND entity_id = {{row}}.id)"
+        insert = (
+            f"INSERT INTO {DOC_TABLE} (entity_type, entity_id) VALUES ('{entity_type}', NEW.id); "
+            f"INSERT INTO {FTS_TABLE} (rowid, reference, name, tenant) "
+            f"VALUES ({doc_id.format(row='NEW')}, NEW.{reference}, {name_sql}, 't' || COALESCE(NEW.tenant_id, ''));"
+        )
+        delete = (
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = {doc_id.format(row='OLD')}; "
+            f"DELETE FROM {DOC_TABLE} WHERE entity_type = '{entity_type}' AND entity_id = OLD.id;"
+        )
+        # Only re-index when an indexed column changes, not on every save.
+        indexed = ", ".join(column for column in (reference, name, "tenant_id") if column)
+        prefix = f"CREATE TRIGGER IF NOT EXISTS remedial_search_{entity_type}"
+        statements += [
+            f"{prefix}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+            f"{prefix}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+            f"{prefix}_au AFTER UPDATE OF {indexed} ON {table} BEGIN {delete} {insert} END",
+        ]
+    return statements
+
+
+def sqlite_backfill_statements():
+    statements = [f"DELETE FROM {FTS_TABLE}", f"DELETE FROM {DOC_TABLE}"]
+    for target in TARGETS:
+        entity_type, table, reference, name = _source(target)
+        name_sql = f"COALESCE(s.{name}, '')" if name else "''"
+        statements += [
+            f"INSERT INTO {DOC_TABLE} (entity_type, entity_id) SELECT '{entity_type}', id FROM {table}",
+            f"INSERT INTO {FTS_TABLE} (rowid, reference, name, tenant) "
+            f"SELECT d.id, s.{reference}, {name_sql}, 't' || COALESCE(s.tenant_id, '') FROM {table} s "
+            f"JOIN {DOC_TABLE} d ON d.entity_type = '{entity_type}' AND d.entity_id = s.id",
+        ]
+    return statements
+
+
+def postgresql_index_statements():
+    """Expression indexes matching the ``istartswith``/``icontains`` SQL Django emits."""
+    statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+    for target in TARGETS:
+        _, table, reference, name = _source(target)
+        statements.append(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_{reference}_prefix "
+            f"ON {table} (UPPER({reference}::text) text_pattern_ops)"
+        )
+        if name:
+            statements.append(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_{name}_trgm "
+                f"ON {table} USING gin (UPPER({name}::text) gin_trgm_ops)"
+            )
+    return statements
+
+
+def ensure_sqlite_triggers(using="default", **kwargs):
+    """``post_migrate`` hook: SQLite drops triggers whenever a migration rebuilds a table."""
+    connection = connections[using]
+    if connection.vendor != "sqlite" or FTS_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for statement in sqlite_trigger_statements():
+            cursor.execute(statement)
+
+
+def _vendor(model):
+    return connections[model.objects.db].vendor
+
+
+def fts_match(query, tenant_id, columns=("reference", "name")):
+    """Build an FTS5 MATCH expression: every term as a prefix of ``columns``, within ``tenant_id``."""
+    terms = " ".join('"{}"*'.format(term.replace('"', '""')) for term in query.split())
+    return f'tenant:"t{tenant_id}" AND {{{" ".join(columns)}}}:({terms})'
+
+
+def _fts_ids(entity_type, match):
+    return RawSQL(
+        f"SELECT d.entity_id FROM {DOC_TABLE} d JOIN {FTS_TABLE} f ON f.rowid = d.id "
+        f"WHERE {FTS_TABLE} MATCH %s AND d.entity_type = %s",
+        [match, entity_type],
+    )
+
+
+def filter_queryset(queryset, query, tenant, entity_type="remedial_account", columns=("reference", "name")):
+    """Restrict ``queryset`` to ``tenant`` rows matching ``query``, keeping its ordering.
+
+    ``columns`` limits the match to the reference number, the name, or both.
+    """
+    queryset = queryset.filter(tenant=tenant)
+    query = query.strip()
+    if not query:
+        return queryset
+    target = TARGETS_BY_TYPE[entity_type]
+    if _vendor(target.model) == "sqlite" and tenant is not None:
+        return queryset.filter(pk__in=_fts_ids(entity_type, fts_match(query, tenant.pk, columns)))
+    condition = Q(pk__in=[])
+    if "reference" in columns:
+        condition |= Q(**{f"{target.reference}__istartswith": query})
+    if "name" in columns and target.name:
+        condition |= Q(**{f"{target.name}__icontains": query})
+    return queryset.filter(condition)
+
+
+def typeahead(tenant, query, entity_types=None, limit=TYPEAHEAD_LIMIT):
+    """Return up to ``limit`` ranked ``SearchHit`` rows for a partial ``query``.
+
+    Reference-number prefix matches rank first, then borrower names by
+    relevance (bm25 on SQLite, trigram similarity on PostgreSQL).
+    """
+    query = query.strip()
+    if len(query) < MIN_QUERY_LENGTH or tenant is None:
+        return []
+    targets = [TARGETS_BY_TYPE[entity_type] for entity_type in (entity_types or TARGETS_BY_TYPE)]
+    if _vendor(models.RemedialAccount) == "sqlite":
+        return _typeahead_fts(tenant.pk, query, targets, limit)
+
+    hits = []
+    for target in targets:
+        prefix = Q(**{f"{target.reference}__istartswith": query})
+        queryset = target.model.objects.filter(tenant=tenant)
+        if target.name:
+            queryset = queryset.filter(prefix | Q(**{f"{target.name}__icontains": query}))
+            rank = Case(When(prefix, then=Value(2.0)), default=_similarity(target.name, query))
+            name = F(target.name)
+        else:
+            queryset = queryset.filter(prefix)
+            rank = Value(2.0)
+            name = Value("")
+        rows = (
+            queryset.annotate(rank=rank, hit_reference=F(target.reference), hit_name=name)
+            .order_by("-rank", target.reference)
+            .values_list("pk", "hit_reference", "hit_name", "rank")[:limit]
+        )
+        hits.extend((rank, SearchHit(target.entity_type, pk, ref, name)) for pk, ref, name, rank in rows)
+    hits.sort(key=lambda hit: -hit[0])
+    return [hit for _, hit in hits[:limit]]
+
+
+def _similarity(field, query):
+    if _vendor(models.RemedialAccount) != "postgresql":
+        return Value(1.0)
+    return Func(Upper(field), Upper(Value(query)), function="similarity", output_field=FloatField())
+
+
+def _typeahead_fts(tenant_id, query, targets, limit):
+    entity_types = [target.entity_type for target in targets]
+    placeholders = ", ".join(["%s"] * len(entity_types))
+    connection = connections[models.RemedialAccount.objects.db]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT d.entity_type, d.entity_id, f.reference, f.name FROM {FTS_TABLE} f "
+            f"JOIN {DOC_TABLE} d ON d.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND d.entity_type IN ({placeholders}) "
+            f"ORDER BY bm25({FTS_TABLE}, 10.0, 1.0, 0.0) LIMIT %s",
+            [fts_match(query, tenant_id), *entity_types, limit],
+        )
+        rows = cursor.fetchall()
+    return [
+        SearchHit(entity_type, TARGETS_BY_TYPE[entity_type].model._meta.pk.to_python(entity_id), reference, name)
+        for entity_type, entity_id, reference, name in rows
+    ]
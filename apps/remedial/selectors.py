@@ -1,8 +1,17 @@
-from datetime import date, timedelta
-from django.db.models import Prefetch, Q, Count, Sum, Avg, Max, Case, When, F
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import (
+    Prefetch, Q, Count, Sum, Avg, Max, F, Value, CharField, FloatField, DecimalField, DurationField,
+    ExpressionWrapper, OuterRef, Subquery,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf, TruncDate
 from django.utils import timezone
 
-from . import models
+from apps.tenancy.config import get_tenant_config
+
+from . import models, search
 
 
 # ===== BASIC QUERYSET SELECTORS =====
@@ -53,34 +62,156 @@ def dashboard_accounts_overview(tenant, officer=None, stage=None, status=None, d
     return queryset
 
 
+def search_remedial_accounts(tenant, loan_account_no="", borrower_name="", stage=None, status=None, officer=None):
+    """Accounts matching the account search form.
+
+    Text filters go through the search index; stage, status and officer
+    filters are served by the tenant-leading (tenant, stage, status,
+    created_at) and (tenant, assigned_officer, stage, created_at) indexes,
+    which also return the rows in list order.
+    """
+    queryset = models.RemedialAccount.objects.select_related("assigned_officer").order_by("-created_at")
+    queryset = search.filter_queryset(queryset, loan_account_no or "", tenant, columns=("reference",))
+    if borrower_name:
+        queryset = search.filter_queryset(queryset, borrower_name, tenant, columns=("name",))
+    if officer:
+        queryset = queryset.filter(assigned_officer=officer)
+    if stage:
+        queryset = queryset.filter(stage=stage)
+    if status:
+        queryset = queryset.filter(status=status)
+    return queryset
+
+
+DASHBOARD_CACHE_TIMEOUT = 60
+DASHBOARD_OVERVIEW_MODELS = {
+    "accounts_count": models.RemedialAccount,
+    "compromises_count": models.CompromiseAgreement,
+    "legal_cases_count": models.LegalCase,
+    "hearings_count": models.CourtHearing,
+    "recovery_actions_count": models.RecoveryAction,
+    "milestones_count": models.RecoveryMilestone,
+    "write_offs_count": models.WriteOffRequest,
+}
+
+
+def _dashboard_version_key(tenant_id):
+    return f"remedial:dashboard:{tenant_id}:version"
+
+
+def invalidate_dashboard_cache(tenant_id):
+    """Expire cached dashboard data for a tenant after a write."""
+    key = _dashboard_version_key(tenant_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def _cached_for_tenant(tenant, name, build):
+    tenant_id = tenant.pk if tenant else None
+    version = cache.get_or_set(_dashboard_version_key(tenant_id), 1, None)
+    return cache.get_or_set(f"remedial:dashboard:{tenant_id}:{name}:{version}", build, DASHBOARD_CACHE_TIMEOUT)
+
+
+def get_tenant_officers(tenant):
+    """``(id, name)`` pairs for officers assigned to the tenant's accounts, cached per tenant.
+
+    Account writes bump the tenant's dashboard version, so reassignments
+    show up on the next request.
+    """
+    def build():
+        assigned = models.RemedialAccount.objects.filter(tenant=tenant, assigned_officer__isnull=False)
+        officers = (
+            models.User.objects.filter(pk__in=assigned.values("assigned_officer"))
+            .order_by("first_name", "last_name", "username")
+            .only("first_name", "last_name", "username")
+        )
+        return [(officer.pk, officer.get_full_name() or officer.username) for officer in officers]
+
+    return _cached_for_tenant(tenant, "officers", build)
+
+
 def get_dashboard_overview_data(tenant):
-    """Get overview data for the dashboard."""
-    return {
-        'accounts_count': models.RemedialAccount.objects.filter(tenant=tenant).count(),
-        'compromises_count': models.CompromiseAgreement.objects.filter(tenant=tenant).count(),
-        'legal_cases_count': models.LegalCase.objects.filter(tenant=tenant).count(),
-        'hearings_count': models.CourtHearing.objects.filter(tenant=tenant).count(),
-        'recovery_actions_count': models.RecoveryAction.objects.filter(tenant=tenant).count(),
-        'milestones_count': models.RecoveryMilestone.objects.filter(tenant=tenant).count(),
-        'write_offs_count': models.WriteOffRequest.objects.filter(tenant=tenant).count(),
-    }
+    """Get overview data for the dashboard in a single UNION ALL of counts, cached per tenant."""
+    def build():
+        counts = [
+            model.objects.filter(tenant=tenant)
+            .annotate(metric=Value(name, output_field=CharField()))
+            .values("metric")
+            .annotate(total=Count("pk"))
+            .values_list("metric", "total")
+            .order_by()
+            for name, model in DASHBOARD_OVERVIEW_MODELS.items()
+        ]
+        totals = dict(counts[0].union(*counts[1:], all=True))
+        return {name: totals.get(name, 0) for name in DASHBOARD_OVERVIEW_MODELS}
+
+    return _cached_for_tenant(tenant, "overview", build)
+
+
+def with_agreement_totals(queryset):
+    """Annotate agreements with payment and schedule item totals.
+
+    Each total is a correlated subquery aggregated per agreement, so payments
+    and schedule items are never joined together (which would multiply rows).
+    """
+    payments = (
+        models.CompromisePayment.objects.filter(compromise_agreement=OuterRef("pk"))
+        .order_by()
+        .values("compromise_agreement")
+    )
+    items = (
+        models.CompromiseScheduleItem.objects.filter(compromise_agreement=OuterRef("pk"))
+        .order_by()
+        .values("compromise_agreement")
+    )
+    return queryset.annotate(
+        paid_total=Coalesce(
+            Subquery(payments.annotate(total=Sum("amount")).values("total")),
+            Value(Decimal("0")),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        ),
+        item_count=Coalesce(Subquery(items.annotate(total=Count("pk")).values("total")), 0),
+        paid_item_count=Coalesce(
+            Subquery(
+                items.filter(status=models.ScheduleStatus.PAID).annotate(total=Count("pk")).values("total")
+            ),
+            0,
+        ),
+    )
+
 
 def dashboard_compromise_summary(tenant):
     """Compromise agreements summary with status counts and amounts"""
-    return (
-        models.CompromiseAgreement.objects.filter(tenant=tenant)
+    summary = list(
+        with_agreement_totals(models.CompromiseAgreement.objects.filter(tenant=tenant))
         .values("status")
         .annotate(
             count=Count("id"),
             total_settlement=Sum("settlement_amount"),
-            total_paid=Sum("payments__amount", filter=Q(payments__status="success")),
+            total_paid=Sum("paid_total"),
+        )
+        .order_by("status")
+    )
+    # Days from agreement creation to payment, averaged over payments (no join to schedule items).
+    avg_days = dict(
+        models.CompromisePayment.objects.filter(compromise_agreement__tenant=tenant)
+        .values("compromise_agreement__status")
+        .annotate(
             avg_days=Avg(
-                models.F("payments__payment_date") - 
-                models.F("created_at")
+                ExpressionWrapper(
+                    F("payment_date") - TruncDate("compromise_agreement__created_at"),
+                    output_field=DurationField(),
+                )
             )
         )
-        .order_by("status")
+        .values_list("compromise_agreement__status", "avg_days")
+        .order_by()
     )
+    for row in summary:
+        row["avg_days"] = avg_days.get(row["status"])
+    return summary
 
 
 def dashboard_legal_cases_summary(tenant):
@@ -104,8 +235,31 @@ def dashboard_legal_cases_summary(tenant):
 
 # ===== REPORT SELECTORS =====
 
+def _matches_summary_grain(*bounds):
+    """Summary rows are per day, so only whole-date (or absent) bounds can use them."""
+    return all(bound is None or (isinstance(bound, date) and not isinstance(bound, datetime)) for bound in bounds)
+
+
+def _portfolio_summary(tenant, metric, start_date=None, end_date=None):
+    queryset = models.PortfolioSummary.objects.filter(tenant=tenant, metric=metric)
+    if start_date:
+        queryset = queryset.filter(day__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(day__lte=end_date)
+    return queryset
+
+
 def report_accounts_by_stage(tenant, start_date=None, end_date=None):
     """Accounts grouped by stage for reporting"""
+    if _matches_summary_grain(start_date, end_date):
+        return (
+            _portfolio_summary(tenant, models.PortfolioMetric.ACCOUNTS, start_date, end_date)
+            .values("stage", "status")
+            .annotate(count=Sum("count"), total_balance=Sum("amount"))
+            .filter(count__gt=0)
+            .order_by("stage", "status")
+        )
+
     queryset = remedial_accounts_for_tenant(tenant)
     
     if start_date:
@@ -125,6 +279,20 @@ def report_accounts_by_stage(tenant, start_date=None, end_date=None):
 
 def report_compromise_performance(tenant, start_date=None, end_date=None):
     """Compromise agreement performance report"""
+    if _matches_summary_grain(start_date, end_date):
+        return (
+            _portfolio_summary(tenant, models.PortfolioMetric.COMPROMISES, start_date, end_date)
+            .values("status")
+            .annotate(
+                agreements=Sum("count"),
+                total_settlement=Sum("amount"),
+                total_paid=Sum("paid_amount"),
+                completion_rate=Cast(Sum("schedule_items_paid"), FloatField()) / NullIf(Sum("schedule_items"), 0),
+            )
+            .filter(agreements__gt=0)
+            .order_by("status")
+        )
+
     queryset = models.CompromiseAgreement.objects.filter(tenant=tenant)
     
     if start_date:
@@ -133,17 +301,13 @@ def report_compromise_performance(tenant, start_date=None, end_date=None):
         queryset = queryset.filter(compromise_signed_date__lte=end_date)
     
     return (
-        queryset.values("status")
+        with_agreement_totals(queryset)
+        .values("status")
         .annotate(
             agreements=Count("id"),
             total_settlement=Sum("settlement_amount"),
-            total_paid=Sum("payments__amount", filter=Q(payments__status="success")),
-            completion_rate=Sum(
-                Case(
-                    When(schedule_items__status="paid", then=1),
-                    default=0
-                )
-            ) / Count("schedule_items")
+            total_paid=Sum("paid_total"),
+            completion_rate=Cast(Sum("paid_item_count"), FloatField()) / NullIf(Sum("item_count"), 0),
         )
         .order_by("status")
     )
@@ -151,6 +315,16 @@ def report_compromise_performance(tenant, start_date=None, end_date=None):
 
 def report_payments_summary(tenant, start_date=None, end_date=None):
     """Compromise payments summary report"""
+    if _matches_summary_grain(start_date, end_date):
+        return (
+            _portfolio_summary(tenant, models.PortfolioMetric.PAYMENTS, start_date, end_date)
+            .values(compromise_agreement__status=F("status"))
+            .annotate(count=Sum("count"), total_amount=Sum("amount"))
+            .filter(count__gt=0)
+            .annotate(avg_amount=F("total_amount") / F("count"))
+            .order_by("compromise_agreement__status")
+        )
+
     queryset = models.CompromisePayment.objects.filter(
         compromise_agreement__tenant=tenant
     )
@@ -189,8 +363,10 @@ def accounts_in_compromise_stage(tenant):
     )
 
 
-def accounts_needing_hearing_reminders(tenant, days_ahead=7):
-    """Accounts with scheduled hearings in next N days"""
+def accounts_needing_hearing_reminders(tenant, days_ahead=None):
+    """Accounts with scheduled hearings in next N days (default: tenant's ``hearing_reminder_days``)"""
+    if days_ahead is None:
+        days_ahead = get_tenant_config(tenant)["hearing_reminder_days"]
     return (
         models.CourtHearing.objects.filter(
             legal_case__tenant=tenant,
@@ -217,9 +393,14 @@ def accounts_with_overdue_milestones(tenant):
 
 # ===== MONITORING & ALERT SELECTORS =====
 
-def active_compromises_needing_reminders(tenant, grace_days=3, default_threshold=30):
+def active_compromises_needing_reminders(tenant, grace_days=None, default_threshold=None):
     """Compromises that need reminder notifications"""
     today = timezone.now().date()
+    config = get_tenant_config(tenant)
+    if grace_days is None:
+        grace_days = config["compromise_grace_days"]
+    if default_threshold is None:
+        default_threshold = config["compromise_default_threshold_days"]
     
     due_items = (
         models.CompromiseScheduleItem.objects.filter(
@@ -258,8 +439,10 @@ def active_compromises_needing_reminders(tenant, grace_days=3, default_threshold
     return {"due_items": due_items, "overdue_items": overdue_items}
 
 
-def upcoming_hearings(tenant, days_ahead=14):
-    """Hearings scheduled in next N days"""
+def upcoming_hearings(tenant, days_ahead=None):
+    """Hearings scheduled in next N days (default: tenant's ``upcoming_hearings_days``)"""
+    if days_ahead is None:
+        days_ahead = get_tenant_config(tenant)["upcoming_hearings_days"]
     return (
         models.CourtHearing.objects.filter(
             legal_case__tenant=tenant,
@@ -332,41 +515,50 @@ def notification_log_for_entity(tenant, entity_type, entity_id):
     return base
 
 
-def document_history_for_entity(tenant, entity_type, entity_id):
-    """Document upload history for entity"""
-    return (
-        models.RemedialDocument.objects.filter(
-            entity_type=entity_type,
-            entity_id=entity_id,
-            is_deleted=False,
-        )
-        .select_related("uploaded_by")
-        .order_by("-version", "-uploaded_at")
+def document_history_for_entity(tenant, entity_type, entity_id, latest_only=False):
+    """Document upload history for entity; ``latest_only`` keeps the current version of each"""
+    documents = models.RemedialDocument.objects.filter(
+        tenant=tenant,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        is_deleted=False,
     )
+    if latest_only:
+        documents = documents.filter(is_latest=True)
+    return documents.select_related("uploaded_by").order_by("-version", "-uploaded_at")
 
 
-def audit_trail_for_entity(tenant, entity_type, entity_id):
-    """Audit trail for specific entity"""
-    return (
-        models.AuditLog.objects.filter(
-            entity_type=entity_type,
-            entity_id=entity_id,
-        )
-        .select_related("actor")
-        .order_by("-created_at")
+def audit_trail_for_entity(tenant, entity_type, entity_id, since=None, until=None):
+    """Audit trail for specific entity, newest first.
+
+    The full trail by default. Pass ``since``/``until`` to bound it by
+    ``created_at``, so PostgreSQL only scans the monthly audit log
+    partitions in range.
+    """
+    queryset = models.AuditLog.objects.filter(
+        tenant=tenant,
+        entity_type=entity_type,
+        entity_id=str(entity_id),
     )
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    if until is not None:
+        queryset = queryset.filter(created_at__lt=until)
+    return queryset.select_related("actor").order_by("-created_at")
 
 
 # ===== STATISTICAL SELECTORS =====
 
 def summary_statistics(tenant):
     """High-level statistics for tenant"""
+    accounts = _portfolio_summary(tenant, models.PortfolioMetric.ACCOUNTS).aggregate(total=Sum("count"))
+    compromises = _portfolio_summary(tenant, models.PortfolioMetric.COMPROMISES).filter(
+        status__in=[models.CompromiseStatus.APPROVED, models.CompromiseStatus.ACTIVE]
+    ).aggregate(count=Sum("count"), settlement=Sum("amount"))
     return {
-        "total_accounts": remedial_accounts_for_tenant(tenant).count(),
-        "active_compromises": active_compromise_agreements(tenant).count(),
-        "total_settlement": active_compromise_agreements(tenant).aggregate(
-            total=Sum("settlement_amount")
-        )["total"] or 0,
+        "total_accounts": accounts["total"] or 0,
+        "active_compromises": compromises["count"] or 0,
+        "total_settlement": compromises["settlement"] or 0,
         "legal_cases": models.LegalCase.objects.filter(tenant=tenant).count(),
         "recovery_actions": models.RecoveryAction.objects.filter(tenant=tenant).count(),
         "write_off_requests": models.WriteOffRequest.objects.filter(tenant=tenant).count(),
@@ -393,9 +585,11 @@ def trend_data(tenant, days=30):
 
 
 def get_dashboard_metrics(tenant):
-    """Get comprehensive dashboard metrics"""
-    return {
+    """Get comprehensive dashboard metrics, cached per tenant"""
+    from .services import DataQualityService
+
+    return _cached_for_tenant(tenant, "metrics", lambda: {
         "summary": summary_statistics(tenant),
         "trends": trend_data(tenant, 30),
         "quality_issues": DataQualityService.run_data_quality_checks(tenant)
-    }
+    })
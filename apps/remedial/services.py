@@ -1,9 +1,20 @@
+import hashlib
 import logging
-from datetime import timedelta
+import os
+from collections import defaultdict, namedtuple
+from copy import copy
+from datetime import datetime, timedelta
 from django.core.exceptions import ValidationError, PermissionDenied
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 
+from apps.core import audit
+from apps.core.files import HashingFile
 from apps.core.models import AuditLog
+from apps.tenancy.models import Tenant
 
 from . import models
 
@@ -13,43 +24,31 @@ logger = logging.getLogger(__name__)
 # ===== AUDIT LOGGING UTILITIES =====
 
 def _record_audit(actor, tenant, entity, entity_id, action, notes="", before=None, after=None):
-    """Create audit log entry with metadata"""
-    return AuditLog.objects.create(
+    """Queue an audit log entry; it is written when the request or batch ends."""
+    return audit.record(
         tenant=tenant,
         actor=actor,
         entity_type=entity,
-        entity_id=str(entity_id),
+        entity_id=entity_id,
         action=action,
         notes=notes,
-        before_json=before,
-        after_json=after,
+        before=before,
+        after=after,
     )
 
 
 def _record_model_change(actor, tenant, model_instance, action, notes=""):
-    """Record model change in audit log"""
-    before_data = {}
-    after_data = {}
-    
-    if hasattr(model_instance, '_orig_data'):
-        before_data = model_instance._orig_data
-    
-    model_data = {}
-    for field in model_instance._meta.fields:
-        if not field.primary_key:
-            model_data[field.name] = getattr(model_instance, field.name)
-    
-    after_data = model_data
-    
-    _record_audit(
+    """Audit the fields changed by the instance's last save as a compact diff."""
+    before, after = audit.encode_changes(model_instance.saved_changes, created=model_instance.saved_created)
+    return _record_audit(
         actor=actor,
         tenant=tenant,
-        entity=model_instance._meta.model_name,
+        entity=type(model_instance).__name__,
         entity_id=model_instance.pk,
         action=action,
         notes=notes,
-        before_json=before_data,
-        after_json=after_data,
+        before=before,
+        after=after,
     )
 
 
@@ -72,11 +71,10 @@ class RemedialAccountService:
             **kwargs
         )
         
-        _record_audit(
+        _record_model_change(
             actor=None,  # Will be set by view
             tenant=tenant,
-            entity="RemedialAccount",
-            entity_id=account.pk,
+            model_instance=account,
             action=AuditLog.Action.CREATE,
             notes=f"Created account for {borrower_name}",
         )
@@ -99,11 +97,10 @@ class RemedialAccountService:
         
         account.save(update_fields=["stage", "status", "closed_at"])
         
-        _record_audit(
+        _record_model_change(
             actor=user,
             tenant=account.tenant,
-            entity="RemedialAccount",
-            entity_id=account.pk,
+            model_instance=account,
             action=AuditLog.Action.STATE_CHANGE,
             notes=f"Stage changed from {old_stage} to {new_stage}. {notes}",
         )
@@ -117,11 +114,10 @@ class RemedialAccountService:
         account.assigned_officer = officer
         account.save(update_fields=["assigned_officer"])
         
-        _record_audit(
+        _record_model_change(
             actor=user,
             tenant=account.tenant,
-            entity="RemedialAccount",
-            entity_id=account.pk,
+            model_instance=account,
             action=AuditLog.Action.UPDATE,
             notes=f"Officer changed from {old_officer} to {officer}",
         )
@@ -157,11 +153,10 @@ class CompromiseAgreementService:
             **kwargs
         )
         
-        _record_audit(
+        _record_model_change(
             actor=user,
             tenant=tenant,
-            entity="CompromiseAgreement",
-            entity_id=compromise.pk,
+            model_instance=compromise,
             action=AuditLog.Action.CREATE,
             notes=f"Created compromise {agreement_no} for {remedial_account.loan_account_no}",
         )
@@ -183,11 +178,10 @@ class CompromiseAgreementService:
         compromise.is_active = True
         compromise.save()
         
-        _record_audit(
+        _record_model_change(
             actor=checker_user,
             tenant=compromise.tenant,
-            entity="CompromiseAgreement",
-            entity_id=compromise.pk,
+            model_instance=compromise,
             action=AuditLog.Action.STATE_CHANGE,
             notes="Approved compromise agreement",
         )
@@ -230,17 +224,35 @@ class CompromiseAgreementService:
                 schedule_item.status = models.ScheduleStatus.PARTIAL
             schedule_item.save(update_fields=["amount_paid", "status"])
         
-        _record_audit(
+        _record_model_change(
             actor=user,
             tenant=compromise.tenant,
-            entity="CompromisePayment",
-            entity_id=payment.pk,
+            model_instance=payment,
             action=AuditLog.Action.CREATE,
             notes=f"Recorded payment of {amount}",
         )
         
         return payment
     
+    @staticmethod
+    def mark_as_defaulted(compromise: models.CompromiseAgreement, user=None):
+        """Mark compromise agreement as defaulted"""
+        if compromise.status not in {models.CompromiseStatus.APPROVED, models.CompromiseStatus.ACTIVE}:
+            return False
+        
+        compromise.status = models.CompromiseStatus.DEFAULTED
+        compromise.save(update_fields=["status", "updated_at"])
+        
+        _record_model_change(
+            actor=user,
+            tenant=compromise.tenant,
+            model_instance=compromise,
+            action=AuditLog.Action.STATE_CHANGE,
+            notes="Compromise marked as defaulted",
+        )
+        
+        return True
+    
     @staticmethod
     def check_compromise_completion(compromise: models.CompromiseAgreement):
         """Check if compromise agreement is fully completed"""
@@ -255,11 +267,10 @@ class CompromiseAgreementService:
             compromise.status = models.CompromiseStatus.COMPLETED
             compromise.save(update_fields=["status"])
             
-            _record_audit(
+            _record_model_change(
                 actor=None,
                 tenant=compromise.tenant,
-                entity="CompromiseAgreement",
-                entity_id=compromise.pk,
+                model_instance=compromise,
                 action=AuditLog.Action.STATE_CHANGE,
                 notes="Compromise marked as completed",
             )
@@ -297,11 +308,10 @@ class ScheduleItemService:
             amount_due=amount_due,
         )
         
-        _record_audit(
+        _record_model_change(
             actor=user,
             tenant=compromise.tenant,
-            entity="CompromiseScheduleItem",
-            entity_id=schedule_item.pk,
+            model_instance=schedule_item,
             action=AuditLog.Action.CREATE,
             notes=f"Created schedule item #{seq_no}",
         )
@@ -320,11 +330,10 @@ class ScheduleItemService:
             schedule_item.status = models.ScheduleStatus.OVERDUE
             schedule_item.save(update_fields=["status"])
             
-            _record_audit(
+            _record_model_change(
                 actor=None,
                 tenant=schedule_item.compromise_agreement.tenant,
-                entity="CompromiseScheduleItem",
-                entity_id=schedule_item.pk,
+                model_instance=schedule_item,
                 action=AuditLog.Action.STATE_CHANGE,
                 notes=f"Marked overdue ({overdue_days} days)",
             )
@@ -336,6 +345,132 @@ class ScheduleItemService:
                 
             return True
         return False
+    
+    @staticmethod
+    def mark_overdue_schedule_items(queryset=None, today=None, chunk_size=1000):
+        """Set-based overdue/default detection for schedule items.
+        
+        Marks unpaid DUE/PARTIAL items past their agreement's grace period as
+        OVERDUE and defaults approved/active agreements holding an unpaid item
+        that is past the grace period and ``default_threshold_days``, like
+        ``detect_schedule_default``. Matching rows are locked, read and updated
+        in primary key chunks of ``chunk_size``, so no query carries more than
+        ``chunk_size`` ids. Audit entries go through one ``audit.batch()``. ``queryset`` limits the scan to a subset of
+        schedule items (it must not filter on status). Returns
+        ``{tenant_id: {"overdue": n, "defaulted": n}}``.
+        """
+        today = today or timezone.now().date()
+        now = timezone.now()
+        if queryset is None:
+            queryset = models.CompromiseScheduleItem.objects.all()
+        
+        unpaid = queryset.filter(amount_paid__lt=F("amount_due"))
+        open_items = unpaid.filter(status__in=[models.ScheduleStatus.DUE, models.ScheduleStatus.PARTIAL])
+        defaultable = unpaid.filter(
+            status__in=[
+                models.ScheduleStatus.DUE,
+                models.ScheduleStatus.PARTIAL,
+                models.ScheduleStatus.OVERDUE,
+            ],
+            compromise_agreement__status__in=[
+                models.CompromiseStatus.APPROVED,
+                models.CompromiseStatus.ACTIVE,
+            ],
+        )
+        
+        counts = defaultdict(lambda: {"overdue": 0, "defaulted": 0})
+        
+        with transaction.atomic(), audit.batch():
+            # One condition per distinct grace period, OR-ed into a single predicate.
+            past_grace = Q(pk__in=[])
+            grace_values = (
+                open_items.order_by()
+                .values_list("compromise_agreement__grace_days", flat=True)
+                .distinct()
+            )
+            for grace_days in list(grace_values):
+                past_grace |= Q(
+                    compromise_agreement__grace_days=grace_days,
+                    due_date__lt=today - timedelta(days=grace_days),
+                )
+            overdue = open_items.filter(past_grace).order_by("pk")
+            after = None
+            while True:
+                page = overdue.filter(pk__gt=after) if after is not None else overdue
+                rows = list(
+                    page.select_for_update(of=("self",))
+                    .values_list("pk", "compromise_agreement__tenant_id", "due_date", "status")[:chunk_size]
+                )
+                if not rows:
+                    break
+                after = rows[-1][0]
+                models.CompromiseScheduleItem.objects.filter(pk__in=[pk for pk, _, _, _ in rows]).update(
+                    status=models.ScheduleStatus.OVERDUE, updated_at=now
+                )
+                for pk, tenant_id, due_date, status in rows:
+                    counts[tenant_id]["overdue"] += 1
+                    _record_audit(
+                        actor=None,
+                        tenant=Tenant(pk=tenant_id) if tenant_id else None,
+                        entity="CompromiseScheduleItem",
+                        entity_id=pk,
+                        action=AuditLog.Action.STATE_CHANGE,
+                        notes=f"Marked overdue ({(today - due_date).days} days)",
+                        before={"status": status},
+                        after={"status": models.ScheduleStatus.OVERDUE},
+                    )
+            
+            # An item only counts towards default once it is also past its grace period.
+            past_threshold = Q(pk__in=[])
+            limits = (
+                defaultable.order_by()
+                .values_list("compromise_agreement__grace_days", "compromise_agreement__default_threshold_days")
+                .distinct()
+            )
+            for grace_days, threshold_days in list(limits):
+                past_threshold |= Q(
+                    compromise_agreement__grace_days=grace_days,
+                    compromise_agreement__default_threshold_days=threshold_days,
+                    due_date__lt=today - timedelta(days=grace_days),
+                    due_date__lte=today - timedelta(days=threshold_days),
+                )
+            defaulting = models.CompromiseAgreement.objects.filter(
+                status__in=[models.CompromiseStatus.APPROVED, models.CompromiseStatus.ACTIVE],
+                pk__in=defaultable.filter(past_threshold).order_by().values("compromise_agreement_id"),
+            ).order_by("pk")
+            after = None
+            while True:
+                page = defaulting.filter(pk__gt=after) if after is not None else defaulting
+                before = list(page.select_for_update()[:chunk_size])
+                if not before:
+                    break
+                after = before[-1].pk
+                # The UPDATE bypasses signals; move the portfolio summary figures explicitly.
+                models.CompromiseAgreement.objects.filter(pk__in=[agreement.pk for agreement in before]).update(
+                    status=models.CompromiseStatus.DEFAULTED, updated_at=now
+                )
+                for agreement in before:
+                    changed = copy(agreement)
+                    changed.status = models.CompromiseStatus.DEFAULTED
+                    PortfolioSummaryService.move(agreement, changed)
+                    counts[agreement.tenant_id]["defaulted"] += 1
+                    _record_audit(
+                        actor=None,
+                        tenant=Tenant(pk=agreement.tenant_id) if agreement.tenant_id else None,
+                        entity="CompromiseAgreement",
+                        entity_id=agreement.pk,
+                        action=AuditLog.Action.STATE_CHANGE,
+                        notes="Compromise marked as defaulted",
+                        before={"status": agreement.status},
+                        after={"status": models.CompromiseStatus.DEFAULTED},
+                    )
+
+        # Queryset updates bypass model signals, so expire dashboards explicitly.
+        from .selectors import invalidate_dashboard_cache
+        for tenant_id in counts:
+            invalidate_dashboard_cache(tenant_id)
+        
+        return dict(counts)
 
 
 # ===== LEGAL CASE SERVICES =====
@@ -355,11 +490,10 @@ class LegalCaseService:
             **kwargs
         )
         
-        _record_audit(
+        _record_model_change(
             actor=user,
             tenant=tenant,
-            entity="LegalCase",
-            entity_id=legal_case.pk,
+            model_instance=legal_case,
             action=AuditLog.Action.CREATE,
             notes=f"Created legal case for {remedial_account.loan_account_no}",
         )
@@ -377,17 +511,32 @@ class LegalCaseService:
         legal_case.status = models.LegalCaseStatus.FILED
         legal_case.save()
         
-        _record_audit(
+        _record_model_change(
             actor=user,
             tenant=legal_case.tenant,
-            entity="LegalCase",
-            entity_id=legal_case.pk,
+            model_instance=legal_case,
             action=AuditLog.Action.STATE_CHANGE,
             notes=f"Filed case {case_number}",
         )
         
         return legal_case
 
+    @staticmethod
+    def refresh_next_hearing_date(legal_case_ids, today=None):
+        """Recompute ``next_hearing_date`` for the given cases in one UPDATE."""
+        legal_case_ids = [pk for pk in legal_case_ids if pk is not None]
+        if not legal_case_ids:
+            return 0
+        today = today or timezone.now().date()
+        next_hearing = models.CourtHearing.objects.filter(
+            legal_case=OuterRef("pk"),
+            status="scheduled",
+            hearing_date__gte=today,
+        ).order_by("hearing_date", "pk")
+        return models.LegalCase.objects.filter(pk__in=legal_case_ids).update(
+            next_hearing_date=Subquery(next_hearing.values("hearing_date")[:1])
+        )
+
 
 # ===== RECOVERY ACTION SERVICES =====
 
@@ -422,11 +571,10 @@ class RecoveryActionService:
                 notes="Initiated dacion action"
             )
         
-        _record_audit(
+        _record_model_change(
             actor=user,
             tenant=tenant,
-            entity="RecoveryAction",
-            entity_id=recovery_action.pk,
+            model_instance=recovery_action,
             action=AuditLog.Action.CREATE,
             notes=f"Initiated {action_type} action",
         )
@@ -449,11 +597,10 @@ class RecoveryActionService:
             **kwargs
         )
         
-        _record_audit(
+        _record_model_change(
             actor=user,
             tenant=milestone.recovery_action.tenant,
-            entity="RecoveryMilestone",
-            entity_id=milestone.pk,
+            model_instance=milestone,
             action=AuditLog.Action.CREATE,
             notes=f"Created milestone {milestone_type}",
         )
@@ -477,11 +624,10 @@ class WriteOffService:
             **kwargs
         )
         
-        _record_audit(
+        _record_model_change(
             actor=user,
             tenant=tenant,
-            entity="WriteOffRequest",
-            entity_id=write_off.pk,
+            model_instance=write_off,
             action=AuditLog.Action.CREATE,
             notes=f"Recommended write-off for {remedial_account.loan_account_no}",
         )
@@ -506,11 +652,10 @@ class WriteOffService:
         write_off.board_decision_date = timezone.now().date()
         write_off.save()
         
-        _record_audit(
+        _record_model_change(
             actor=user,
             tenant=write_off.tenant,
-            entity="WriteOffRequest",
-            entity_id=write_off.pk,
+            model_instance=write_off,
             action=AuditLog.Action.STATE_CHANGE,
             notes=f"{notes} write-off",
         )
@@ -520,34 +665,278 @@ class WriteOffService:
 
 # ===== NOTIFICATION SERVICES =====
 
+Notification = namedtuple("Notification", ["tenant_id", "entity_id", "sent_to", "message", "row"], defaults=[()])
+
+
 class NotificationService:
     """Service for managing notifications"""
     
+    MAX_DELIVERY_ATTEMPTS = 5
+    RETRY_BACKOFF = timedelta(minutes=1)
+    # How long a claimed entry stays with its worker before another may retry it.
+    SEND_LEASE = timedelta(minutes=10)
+
     @staticmethod
-    def send_notification(rule: models.NotificationRule, entity_type: str, entity_id, sent_to: str, message: str):
-        """Send notification with error handling"""
-        status = models.NotificationLogStatus.SENT
-        error_text = ""
-        
+    def idempotency_key(rule_code, entity_type, entity_id, sent_to, on_date):
+        """Stable key so a (rule, entity, recipient, date) is queued at most once"""
+        raw = f"{rule_code}|{entity_type}|{entity_id}|{sent_to}|{on_date.isoformat()}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @staticmethod
+    def digest_key(rule_code, entity_type, tenant_id, sent_to, on_date, sequence=0):
+        """Key of the ``sequence``-th digest of a day; a new one opens once the previous is released"""
+        suffix = f":{sequence}" if sequence else ""
+        return NotificationService.idempotency_key(
+            rule_code, f"{entity_type}:digest{suffix}", tenant_id, sent_to, on_date
+        )
+
+    @staticmethod
+    def queue_notifications(rule: models.NotificationRule, entity_type: str, notifications, today=None, columns=()):
+        """Queue notifications in the outbox as part of the caller's transaction.
+
+        ``notifications`` is an iterable of ``(tenant_id, entity_id, sent_to, message)``
+        with an optional fifth ``row`` of values for the digest table described by
+        ``columns``. Entries already queued for the same rule, entity, recipient and
+        day are ignored. Digest rules collect one message per recipient instead.
+        Returns the set of entity ids queued by this call, so callers stamp only those.
+        """
+        today = today or timezone.now().date()
+        notifications = [Notification(*notification) for notification in notifications]
+        if rule.delivery_mode == models.NotificationDeliveryMode.DIGEST:
+            return NotificationService._queue_digests(rule, entity_type, notifications, today, columns)
+        entries = [
+            models.NotificationOutbox(
+                tenant_id=notification.tenant_id,
+                idempotency_key=NotificationService.idempotency_key(
+                    rule.rule_code, entity_type, notification.entity_id, notification.sent_to, today
+                ),
+                rule_code=rule.rule_code,
+                entity_type=entity_type,
+                entity_id=notification.entity_id,
+                sent_to=notification.sent_to,
+                subject=f"[{rule.rule_code}] {notification.message}"[:255],
+                message=notification.message,
+            )
+            for notification in notifications
+        ]
+        models.NotificationOutbox.objects.bulk_create(entries, ignore_conflicts=True)
+        return {notification.entity_id for notification in notifications}
+
+    @staticmethod
+    def _queue_digests(rule, entity_type, notifications, today, columns):
+        """Append notifications to one collecting digest per tenant and recipient.
+
+        Entities already in one of the day's digests are skipped. Once the
+        day's digest has been released, later notifications open the next one
+        in sequence instead of being dropped.
+        """
+        grouped = defaultdict(list)
+        for notification in notifications:
+            grouped[(notification.tenant_id, notification.sent_to)].append(notification)
+
+        digests = defaultdict(list)
+        searching, sequence = set(grouped), 0
+        while searching:
+            keys = {
+                NotificationService.digest_key(rule.rule_code, entity_type, *group, today, sequence): group
+                for group in searching
+            }
+            found = list(models.NotificationOutbox.objects.select_for_update().filter(idempotency_key__in=keys))
+            for entry in found:
+                digests[keys[entry.idempotency_key]].append(entry)
+            searching = {keys[entry.idempotency_key] for entry in found}
+            sequence += 1
+
+        header = " | ".join(columns)
+        added, created, updated = {}, {}, []
+        for group, group_notifications in grouped.items():
+            entries = digests[group]
+            included = {entity_id for entry in entries for entity_id in entry.entity_ids}
+            new = []
+            for notification in group_notifications:
+                if str(notification.entity_id) not in included:
+                    included.add(str(notification.entity_id))
+                    new.append(notification)
+            if not new:
+                continue
+            if entries and entries[-1].status == models.NotificationOutboxStatus.COLLECTING:
+                entry = entries[-1]
+                updated.append(entry)
+            else:
+                tenant_id, sent_to = group
+                entry = models.NotificationOutbox(
+                    tenant_id=tenant_id,
+                    idempotency_key=NotificationService.digest_key(
+                        rule.rule_code, entity_type, tenant_id, sent_to, today, len(entries)
+                    ),
+                    rule_code=rule.rule_code,
+                    entity_type=entity_type,
+                    sent_to=sent_to,
+                    status=models.NotificationOutboxStatus.COLLECTING,
+                    message=f"{header}\n" if header else "",
+                )
+                created[group] = entry
+            for notification in new:
+                entry.entity_ids.append(str(notification.entity_id))
+                line = " | ".join(str(value) for value in notification.row) or notification.message
+                entry.message += f"{line}\n"
+            entry.subject = f"[{rule.rule_code}] {len(entry.entity_ids)} {entity_type} notifications"
+            entry.updated_at = timezone.now()
+            added[group] = new
+        models.NotificationOutbox.objects.bulk_update(updated, ["entity_ids", "message", "subject", "updated_at"])
+
+        # A concurrent shard may have opened the same digest first; its row wins
+        # the conflict and this group's notifications are appended to it instead.
+        models.NotificationOutbox.objects.bulk_create(created.values(), ignore_conflicts=True)
+        stored = dict(
+            models.NotificationOutbox.objects.filter(
+                idempotency_key__in=[entry.idempotency_key for entry in created.values()]
+            ).values_list("idempotency_key", "entity_ids")
+        )
+        queued = set()
+        for group, new in added.items():
+            entry = created.get(group)
+            if entry is not None and stored.get(entry.idempotency_key) != entry.entity_ids:
+                queued |= NotificationService._queue_digests(rule, entity_type, new, today, columns)
+            else:
+                queued.update(notification.entity_id for notification in new)
+        return queued
+
+    @staticmethod
+    def already_notified(rule_code, entity_type, entity_ids, since):
+        """Return the subset of ``entity_ids`` already notified under ``rule_code`` since ``since``.
+
+        Uses one query per call: delivered ``NotificationLog`` rows (via the
+        ``(rule_code, entity_type, entity_id)`` index) united with outbox entries
+        still queued for delivery.
+        """
+        uuid_field = models.NotificationLog._meta.get_field("entity_id")
+        by_uuid = {uuid_field.to_python(entity_id): entity_id for entity_id in entity_ids}
+        if not by_uuid:
+            return set()
+        delivered = models.NotificationLog.objects.filter(
+            rule_code=rule_code,
+            entity_type=entity_type,
+            entity_id__in=list(by_uuid),
+            status=models.NotificationLogStatus.SENT,
+            sent_at__gte=since,
+        ).values_list("entity_id", flat=True)
+        queued = models.NotificationOutbox.objects.filter(
+            rule_code=rule_code,
+            entity_type=entity_type,
+            entity_id__in=list(by_uuid),
+            status=models.NotificationOutboxStatus.PENDING,
+            created_at__gte=since,
+        ).values_list("entity_id", flat=True)
+        return {by_uuid[entity_id] for entity_id in delivered.union(queued)}
+
+    @staticmethod
+    def release_digests(rule_codes, now=None):
+        """Hand collected digests to the delivery worker once a run has finished"""
+        now = now or timezone.now()
+        return models.NotificationOutbox.objects.filter(
+            rule_code__in=rule_codes,
+            status=models.NotificationOutboxStatus.COLLECTING,
+        ).update(status=models.NotificationOutboxStatus.PENDING, next_attempt_at=now, updated_at=now)
+
+    @staticmethod
+    def queue_notification(rule: models.NotificationRule, entity_type: str, entity_id, sent_to: str, message: str, tenant=None):
+        """Queue a single notification for delivery"""
+        tenant_id = tenant.pk if tenant else None
+        return NotificationService.queue_notifications(
+            rule, entity_type, [(tenant_id, entity_id, sent_to, message)]
+        )
+
+    @staticmethod
+    def deliver_pending_notifications(batch_size=100, now=None):
+        """Deliver one batch of due outbox entries over a single mail connection.
+
+        Rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` where supported,
+        marked SENDING and committed, so several delivery workers can drain the
+        outbox concurrently without holding locks while talking to the mail server.
+        Each result is then recorded in its own short transaction. A claim that is
+        never recorded (a crashed worker) is picked up again after ``SEND_LEASE``.
+        Failed sends are retried with exponential backoff until ``MAX_DELIVERY_ATTEMPTS``.
+        """
+        now = now or timezone.now()
+        counts = {"sent": 0, "retried": 0, "failed": 0}
+        with transaction.atomic():
+            entries = list(
+                models.NotificationOutbox.objects.select_for_update(skip_locked=True)
+                .filter(
+                    status__in=[models.NotificationOutboxStatus.PENDING, models.NotificationOutboxStatus.SENDING],
+                    next_attempt_at__lte=now,
+                )
+                .order_by("next_attempt_at", "pk")[:batch_size]
+            )
+            if not entries:
+                return counts
+            for entry in entries:
+                entry.status = models.NotificationOutboxStatus.SENDING
+                entry.attempts += 1
+                entry.next_attempt_at = now + NotificationService.SEND_LEASE
+                entry.updated_at = now
+            models.NotificationOutbox.objects.bulk_update(
+                entries, ["status", "attempts", "next_attempt_at", "updated_at"]
+            )
+
+        # An unreachable mail server fails every claimed entry, with the usual backoff.
+        mail_connection = get_connection()
         try:
-            logger.info("[Notification] %s → %s (%s)", rule.rule_code, sent_to, message)
-            # TODO: Implement actual email sending here
+            mail_connection.open()
+            connection_error = None
         except Exception as exc:
-            status = models.NotificationLogStatus.FAILED
-            error_text = str(exc)
-            logger.error("Notification failed: %s", exc, exc_info=True)
-        
-        notification_log = models.NotificationLog.objects.create(
-            rule_code=rule.rule_code,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            sent_to=sent_to,
-            status=status,
-            error=error_text,
+            logger.error("Could not open mail connection: %s", exc, exc_info=True)
+            connection_error = exc
+
+        try:
+            for entry in entries:
+                error = connection_error
+                if error is None:
+                    email = EmailMessage(entry.subject, entry.message, to=[entry.sent_to], connection=mail_connection)
+                    try:
+                        mail_connection.send_messages([email])
+                    except Exception as exc:
+                        logger.error("Notification %s failed: %s", entry.pk, exc, exc_info=True)
+                        error = exc
+                counts[NotificationService._record_delivery(entry, error, now)] += 1
+        finally:
+            if connection_error is None:
+                mail_connection.close()
+        return counts
+
+    @staticmethod
+    @transaction.atomic
+    def _record_delivery(entry, error, now):
+        """Store the outcome of one claimed send; returns the ``counts`` key it falls under"""
+        entry.updated_at = now
+        if error is not None:
+            entry.last_error = str(error)
+            if entry.attempts < NotificationService.MAX_DELIVERY_ATTEMPTS:
+                entry.status = models.NotificationOutboxStatus.PENDING
+                entry.next_attempt_at = now + NotificationService.RETRY_BACKOFF * 2 ** (entry.attempts - 1)
+                entry.save(update_fields=["status", "next_attempt_at", "last_error", "updated_at"])
+                return "retried"
+            entry.status = models.NotificationOutboxStatus.FAILED
+            log_status = models.NotificationLogStatus.FAILED
+        else:
+            entry.status = models.NotificationOutboxStatus.SENT
+            entry.sent_at = now
+            entry.last_error = ""
+            log_status = models.NotificationLogStatus.SENT
+        entry.save(update_fields=["status", "last_error", "sent_at", "updated_at"])
+        models.NotificationLog.objects.create(
+            tenant_id=entry.tenant_id,
+            rule_code=entry.rule_code,
+            entity_type=entry.entity_type,
+            entity_id=entry.entity_id,
+            entity_ids=entry.entity_ids,
+            sent_to=entry.sent_to,
+            status=log_status,
+            error=entry.last_error,
         )
-        
-        return notification_log
-    
+        return "sent" if log_status == models.NotificationLogStatus.SENT else "failed"
+
     @staticmethod
     def send_scheduled_reminders(tenant):
         """Send scheduled reminder notifications"""
@@ -579,46 +968,131 @@ class DocumentService:
         uploaded_by,
         is_confidential=True
     ):
-        """Upload document with version control"""
-        # Calculate file hash
-        import hashlib
-        file_hash = hashlib.sha256(file_obj.read()).hexdigest()
-        file_obj.seek(0)
-        
-        # Check for existing version
-        latest_doc = (
-            models.RemedialDocument.objects
-            .filter(entity_type=entity_type, entity_id=entity_id, doc_type=doc_type)
-            .order_by("-version", "-uploaded_at")
-            .first()
-        )
-        
-        version = (latest_doc.version + 1) if latest_doc else 1
-        
-        # Create new document version
-        document = models.RemedialDocument.objects.create(
+        """Upload document with version control.
+
+        The file is streamed to storage in chunks that are hashed on the way,
+        so it is read once and never held in memory. Storage is content
+        addressed: a file the tenant already uploaded is not stored again,
+        the document just takes another reference to its ``DocumentBlob``.
+        """
+        document = models.RemedialDocument(
             tenant=tenant,
             entity_type=entity_type,
             entity_id=entity_id,
             doc_type=doc_type,
-            file=file_obj,
-            file_hash=file_hash,
             uploaded_by=uploaded_by,
-            version=version,
+            is_latest=True,
             is_confidential=is_confidential,
         )
+        # Stored before the version is assigned so the counter lock is not held during I/O.
+        content = HashingFile(file_obj)
+        document.original_name = os.path.basename(file_obj.name)
+        document.file.save(document.original_name, content, save=False)
+        document.file_hash = content.hexdigest()
+        document.file_size = content.bytes_read
+        # On failure the stored file is left for sweep_unreferenced_files: a
+        # concurrent upload of the same content may already be using it.
+        with transaction.atomic():
+            counter = DocumentService._lock_version_counter(document)
+            counter.last_version += 1
+            counter.save(update_fields=["last_version", "updated_at"])
+            document.version = counter.last_version
+            models.RemedialDocument.objects.filter(
+                tenant=tenant, entity_type=entity_type, entity_id=entity_id, doc_type=doc_type, is_latest=True
+            ).update(is_latest=False)
+            document.blob = DocumentService.acquire_blob(
+                tenant, document.file.name, document.file_hash, document.file_size
+            )
+            document.save()
         
-        _record_audit(
+        _record_model_change(
             actor=uploaded_by,
             tenant=tenant,
-            entity="RemedialDocument",
-            entity_id=document.pk,
+            model_instance=document,
             action=AuditLog.Action.UPLOAD,
-            notes=f"Uploaded {doc_type} v{version}",
+            notes=f"Uploaded {doc_type} v{document.version}",
         )
         
         return document
     
+    @staticmethod
+    def _lock_version_counter(document):
+        """The version counter of the document's entity and type, locked until the transaction ends."""
+        counter, _ = models.DocumentVersionCounter.objects.select_for_update().get_or_create(
+            entity_type=document.entity_type,
+            entity_id=document.entity_id,
+            doc_type=document.doc_type,
+            defaults={"tenant_id": document.tenant_id},
+        )
+        return counter
+
+    @staticmethod
+    def refresh_latest(document):
+        """Flag the newest version of the document that is not deleted as the current one."""
+        with transaction.atomic():
+            DocumentService._lock_version_counter(document)
+            versions = models.RemedialDocument.objects.filter(
+                tenant_id=document.tenant_id,
+                entity_type=document.entity_type,
+                entity_id=document.entity_id,
+                doc_type=document.doc_type,
+            )
+            versions.filter(is_latest=True).update(is_latest=False)
+            newest = versions.filter(is_deleted=False).order_by("-version", "-uploaded_at").values("pk")[:1]
+            versions.filter(pk__in=newest).update(is_latest=True)
+
+    @staticmethod
+    def acquire_blob(tenant, name, sha256, size):
+        """Get or create the tenant's blob for stored content and add a reference to it."""
+        blob, _ = models.DocumentBlob.objects.get_or_create(
+            tenant=tenant, sha256=sha256, defaults={"name": name, "size": size}
+        )
+        models.DocumentBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+        return blob
+
+    @staticmethod
+    def release_blob(blob_id):
+        """Remove a blob and its file once no document row refers to it."""
+        blob = models.DocumentBlob.objects.filter(pk=blob_id).first()
+        if blob is None or blob.documents.exists():
+            return False
+        blob.delete()
+        storage = models.RemedialDocument._meta.get_field("file").storage
+        transaction.on_commit(lambda: storage.delete(blob.name))
+        return True
+
+    @staticmethod
+    def sweep_unreferenced_files(min_age=timedelta(days=1), now=None):
+        """Delete stored document files that no blob or document refers to.
+
+        Only files last modified more than ``min_age`` ago are considered, so
+        uploads still in flight keep theirs. Returns the deleted names.
+        """
+        storage = models.RemedialDocument._meta.get_field("file").storage
+        cutoff = (now or timezone.now()) - min_age
+        removed = []
+        for directory in ("remedial", storage.temp_dir):
+            for names in DocumentService._stored_files(storage, directory):
+                names = [name for name in names if storage.get_modified_time(name) < cutoff]
+                referenced = set(
+                    models.DocumentBlob.objects.filter(name__in=names).values_list("name", flat=True)
+                ) | set(models.RemedialDocument.objects.filter(file__in=names).values_list("file", flat=True))
+                for name in names:
+                    if name not in referenced:
+                        storage.delete(name)
+                        removed.append(name)
+        return removed
+
+    @staticmethod
+    def _stored_files(storage, directory):
+        """Yield the file names of ``directory`` and each directory below it, one list per directory."""
+        if not storage.exists(directory):
+            return
+        subdirectories, files = storage.listdir(directory)
+        yield [f"{directory}/{name}" for name in files]
+        for subdirectory in subdirectories:
+            yield from DocumentService._stored_files(storage, f"{directory}/{subdirectory}")
+
     @staticmethod
     def delete_document(document: models.RemedialDocument, user):
         """Soft delete document"""
@@ -628,13 +1102,19 @@ class DocumentService:
         document.is_deleted = True
         document.deleted_at = timezone.now()
         document.deleted_by = user
-        document.save()
-        
-        _record_audit(
+        with transaction.atomic():
+            document.save()
+            if document.blob_id:
+                # Soft-deleted documents keep their file but no longer count as references.
+                models.DocumentBlob.objects.filter(pk=document.blob_id).update(ref_count=F("ref_count") - 1)
+            if document.is_latest:
+                DocumentService.refresh_latest(document)
+                document.is_latest = False
+        
+        _record_model_change(
             actor=user,
             tenant=document.tenant,
-            entity="RemedialDocument",
-            entity_id=document.pk,
+            model_instance=document,
             action=AuditLog.Action.UPDATE,
             notes="Document deleted",
         )
@@ -642,6 +1122,38 @@ class DocumentService:
         return document
 
 
+# ===== AUDIT HISTORY SERVICES =====
+
+class EntityHistoryService:
+    """Rebuild audited remedial records as they stood at a point in time"""
+
+    RECONSTRUCTABLE = {
+        model.__name__: model
+        for model in (models.RemedialAccount, models.CompromiseAgreement, models.LegalCase)
+    }
+
+    @staticmethod
+    def state_at(tenant, model, pk, at):
+        """Unsaved ``model`` instance holding its audited values at ``at``, or ``None``.
+
+        Returns ``None`` when the record has no audit history by then. Fields
+        that were never audited keep their defaults.
+        """
+        if EntityHistoryService.RECONSTRUCTABLE.get(model.__name__) is not model:
+            raise ValidationError(f"{model.__name__} history cannot be reconstructed.")
+        state = audit.entity_state(tenant, model.__name__, pk, at=at)
+        if not state:
+            return None
+        fields = {field.attname: field for field in model._meta.concrete_fields}
+        values = {
+            attname: fields[attname].to_python(value)
+            for attname, value in state.items()
+            if attname in fields
+        }
+        values.update(pk=pk, tenant_id=tenant.pk)
+        return model(**values)
+
+
 # ===== DATA QUALITY SERVICES =====
 
 class DataQualityService:
@@ -666,15 +1178,14 @@ class DataQualityService:
             })
         
         # Check compromises with inconsistent data
-        inconsistent = models.CompromiseAgreement.objects.filter(
-            tenant=tenant,
-            schedule_items__amount_due__sum__gt=models.F("settlement_amount")
-        )
+        inconsistent = models.CompromiseAgreement.objects.filter(tenant=tenant).annotate(
+            scheduled_total=Sum("schedule_items__amount_due")
+        ).filter(scheduled_total__gt=F("settlement_amount"))
         
         if inconsistent.exists():
             issues.append({
                 "type": "inconsistent_compromise_totals",
-                "count": inconsistent.distinct().count(),
+                "count": inconsistent.count(),
                 "severity": "medium"
             })
         
@@ -696,3 +1207,167 @@ class StatisticsService:
             "trends": trend_data(tenant, days),
             "quality_issues": DataQualityService.run_data_quality_checks(tenant)
         }
+
+
+# ===== PORTFOLIO SUMMARY SERVICES =====
+
+SUMMARY_FIELDS = ("count", "amount", "paid_amount", "schedule_items", "schedule_items_paid")
+
+
+def _as_date(value):
+    """DateFields defaulting to timezone.now hold a datetime until reloaded."""
+    if isinstance(value, datetime):
+        return timezone.localdate(value)
+    return value
+
+
+class PortfolioSummaryService:
+    """Keeps ``PortfolioSummary`` in step with accounts, compromises and payments.
+
+    Every tracked row contributes additive deltas to one or more summary keys.
+    A change is applied as "remove the old contribution, add the new one", so
+    stage/status transitions move figures between keys without re-aggregating.
+    """
+
+    TRACKED_FIELDS = {
+        models.RemedialAccount: ("tenant_id", "created_at", "stage", "status", "outstanding_balance_ref"),
+        models.CompromiseAgreement: ("tenant_id", "compromise_signed_date", "status", "settlement_amount"),
+        models.CompromiseScheduleItem: ("compromise_agreement_id", "status"),
+        models.CompromisePayment: ("compromise_agreement_id", "payment_date", "amount"),
+    }
+
+    @staticmethod
+    def contributions(instance):
+        """Return ``[(key, deltas)]`` for one tracked row as currently loaded"""
+        if isinstance(instance, models.RemedialAccount):
+            key = (instance.tenant_id, models.PortfolioMetric.ACCOUNTS, timezone.localdate(instance.created_at),
+                   instance.stage, instance.status)
+            return [(key, {"count": 1, "amount": instance.outstanding_balance_ref or 0})]
+
+        if isinstance(instance, models.CompromiseAgreement):
+            return PortfolioSummaryService._agreement_contributions(instance)
+
+        agreement = models.CompromiseAgreement.objects.only(
+            "tenant_id", "compromise_signed_date", "status"
+        ).get(pk=instance.compromise_agreement_id)
+        agreement_key = (agreement.tenant_id, models.PortfolioMetric.COMPROMISES,
+                         agreement.compromise_signed_date, "", agreement.status)
+        if isinstance(instance, models.CompromiseScheduleItem):
+            paid = int(instance.status == models.ScheduleStatus.PAID)
+            return [(agreement_key, {"schedule_items": 1, "schedule_items_paid": paid})]
+        payment_key = (agreement.tenant_id, models.PortfolioMetric.PAYMENTS, _as_date(instance.payment_date),
+                       "", agreement.status)
+        return [
+            (agreement_key, {"paid_amount": instance.amount}),
+            (payment_key, {"count": 1, "amount": instance.amount}),
+        ]
+
+    @staticmethod
+    def _agreement_contributions(agreement):
+        # Children already in the database travel with the agreement on status changes.
+        key = (agreement.tenant_id, models.PortfolioMetric.COMPROMISES, agreement.compromise_signed_date,
+               "", agreement.status)
+        items = models.CompromiseScheduleItem.objects.filter(compromise_agreement_id=agreement.pk).aggregate(
+            total=Count("pk"), paid=Count("pk", filter=Q(status=models.ScheduleStatus.PAID))
+        )
+        payments = list(
+            models.CompromisePayment.objects.filter(compromise_agreement_id=agreement.pk)
+            .values("payment_date")
+            .annotate(count=Count("pk"), amount=Sum("amount"))
+            .order_by()
+        )
+        contributions = [(key, {
+            "count": 1,
+            "amount": agreement.settlement_amount or 0,
+            "paid_amount": sum(row["amount"] for row in payments),
+            "schedule_items": items["total"],
+            "schedule_items_paid": items["paid"],
+        })]
+        for row in payments:
+            payment_key = (agreement.tenant_id, models.PortfolioMetric.PAYMENTS, row["payment_date"], "",
+                           agreement.status)
+            contributions.append((payment_key, {"count": row["count"], "amount": row["amount"]}))
+        return contributions
+
+    @staticmethod
+    @transaction.atomic
+    def apply(contributions, sign=1):
+        """Add (``sign=1``) or remove (``sign=-1``) contributions from the summary
+
+        Each delta is an in-place ``UPDATE`` of its grain's row. A missing row
+        is inserted; if a concurrent writer inserted it first, the unique
+        constraint rejects the duplicate and the delta is applied to theirs.
+        """
+        for (tenant_id, metric, day, stage, status), deltas in contributions:
+            if tenant_id is None or not any(deltas.values()):
+                continue
+            grain = models.PortfolioSummary.objects.filter(
+                tenant_id=tenant_id, metric=metric, day=day, stage=stage, status=status
+            )
+            increments = {field: F(field) + sign * value for field, value in deltas.items()}
+            if grain.update(**increments):
+                continue
+            try:
+                with transaction.atomic():
+                    models.PortfolioSummary.objects.create(
+                        tenant_id=tenant_id, metric=metric, day=day, stage=stage, status=status,
+                        **{field: sign * value for field, value in deltas.items()},
+                    )
+            except IntegrityError:
+                grain.update(**increments)
+
+    @staticmethod
+    def move(old_instance, new_instance):
+        """Apply a change from ``old_instance`` to ``new_instance`` of the same row"""
+        PortfolioSummaryService.apply(PortfolioSummaryService.contributions(old_instance), sign=-1)
+        PortfolioSummaryService.apply(PortfolioSummaryService.contributions(new_instance))
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(tenant):
+        """Recompute every summary row for ``tenant`` from the source tables"""
+        models.PortfolioSummary.objects.filter(tenant=tenant).delete()
+        rows = defaultdict(lambda: dict.fromkeys(SUMMARY_FIELDS, 0))
+
+        accounts = (
+            models.RemedialAccount.objects.filter(tenant=tenant)
+            .annotate(day=TruncDate("created_at"))
+            .values("day", "stage", "status")
+            .annotate(count=Count("pk"), amount=Sum("outstanding_balance_ref"))
+            .order_by()
+        )
+        for row in accounts:
+            key = (models.PortfolioMetric.ACCOUNTS, row["day"], row["stage"], row["status"])
+            rows[key].update(count=row["count"], amount=row["amount"] or 0)
+
+        agreements = models.CompromiseAgreement.objects.filter(tenant=tenant)
+        for row in agreements.values("compromise_signed_date", "status").annotate(
+            count=Count("pk"), amount=Sum("settlement_amount")
+        ).order_by():
+            key = (models.PortfolioMetric.COMPROMISES, row["compromise_signed_date"], "", row["status"])
+            rows[key].update(count=row["count"], amount=row["amount"] or 0)
+
+        items = models.CompromiseScheduleItem.objects.filter(compromise_agreement__tenant=tenant)
+        for row in items.values("compromise_agreement__compromise_signed_date", "compromise_agreement__status").annotate(
+            total=Count("pk"), paid=Count("pk", filter=Q(status=models.ScheduleStatus.PAID))
+        ).order_by():
+            key = (models.PortfolioMetric.COMPROMISES, row["compromise_agreement__compromise_signed_date"], "",
+                   row["compromise_agreement__status"])
+            rows[key].update(schedule_items=row["total"], schedule_items_paid=row["paid"])
+
+        payments = models.CompromisePayment.objects.filter(compromise_agreement__tenant=tenant)
+        for row in payments.values(
+            "payment_date", "compromise_agreement__compromise_signed_date", "compromise_agreement__status"
+        ).annotate(count=Count("pk"), amount=Sum("amount")).order_by():
+            status = row["compromise_agreement__status"]
+            agreement_key = (models.PortfolioMetric.COMPROMISES, row["compromise_agreement__compromise_signed_date"],
+                             "", status)
+            rows[agreement_key]["paid_amount"] += row["amount"]
+            payment_key = (models.PortfolioMetric.PAYMENTS, row["payment_date"], "", status)
+            rows[payment_key]["count"] += row["count"]
+            rows[payment_key]["amount"] += row["amount"]
+
+        return models.PortfolioSummary.objects.bulk_create([
+            models.PortfolioSummary(tenant=tenant, metric=metric, day=day, stage=stage, status=status, **values)
+            for (metric, day, stage, status), values in rows.items()
+        ])
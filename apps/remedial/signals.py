@@ -0,0 +1,122 @@
+"""Model signal handlers keeping denormalized remedial fields current."""
+from copy import copy
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.tenancy.models import TenantMembership
+
+from . import models
+from .notifications import invalidate_recipient_cache
+from .selectors import invalidate_dashboard_cache
+from .services import DocumentService, LegalCaseService, PortfolioSummaryService
+
+
+@receiver(post_init, sender=models.CourtHearing)
+def remember_hearing_case(sender, instance, **kwargs):
+    # Lets a hearing moved to another case refresh the case it left.
+    instance._loaded_legal_case_id = instance.legal_case_id
+
+
+@receiver(post_save, sender=models.CourtHearing)
+def refresh_case_on_hearing_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {"hearing_date", "status", "legal_case"} & set(update_fields):
+        return
+    LegalCaseService.refresh_next_hearing_date({instance.legal_case_id, instance._loaded_legal_case_id})
+    instance._loaded_legal_case_id = instance.legal_case_id
+
+
+@receiver(post_delete, sender=models.CourtHearing)
+def refresh_case_on_hearing_delete(sender, instance, **kwargs):
+    LegalCaseService.refresh_next_hearing_date([instance.legal_case_id])
+
+
+@receiver(post_delete, sender=models.RemedialDocument)
+def release_document_blob(sender, instance, **kwargs):
+    if instance.blob_id is None:
+        return
+    if not instance.is_deleted:
+        models.DocumentBlob.objects.filter(pk=instance.blob_id).update(ref_count=F("ref_count") - 1)
+    DocumentService.release_blob(instance.blob_id)
+
+
+@receiver(post_delete, sender=models.RemedialDocument)
+def refresh_latest_document(sender, instance, **kwargs):
+    if instance.is_latest:
+        DocumentService.refresh_latest(instance)
+
+
+@receiver(post_save, sender=models.NotificationRule)
+@receiver(post_delete, sender=models.NotificationRule)
+@receiver(post_save, sender=TenantMembership)
+@receiver(post_delete, sender=TenantMembership)
+def invalidate_rules_on_change(sender, **kwargs):
+    invalidate_recipient_cache()
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def invalidate_rules_on_group_change(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_recipient_cache()
+
+
+DASHBOARD_MODELS = (
+    models.RemedialAccount,
+    models.CompromiseAgreement,
+    models.CompromisePayment,
+    models.LegalCase,
+    models.CourtHearing,
+    models.RecoveryAction,
+    models.RecoveryMilestone,
+    models.WriteOffRequest,
+)
+
+
+def invalidate_dashboard_on_change(sender, instance, **kwargs):
+    invalidate_dashboard_cache(instance.tenant_id)
+
+
+for dashboard_model in DASHBOARD_MODELS:
+    post_save.connect(invalidate_dashboard_on_change, sender=dashboard_model)
+    post_delete.connect(invalidate_dashboard_on_change, sender=dashboard_model)
+
+
+def snapshot_summary_fields(sender, instance, **kwargs):
+    # Read __dict__ directly so deferred fields are not fetched one by one.
+    instance._summary_snapshot = {
+        field: instance.__dict__[field]
+        for field in PortfolioSummaryService.TRACKED_FIELDS[sender]
+        if field in instance.__dict__
+    }
+
+
+def update_summary_on_save(sender, instance, created, **kwargs):
+    snapshot = getattr(instance, "_summary_snapshot", {})
+    if created:
+        PortfolioSummaryService.apply(PortfolioSummaryService.contributions(instance))
+    elif any(getattr(instance, field) != value for field, value in snapshot.items()):
+        before = copy(instance)
+        before.__dict__.update(snapshot)
+        PortfolioSummaryService.move(before, instance)
+    snapshot_summary_fields(sender, instance)
+
+
+def load_summary_fields_before_delete(sender, instance, **kwargs):
+    # The instance may be stale (e.g. after a queryset update); subtract what is stored.
+    stored = sender._base_manager.filter(pk=instance.pk).values(*PortfolioSummaryService.TRACKED_FIELDS[sender]).first()
+    instance._summary_deleted = copy(instance)
+    instance._summary_deleted.__dict__.update(stored or {})
+
+
+def update_summary_on_delete(sender, instance, **kwargs):
+    deleted = getattr(instance, "_summary_deleted", instance)
+    PortfolioSummaryService.apply(PortfolioSummaryService.contributions(deleted), sign=-1)
+
+
+for summary_model in PortfolioSummaryService.TRACKED_FIELDS:
+    post_init.connect(snapshot_summary_fields, sender=summary_model)
+    post_save.connect(update_summary_on_save, sender=summary_model)
+    pre_delete.connect(load_summary_fields_before_delete, sender=summary_model)
+    post_delete.connect(update_summary_on_delete, sender=summary_model)
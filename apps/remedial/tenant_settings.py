@@ -0,0 +1,23 @@
+"""Tenant settings read by the remedial app (see ``apps.tenancy.config``)."""
+from apps.tenancy.config import register_setting
+
+register_setting(
+    "list_page_size", 20, min_value=5, max_value=200,
+    help_text="Rows per page on remedial list views.",
+)
+register_setting(
+    "hearing_reminder_days", 7, min_value=0, max_value=90,
+    help_text="Days ahead of a hearing to send its reminder.",
+)
+register_setting(
+    "upcoming_hearings_days", 14, min_value=1, max_value=180,
+    help_text="Window of the upcoming hearings lists.",
+)
+register_setting(
+    "compromise_grace_days", 3, min_value=0, max_value=365,
+    help_text="Default grace period for new compromise agreements.",
+)
+register_setting(
+    "compromise_default_threshold_days", 30, min_value=1, max_value=365,
+    help_text="Default days overdue before a compromise agreement defaults.",
+)
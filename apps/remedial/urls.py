@@ -15,6 +15,9 @@ urlpatterns = [
     path("accounts/<uuid:pk>/", views.AccountDetailView.as_view(), name="account-detail"),
     path("accounts/<uuid:pk>/edit/", views.AccountUpdateView.as_view(), name="account-update"),
     path("my-cases/", views.MyCasesListView.as_view(), name="my-cases"),
+    path("accounts/search/", views.AccountSearchView.as_view(), name="account-search"),
+    path("accounts/search/officers/", views.officer_options, name="officer-options"),
+    path("search/typeahead/", views.search_typeahead, name="search-typeahead"),
     # Compromise URLs
     path("compromises/", views.CompromiseListView.as_view(), name="compromiseagreement-list"),
     path("compromises/create/", views.CompromiseCreateView.as_view(), name="compromise-create"),
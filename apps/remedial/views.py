@@ -8,20 +8,23 @@ from django.http import Http404, HttpResponseForbidden
 from django.views.generic import ListView, DetailView, TemplateView, CreateView, UpdateView, DeleteView
 from django.urls import reverse, reverse_lazy
 from django.views.decorators.csrf import csrf_exempt
-from django.db.models import Q
 
 # Account views
 from django.db.models import Count
 from . import models
 from . import forms
 from .forms import RemedialAccountForm, CompromiseAgreementForm
+from .pagination import CursorPaginationMixin
+from . import search
+from . import services
 
-class CompromiseListView(ListView):
+class CompromiseListView(CursorPaginationMixin, ListView):
     """List all compromise agreements"""
     model = models.CompromiseAgreement
     template_name = 'remedial/compromise_list.html'
     context_object_name = 'compromises'
     paginate_by = 20
+    rows_template_name = 'remedial/partials/compromise_rows.html'
     
     def get_queryset(self):
         return models.CompromiseAgreement.objects.filter(tenant=self.request.tenant).select_related('remedial_account').order_by('-created_at')
@@ -39,6 +42,14 @@ class CompromiseCreateView(CreateView):
     template_name = 'remedial/compromise_form.html'
     success_url = reverse_lazy('remedial:compromiseagreement-list')
     
+    def get_initial(self):
+        initial = super().get_initial()
+        if self.request.tenant is not None:
+            config = self.request.tenant.config
+            initial.setdefault('grace_days', config['compromise_grace_days'])
+            initial.setdefault('default_threshold_days', config['compromise_default_threshold_days'])
+        return initial
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['title'] = 'Create Compromise Agreement'
@@ -80,12 +91,13 @@ class LegalCaseUpdateView(UpdateView):
         context['active_page'] = 'legal-cases'
         return context
 
-class LegalCaseListView(ListView):
+class LegalCaseListView(CursorPaginationMixin, ListView):
     """List all legal cases"""
     model = models.LegalCase
     template_name = 'remedial/legal_list.html'
     context_object_name = 'legal_cases'
     paginate_by = 20
+    rows_template_name = 'remedial/partials/legal_rows.html'
     
     def get_queryset(self):
         return models.LegalCase.objects.filter(tenant=self.request.tenant).select_related('remedial_account').order_by('-created_at')
@@ -114,19 +126,18 @@ class LegalCaseCreateView(CreateView):
         return super().form_valid(form)
 from django.db.models import Count
 
-class AccountListView(ListView):
+class AccountListView(CursorPaginationMixin, ListView):
     """List all remedial accounts"""
     model = models.RemedialAccount
     template_name = 'remedial/account_list.html'
     context_object_name = 'accounts'
     paginate_by = 20
+    rows_template_name = 'remedial/partials/account_rows.html'
+    approximate_count = True
     
     def get_queryset(self):
-        queryset = models.RemedialAccount.objects.filter(tenant=self.request.tenant).select_related('assigned_officer').order_by('-created_at')
-        query = self.request.GET.get('q')
-        if query:
-            queryset = queryset.filter(Q(loan_account_no__icontains=query) | Q(borrower_name__icontains=query))
-        return queryset
+        queryset = models.RemedialAccount.objects.select_related('assigned_officer').order_by('-created_at')
+        return search.filter_queryset(queryset, self.request.GET.get('q', ''), self.request.tenant)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -134,6 +145,49 @@ class AccountListView(ListView):
         context['active_page'] = 'accounts'
         return context
 
+@method_decorator(login_required, name='dispatch')
+class AccountSearchView(AccountListView):
+    """Filter remedial accounts by loan number, borrower, stage, status and officer"""
+    template_name = 'remedial/account_search.html'
+
+    def get_form(self):
+        if not hasattr(self, '_form'):
+            self._form = forms.RemedialAccountSearchForm(self.request.GET or None, tenant=self.request.tenant)
+        return self._form
+
+    def get_queryset(self):
+        form = self.get_form()
+        if not form.is_valid():
+            return selectors.search_remedial_accounts(self.request.tenant)
+        return selectors.search_remedial_accounts(
+            self.request.tenant,
+            loan_account_no=form.cleaned_data['loan_account_no'],
+            borrower_name=form.cleaned_data['borrower_name'],
+            stage=form.cleaned_data['stage'],
+            status=form.cleaned_data['status'],
+            officer=form.cleaned_data['assigned_officer'],
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['title'] = 'Search Accounts'
+        context['form'] = self.get_form()
+        return context
+
+@login_required
+def officer_options(request):
+    """HTMX endpoint filling the officer picker with the tenant's assigned officers"""
+    return render(request, 'remedial/partials/officer_options.html', {
+        'officers': selectors.get_tenant_officers(request.tenant),
+        'selected': request.GET.get('selected', ''),
+    })
+
+@login_required
+def search_typeahead(request):
+    """HTMX endpoint listing accounts, cases and agreements matching a partial query"""
+    hits = search.typeahead(request.tenant, request.GET.get('q', ''))
+    return render(request, 'remedial/partials/search_typeahead.html', {'hits': hits})
+
 class AccountCreateView(CreateView):
     """Create a new remedial account"""
     model = models.RemedialAccount
@@ -152,12 +206,13 @@ class AccountCreateView(CreateView):
         return super().form_valid(form)
 
 @method_decorator(login_required, name='dispatch')
-class MyCasesListView(ListView):
+class MyCasesListView(CursorPaginationMixin, ListView):
     """List of remedial accounts assigned to the current user."""
     model = models.RemedialAccount
     template_name = 'remedial/account_list.html'
     context_object_name = 'accounts'
     paginate_by = 20
+    rows_template_name = 'remedial/partials/account_rows.html'
 
     def get_queryset(self):
         return models.RemedialAccount.objects.filter(
@@ -325,12 +380,13 @@ class DashboardView(TemplateView):
 
 # ===== COURT HEARING VIEWS =====
 
-class CourtHearingListView(ListView):
+class CourtHearingListView(CursorPaginationMixin, ListView):
     """List all court hearings"""
     model = models.CourtHearing
     template_name = 'remedial/courthearing_list.html'
     context_object_name = 'hearings'
     paginate_by = 20
+    rows_template_name = 'remedial/partials/courthearing_rows.html'
     
     def get_queryset(self):
         return models.CourtHearing.objects.filter(tenant=self.request.tenant).select_related('legal_case__remedial_account').order_by('-hearing_date')
@@ -391,12 +447,13 @@ class CourtHearingUpdateView(UpdateView):
 
 # ===== RECOVERY ACTION VIEWS =====
 
-class RecoveryActionListView(ListView):
+class RecoveryActionListView(CursorPaginationMixin, ListView):
     """List all recovery actions"""
     model = models.RecoveryAction
     template_name = 'remedial/recoveryaction_list.html'
     context_object_name = 'actions'
     paginate_by = 20
+    rows_template_name = 'remedial/partials/recoveryaction_rows.html'
     
     def get_queryset(self):
         return models.RecoveryAction.objects.filter(tenant=self.request.tenant).select_related('remedial_account').order_by('-initiated_at')
@@ -457,12 +514,13 @@ class RecoveryActionUpdateView(UpdateView):
 
 # ===== RECOVERY MILESTONE VIEWS =====
 
-class RecoveryMilestoneListView(ListView):
+class RecoveryMilestoneListView(CursorPaginationMixin, ListView):
     """List all recovery milestones"""
     model = models.RecoveryMilestone
     template_name = 'remedial/recoverymilestone_list.html'
     context_object_name = 'milestones'
     paginate_by = 20
+    rows_template_name = 'remedial/partials/recoverymilestone_rows.html'
     
     def get_queryset(self):
         return models.RecoveryMilestone.objects.filter(tenant=self.request.tenant).select_related('recovery_action__remedial_account').order_by('-target_date')
@@ -527,7 +585,7 @@ class RecoveryMilestoneUpdateView(UpdateView):
 
 
 
-class WriteOffRequestListView(ListView):
+class WriteOffRequestListView(CursorPaginationMixin, ListView):
 
     """List all write-off requests"""
 
@@ -538,6 +596,7 @@ class WriteOffRequestListView(ListView):
     context_object_name = 'writeoffs'
 
     paginate_by = 20
+    rows_template_name = 'remedial/partials/writeoffrequest_rows.html'
 
     
 
@@ -659,7 +718,7 @@ class WriteOffRequestUpdateView(UpdateView):
 
 
 
-class RemedialDocumentListView(ListView):
+class RemedialDocumentListView(CursorPaginationMixin, ListView):
 
     """List all documents"""
 
@@ -670,6 +729,7 @@ class RemedialDocumentListView(ListView):
     context_object_name = 'documents'
 
     paginate_by = 20
+    rows_template_name = 'remedial/partials/remedialdocument_rows.html'
 
     
 
@@ -733,11 +793,28 @@ class RemedialDocumentCreateView(CreateView):
 
     def form_valid(self, form):
 
-        form.instance.tenant = self.request.tenant
+        # The service streams the upload to storage, hashing it on the way.
+        data = form.cleaned_data
 
-        form.instance.uploaded_by = self.request.user
+        self.object = services.DocumentService.upload_document(
 
-        return super().form_valid(form)
+            tenant=self.request.tenant,
+
+            entity_type=data['entity_type'],
+
+            entity_id=data['entity_id'],
+
+            doc_type=data['doc_type'],
+
+            file_obj=data['file'],
+
+            uploaded_by=self.request.user,
+
+            is_confidential=data['is_confidential'],
+
+        )
+
+        return redirect(self.get_success_url())
 
 
 
@@ -813,19 +890,10 @@ class RemedialDocumentDeleteView(DeleteView):
 
 
 
-        self.object.is_deleted = True
-
-
-
-        self.object.deleted_at = timezone.now()
-
-
-
-        self.object.deleted_by = self.request.user
-
+        if not self.object.is_deleted:
 
-
-        self.object.save()
+            # Through the service so the document's blob reference is released.
+            services.DocumentService.delete_document(self.object, self.request.user)
 
 
 
@@ -845,7 +913,7 @@ class RemedialDocumentDeleteView(DeleteView):
 
 
 
-class NotificationRuleListView(ListView):
+class NotificationRuleListView(CursorPaginationMixin, ListView):
 
 
 
@@ -866,6 +934,7 @@ class NotificationRuleListView(ListView):
 
 
     paginate_by = 20
+    rows_template_name = 'remedial/partials/notificationrule_rows.html'
 
 
 
@@ -1084,7 +1153,7 @@ class NotificationRuleDetailView(DetailView):
 # ===== COMPROMISE PAYMENT VIEWS =====
 
 
-class CompromisePaymentListView(ListView):
+class CompromisePaymentListView(CursorPaginationMixin, ListView):
 
 
     """List all compromise payments"""
@@ -1100,6 +1169,7 @@ class CompromisePaymentListView(ListView):
 
 
     paginate_by = 20
+    rows_template_name = 'remedial/partials/compromisepayment_rows.html'
 
 
     
@@ -1437,7 +1507,7 @@ class CompromisePaymentUpdateView(UpdateView):
 # ===== COMPROMISE SCHEDULE ITEM VIEWS =====
 
 
-class CompromiseScheduleItemListView(ListView):
+class CompromiseScheduleItemListView(CursorPaginationMixin, ListView):
 
 
     """List all compromise schedule items"""
@@ -1453,6 +1523,7 @@ class CompromiseScheduleItemListView(ListView):
 
 
     paginate_by = 20
+    rows_template_name = 'remedial/partials/scheduleitem_rows.html'
 
 
     
@@ -1888,31 +1959,22 @@ class CompromiseApproveView(UpdateView):
         # Log the approval action
 
 
-        models.AuditLog.objects.create(
-
-
-            tenant=self.request.tenant,
+        services._record_model_change(
 
 
             actor=self.request.user,
 
 
-            entity_type='compromise_agreement',
-
-
-            entity_id=str(compromise.id),
-
-
-            action='STATE_CHANGE',
+            tenant=self.request.tenant,
 
 
-            before_json={'status': 'DRAFT'},
+            model_instance=compromise,
 
 
-            after_json={'status': 'APPROVED', 'approved_by': str(self.request.user), 'approved_at': compromise.approved_at.isoformat()},
+            action=models.AuditLog.Action.STATE_CHANGE,
 
 
-            notes=f'Compromise approved by {self.request.get_full_name() or self.request.username}'
+            notes=f'Compromise approved by {self.request.user.get_full_name() or self.request.user.username}'
 
 
         )
@@ -2012,31 +2074,22 @@ class CompromiseActivateView(UpdateView):
         # Log the activation action
 
 
-        models.AuditLog.objects.create(
-
-
-            tenant=self.request.tenant,
+        services._record_model_change(
 
 
             actor=self.request.user,
 
 
-            entity_type='compromise_agreement',
-
-
-            entity_id=str(compromise.id),
-
-
-            action='STATE_CHANGE',
+            tenant=self.request.tenant,
 
 
-            before_json={'status': 'APPROVED'},
+            model_instance=compromise,
 
 
-            after_json={'status': 'ACTIVE', 'start_date': compromise.start_date.isoformat()},
+            action=models.AuditLog.Action.STATE_CHANGE,
 
 
-            notes=f'Compromise activated by {self.request.get_full_name() or self.request.username}'
+            notes=f'Compromise activated by {self.request.user.get_full_name() or self.request.user.username}'
 
 
         )
@@ -2082,31 +2135,22 @@ def compromise_approve_action(request, pk):
             # Log the approval action
 
 
-            models.AuditLog.objects.create(
-
-
-                tenant=request.tenant,
+            services._record_model_change(
 
 
                 actor=request.user,
 
 
-                entity_type='compromise_agreement',
-
-
-                entity_id=str(compromise.id),
-
-
-                action='STATE_CHANGE',
+                tenant=request.tenant,
 
 
-                before_json={'status': 'DRAFT'},
+                model_instance=compromise,
 
 
-                after_json={'status': 'APPROVED', 'approved_by': str(request.user), 'approved_at': compromise.approved_at.isoformat()},
+                action=models.AuditLog.Action.STATE_CHANGE,
 
 
-                notes=f'Compromise approved by {request.get_full_name() or request.username}'
+                notes=f'Compromise approved by {request.user.get_full_name() or request.user.username}'
 
 
             )
@@ -2194,31 +2238,22 @@ def compromise_activate_action(request, pk):
             # Log the activation action
 
 
-            models.AuditLog.objects.create(
-
-
-                tenant=request.tenant,
+            services._record_model_change(
 
 
                 actor=request.user,
 
 
-                entity_type='compromise_agreement',
-
-
-                entity_id=str(compromise.id),
-
-
-                action='STATE_CHANGE',
+                tenant=request.tenant,
 
 
-                before_json={'status': 'APPROVED'},
+                model_instance=compromise,
 
 
-                after_json={'status': 'ACTIVE', 'start_date': compromise.start_date.isoformat()},
+                action=models.AuditLog.Action.STATE_CHANGE,
 
 
-                notes=f'Compromise activated by {request.get_full_name() or request.username}'
+                notes=f'Compromise activated by {request.user.get_full_name() or request.user.username}'
 
 
             )
@@ -21,4 +21,10 @@ class TenantDomainAdmin(admin.ModelAdmin):
 class TenantSettingAdmin(admin.ModelAdmin):
     list_display = ('key', 'tenant')
     list_filter = ('tenant',)
-    search_fields = ('key', 'tenant__name', 'tenant__code')
\ No newline at end of file
+    search_fields = ('key', 'tenant__name', 'tenant__code')
+
+@admin.register(models.TenantMembership)
+class TenantMembershipAdmin(admin.ModelAdmin):
+    list_display = ('user', 'tenant')
+    list_filter = ('tenant',)
+    search_fields = ('user__username', 'user__email', 'tenant__name', 'tenant__code')
@@ -0,0 +1,125 @@
+"""Typed, cached access to ``TenantSetting`` values.
+
+Apps register the settings they read with ``register_setting``. A tenant's
+settings are loaded in one query, validated against the registry (stored
+values that fail validation fall back to the default) and kept per process
+until the tenant's version stamp in the shared cache moves, which happens
+whenever one of its ``TenantSetting`` rows is saved or deleted. Reading a
+setting from the returned ``TenantConfig`` is a dict lookup.
+"""
+import logging
+import threading
+from collections import namedtuple
+from collections.abc import Mapping
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION_KEY = "tenancy:settings:{tenant_id}:version"
+
+SettingDefinition = namedtuple("SettingDefinition", ["key", "default", "type", "min_value", "max_value", "help_text"])
+
+_registry = {}
+_configs = {}
+_lock = threading.Lock()
+
+
+def register_setting(key, default, type=int, min_value=None, max_value=None, help_text=""):
+    """Declare a tenant setting with its default and allowed values."""
+    _registry[key] = SettingDefinition(key, default, type, min_value, max_value, help_text)
+
+
+def registered_settings():
+    return dict(_registry)
+
+
+def clean_setting_value(key, value):
+    """Return ``value`` coerced to the registered type, or raise ``ValidationError``.
+
+    Unregistered keys are returned unchanged.
+    """
+    definition = _registry.get(key)
+    if definition is None:
+        return value
+    if definition.type is bool:
+        if not isinstance(value, bool):
+            raise ValidationError(f"{key} must be true or false.")
+        return value
+    try:
+        value = definition.type(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"{key} must be a {definition.type.__name__}.")
+    if definition.min_value is not None and value < definition.min_value:
+        raise ValidationError(f"{key} must be at least {definition.min_value}.")
+    if definition.max_value is not None and value > definition.max_value:
+        raise ValidationError(f"{key} must be at most {definition.max_value}.")
+    return value
+
+
+class TenantConfig(Mapping):
+    """Read-only view of a tenant's settings merged over the registered defaults."""
+
+    def __init__(self, tenant_id, values):
+        self.tenant_id = tenant_id
+        self._values = {key: definition.default for key, definition in _registry.items()}
+        self._values.update(values)
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getattr__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __repr__(self):
+        return f"<TenantConfig tenant={self.tenant_id} {self._values!r}>"
+
+
+def invalidate_tenant_config(tenant_id):
+    """Expire the cached settings of ``tenant_id`` in every process."""
+    key = CACHE_VERSION_KEY.format(tenant_id=tenant_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+    with _lock:
+        _configs.pop(tenant_id, None)
+
+
+def load_tenant_config(tenant_id):
+    """Build a ``TenantConfig`` from the database (one query)."""
+    from .models import TenantSetting
+
+    values = {}
+    if tenant_id is not None:
+        for key, value in TenantSetting.objects.filter(tenant_id=tenant_id).values_list("key", "value"):
+            try:
+                values[key] = clean_setting_value(key, value)
+            except ValidationError as exc:
+                logger.warning("Ignoring tenant %s setting %s: %s", tenant_id, key, exc.messages[0])
+    return TenantConfig(tenant_id, values)
+
+
+def get_tenant_config(tenant):
+    """Return the ``TenantConfig`` for a tenant or tenant id; ``None`` gives the defaults."""
+    tenant_id = getattr(tenant, "pk", tenant)
+    if tenant_id is None:
+        return TenantConfig(None, {})
+    version = cache.get_or_set(CACHE_VERSION_KEY.format(tenant_id=tenant_id), 1, None)
+    cached = _configs.get(tenant_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    config = load_tenant_config(tenant_id)
+    with _lock:
+        _configs[tenant_id] = (version, config)
+    return config
@@ -1,6 +1,8 @@
 from django import forms
+from django.core.exceptions import ValidationError
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Submit, Field, Div
+from .config import clean_setting_value
 from .models import Tenant, TenantDomain, TenantSetting
 
 class TenantForm(forms.ModelForm):
@@ -31,6 +33,9 @@ class TenantDomainForm(forms.ModelForm):
     class Meta:
         model = TenantDomain
         fields = ["domain", "is_primary"]
+        help_texts = {
+            "domain": "Host name such as bank.example.com, or *.bank.example.com for every subdomain.",
+        }
 
     def __init__(self, *args, **kwargs):
         self.tenant = kwargs.pop('tenant', None)
@@ -49,6 +54,9 @@ class TenantDomainForm(forms.ModelForm):
             )
         )
 
+    def clean_domain(self):
+        return self.cleaned_data["domain"].strip().lower().rstrip(".")
+
 
 class TenantSettingForm(forms.ModelForm):
     """Form for managing tenant settings"""
@@ -73,3 +81,12 @@ class TenantSettingForm(forms.ModelForm):
                 Submit("submit", "Save Setting"),
             )
         )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if "key" in cleaned_data and "value" in cleaned_data:
+            try:
+                cleaned_data["value"] = clean_setting_value(cleaned_data["key"], cleaned_data["value"])
+            except ValidationError as exc:
+                self.add_error("value", exc)
+        return cleaned_data
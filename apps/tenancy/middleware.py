@@ -1,21 +1,30 @@
-from .models import Tenant
+from django.core.exceptions import DisallowedHost
+from django.http import HttpResponseForbidden
+from django.http.request import split_domain_port
+
+from .models import TenantStatus
+from .resolver import resolver
+
 
 class TenantMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        # Assume a URL structure like /t/<tenant_code>/...
-        path_parts = request.path.split('/')
-        if len(path_parts) > 2 and path_parts[1] == 't':
-            tenant_code = path_parts[2]
-            try:
-                tenant = Tenant.objects.get(code=tenant_code)
-                request.tenant = tenant
-            except Tenant.DoesNotExist:
-                request.tenant = None
-        else:
-            request.tenant = None
-        
+        request.tenant = self.resolve_tenant(request)
+        if request.tenant is not None and request.tenant.status == TenantStatus.SUSPENDED:
+            return HttpResponseForbidden("This tenant is suspended.")
+
         response = self.get_response(request)
         return response
+
+    def resolve_tenant(self, request):
+        # A /t/<tenant_code>/... path prefix wins over the Host header.
+        path_parts = request.path.split('/')
+        if len(path_parts) > 2 and path_parts[1] == 't':
+            return resolver.by_code(path_parts[2])
+        try:
+            host, _ = split_domain_port(request.get_host())
+        except DisallowedHost:
+            return None
+        return resolver.by_host(host) if host else None
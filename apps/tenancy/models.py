@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 
@@ -19,6 +20,13 @@ class Tenant(models.Model):
     def __str__(self):
         return f"{self.name} ({self.code})"
 
+    @property
+    def config(self):
+        """Typed settings for this tenant, see ``apps.tenancy.config``."""
+        from .config import get_tenant_config
+
+        return get_tenant_config(self)
+
 
 class TenantDomain(models.Model):
     tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name="domains")
@@ -39,3 +47,16 @@ class TenantSetting(models.Model):
 
     class Meta:
         unique_together = ("tenant", "key")
+
+
+class TenantMembership(models.Model):
+    """Staff user working for a tenant; role recipients are resolved within these."""
+
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name="memberships")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="tenant_memberships")
+
+    class Meta:
+        unique_together = ("tenant", "user")
+
+    def __str__(self):
+        return f"{self.user} @ {self.tenant.code}"
@@ -0,0 +1,127 @@
+"""Tenant lookup for ``TenantMiddleware``.
+
+Code lookups go through a per-process LRU in front of the shared cache and
+host lookups through a precompiled ``DomainMap``, so a warm request resolves
+its tenant without touching the database. Both are keyed by a version number
+held in the shared cache; saving or deleting a tenant or domain bumps it,
+which expires every process's entries and map at once. Misses are cached too,
+so unknown codes and hosts do not reach the database either.
+"""
+import threading
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from .models import Tenant, TenantDomain
+
+CACHE_KEY = "tenancy:tenant:{version}:{kind}:{value}"
+DOMAIN_MAP_KEY = "tenancy:domains:{version}"
+CACHE_VERSION_KEY = "tenancy:tenant:version"
+CACHE_TIMEOUT = 300
+LRU_SIZE = 512
+
+_MISSING = "missing"
+
+
+def invalidate_tenant_cache():
+    """Expire cached tenant lookups in every process, e.g. after a tenant is suspended."""
+    try:
+        cache.incr(CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(CACHE_VERSION_KEY, 2, None)
+    resolver.clear()
+
+
+class DomainMap:
+    """Host name to tenant map compiled from every ``TenantDomain`` row.
+
+    ``*.bank.example.com`` entries match any subdomain of
+    ``bank.example.com``; exact entries win over wildcards and longer
+    wildcards over shorter ones. When one domain is listed for several
+    tenants, the primary entry wins.
+    """
+
+    def __init__(self, entries):
+        self.exact = {}
+        self.wildcard = {}
+        # Primary entries go last so they overwrite non-primary duplicates.
+        for domain, is_primary, tenant in sorted(entries, key=lambda entry: entry[1]):
+            domain = domain.strip().lower().rstrip(".")
+            if domain.startswith("*."):
+                self.wildcard[domain[2:]] = tenant
+            elif domain:
+                self.exact[domain] = tenant
+
+    @classmethod
+    def build(cls):
+        domains = TenantDomain.objects.select_related("tenant")
+        return cls((entry.domain, entry.is_primary, entry.tenant) for entry in domains)
+
+    def lookup(self, host):
+        host = host.lower().rstrip(".")
+        if host in self.exact:
+            return self.exact[host]
+        labels = host.split(".")
+        for start in range(1, len(labels)):
+            tenant = self.wildcard.get(".".join(labels[start:]))
+            if tenant is not None:
+                return tenant
+        return None
+
+
+class TenantResolver:
+    """Resolve tenants by code (cached hits and misses) or by host (domain map)."""
+
+    def __init__(self, maxsize=LRU_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._domain_map = None
+
+    def by_code(self, code):
+        return self._resolve("code", code, lambda: Tenant.objects.filter(code=code).first())
+
+    def by_host(self, host):
+        return self.domain_map().lookup(host)
+
+    def domain_map(self):
+        """The compiled ``DomainMap`` for the current cache version."""
+        version = cache.get_or_set(CACHE_VERSION_KEY, 1, None)
+        compiled = self._domain_map
+        if compiled is None or compiled[0] != version:
+            shared_key = DOMAIN_MAP_KEY.format(version=version)
+            domain_map = cache.get(shared_key)
+            if domain_map is None:
+                domain_map = DomainMap.build()
+                cache.set(shared_key, domain_map, CACHE_TIMEOUT)
+            compiled = self._domain_map = (version, domain_map)
+        return compiled[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self._domain_map = None
+
+    def _resolve(self, kind, value, load):
+        version = cache.get_or_set(CACHE_VERSION_KEY, 1, None)
+        entry_key = (version, kind, value)
+        with self._lock:
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                return self._entries[entry_key]
+
+        shared_key = CACHE_KEY.format(version=version, kind=kind, value=value)
+        tenant = cache.get(shared_key)
+        if tenant is None:
+            tenant = load() or _MISSING
+            cache.set(shared_key, tenant, CACHE_TIMEOUT)
+        tenant = None if tenant == _MISSING else tenant
+
+        with self._lock:
+            self._entries[entry_key] = tenant
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return tenant
+
+
+resolver = TenantResolver()
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+
+from .config import invalidate_tenant_config
+from .models import Tenant, TenantDomain, TenantSetting
+from .resolver import invalidate_tenant_cache
+
+
+def invalidate_tenants_on_change(sender, **kwargs):
+    invalidate_tenant_cache()
+
+
+for tenant_model in (Tenant, TenantDomain):
+    post_save.connect(invalidate_tenants_on_change, sender=tenant_model)
+    post_delete.connect(invalidate_tenants_on_change, sender=tenant_model)
+
+
+def invalidate_config_on_change(sender, instance, **kwargs):
+    invalidate_tenant_config(instance.tenant_id)
+
+
+post_save.connect(invalidate_config_on_change, sender=TenantSetting)
+post_delete.connect(invalidate_config_on_change, sender=TenantSetting)
@@ -2,6 +2,7 @@ from datetime import date
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 
 from apps.tenancy.models import Tenant
@@ -66,5 +67,9 @@ class BaseRemedialTestCase(TestCase):
             received_by=cls.user,
         )
 
+    def setUp(self):
+        # Cached lookups (e.g. notification recipients) must not leak between tests.
+        cache.clear()
+
     def login(self):
         return self.client.login(username=self.user.username, password="testpass123")
@@ -0,0 +1,295 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.core import audit, partitions
+from apps.core.middleware import AuditMiddleware
+from apps.core.models import AuditLog, AuditSnapshot
+from apps.remedial import models, selectors, services, views
+from apps.tenancy.models import Tenant
+
+from .base import BaseRemedialTestCase
+
+
+class AuditWriterTest(BaseRemedialTestCase):
+    def _record(self, entity_id, tenant=None):
+        return audit.record(
+            tenant=tenant or self.tenant,
+            actor=self.user,
+            entity_type="remedial_account",
+            entity_id=entity_id,
+            action=AuditLog.Action.UPDATE,
+        )
+
+    def test_batch_writes_entries_in_one_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            with audit.batch(ip_address="10.0.0.1"):
+                for entity_id in range(5):
+                    self._record(entity_id)
+                self.assertEqual(AuditLog.objects.count(), 0)
+        inserts = [query for query in queries if query["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(AuditLog.objects.filter(ip_address="10.0.0.1").count(), 5)
+
+    def test_entries_wait_for_commit_and_vanish_on_rollback(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self._record(1)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            with transaction.atomic():
+                self._record(2)
+            self.assertEqual(AuditLog.objects.count(), 0)
+        self.assertEqual(list(AuditLog.objects.values_list("entity_id", flat=True)), ["2"])
+
+    def test_failed_batch_writes_nothing(self):
+        with self.assertRaises(RuntimeError):
+            with audit.batch():
+                self._record(1)
+                raise RuntimeError
+        self.assertFalse(AuditLog.objects.exists())
+
+    def test_middleware_flushes_request_entries(self):
+        def view(request):
+            self._record(1)
+            self._record(2)
+            return HttpResponse()
+
+        request = RequestFactory().get("/", REMOTE_ADDR="192.0.2.7")
+        AuditMiddleware(view)(request)
+        self.assertEqual(AuditLog.objects.filter(ip_address="192.0.2.7").count(), 2)
+
+
+class AuditMiddlewareCommitTest(TransactionTestCase):
+    """Requests run in autocommit mode, outside any test transaction."""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Alpha Collections", code="alpha")
+
+    def _handle(self, view):
+        return AuditMiddleware(view)(RequestFactory().post("/", REMOTE_ADDR="192.0.2.9"))
+
+    def test_committed_changes_are_audited_when_the_view_raises(self):
+        def view(request):
+            with transaction.atomic():
+                services.RemedialAccountService.create_remedial_account(self.tenant, "LN-5000", "Ana Reyes")
+            raise RuntimeError("template failed")
+
+        with self.assertRaises(RuntimeError):
+            self._handle(view)
+        self.assertTrue(
+            AuditLog.objects.filter(entity_type="RemedialAccount", ip_address="192.0.2.9").exists()
+        )
+
+    def test_audit_write_failure_does_not_fail_the_response(self):
+        def view(request):
+            services.RemedialAccountService.create_remedial_account(self.tenant, "LN-5001", "Ana Reyes")
+            return HttpResponse()
+
+        with mock.patch.object(AuditLog.objects, "bulk_create", side_effect=DatabaseError("disk full")), \
+                self.assertLogs("apps.core.audit", level="ERROR"):
+            response = self._handle(view)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(models.RemedialAccount.objects.filter(loan_account_no="LN-5001").exists())
+
+
+class CompromiseApprovalAuditTest(BaseRemedialTestCase):
+    def _post(self, view, compromise):
+        request = RequestFactory().post("/")
+        request.user = self.other_user
+        request.tenant = self.tenant
+        return AuditMiddleware(lambda request: view(request, compromise.pk))(request)
+
+    def test_approval_through_the_view_is_audited(self):
+        response = self._post(views.compromise_approve_action, self.compromise)
+
+        self.assertContains(response, "has been approved")
+        entry = AuditLog.objects.get(entity_id=str(self.compromise.pk), action=AuditLog.Action.STATE_CHANGE)
+        self.assertEqual(entry.actor, self.other_user)
+        self.assertEqual(entry.notes, "Compromise approved by other_user")
+        # Same diff format as the services: model name, attnames and stored values.
+        self.assertEqual(entry.entity_type, "CompromiseAgreement")
+        self.assertEqual(entry.before_json["status"], models.CompromiseStatus.DRAFT)
+        self.assertEqual(entry.after_json["status"], models.CompromiseStatus.APPROVED)
+        self.assertEqual(entry.after_json["approved_by_id"], self.other_user.pk)
+
+    def test_activation_through_the_view_uses_the_diff_format(self):
+        self._post(views.compromise_approve_action, self.compromise)
+        response = self._post(views.compromise_activate_action, self.compromise)
+
+        self.assertContains(response, "has been activated")
+        entry = AuditLog.objects.filter(entity_id=str(self.compromise.pk)).latest("id")
+        self.assertEqual(entry.entity_type, "CompromiseAgreement")
+        self.assertEqual(entry.after_json["status"], models.CompromiseStatus.ACTIVE)
+        self.assertEqual(entry.after_json["start_date"], timezone.now().date().isoformat())
+
+    def test_view_approval_is_part_of_point_in_time_state(self):
+        with audit.batch():
+            compromise = services.CompromiseAgreementService.create_compromise(
+                self.tenant, self.remedial_account, "AG-002", Decimal("900.00"), self.user
+            )
+        AuditLog.objects.filter(entity_id=str(compromise.pk)).update(created_at=timezone.now() - timedelta(days=1))
+        self._post(views.compromise_approve_action, compromise)
+
+        before = services.EntityHistoryService.state_at(
+            self.tenant, models.CompromiseAgreement, compromise.pk, timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(before.status, models.CompromiseStatus.DRAFT)
+        self.assertIsNone(before.approved_by_id)
+        now = services.EntityHistoryService.state_at(
+            self.tenant, models.CompromiseAgreement, compromise.pk, timezone.now()
+        )
+        self.assertEqual(now.status, models.CompromiseStatus.APPROVED)
+        self.assertEqual(now.approved_by_id, self.other_user.pk)
+        self.assertEqual(now.settlement_amount, Decimal("900.00"))
+
+
+class ChangeDiffTest(BaseRemedialTestCase):
+    def test_only_changed_fields_are_stored_and_state_can_be_rebuilt(self):
+        with audit.batch():
+            account = services.RemedialAccountService.create_remedial_account(
+                self.tenant, "LN-3000", "Ana Reyes", officer=self.user
+            )
+        created = AuditLog.objects.get(entity_type="RemedialAccount", action=AuditLog.Action.CREATE)
+        self.assertIsNone(created.before_json)
+        self.assertEqual(created.after_json["borrower_name"], "Ana Reyes")
+        self.assertNotIn("closed_at", created.after_json)
+        AuditLog.objects.filter(pk=created.pk).update(created_at=timezone.now() - timedelta(days=1))
+
+        account = models.RemedialAccount.objects.get(pk=account.pk)
+        with audit.batch():
+            services.RemedialAccountService.update_stage(account, models.RemedialStage.LEGAL, self.user)
+            services.RemedialAccountService.assign_officer(account, self.other_user, self.user)
+        stage_change, officer_change = AuditLog.objects.filter(created_at__gt=created.created_at).order_by("id")
+        self.assertEqual(stage_change.before_json, {"stage": models.RemedialStage.PRE_LEGAL})
+        self.assertEqual(stage_change.after_json, {"stage": models.RemedialStage.LEGAL})
+        self.assertEqual(officer_change.after_json, {"assigned_officer_id": self.other_user.pk})
+
+        state = audit.entity_state(self.tenant, "RemedialAccount", account.pk)
+        self.assertEqual(state["stage"], models.RemedialStage.LEGAL)
+        self.assertEqual(state["assigned_officer_id"], self.other_user.pk)
+        earlier = audit.entity_state(self.tenant, "RemedialAccount", account.pk, at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(earlier["stage"], models.RemedialStage.PRE_LEGAL)
+        self.assertEqual(earlier["assigned_officer_id"], self.user.pk)
+
+
+class EntityHistoryTest(BaseRemedialTestCase):
+    def _change(self, account, days_ago, **values):
+        for name, value in values.items():
+            setattr(account, name, value)
+        with audit.batch():
+            account.save()
+            services._record_model_change(self.user, self.tenant, account, AuditLog.Action.UPDATE)
+        AuditLog.objects.filter(entity_id=str(account.pk)).filter(
+            created_at__gt=timezone.now() - timedelta(minutes=1)
+        ).update(created_at=timezone.now() - timedelta(days=days_ago))
+
+    def test_state_at_rebuilds_the_record(self):
+        account = models.RemedialAccount(tenant=self.tenant, loan_account_no="LN-4000", borrower_name="Old Name")
+        self._change(account, 30)
+        self._change(account, 20, borrower_name="New Name", stage=models.RemedialStage.LEGAL)
+        self._change(account, 10, stage=models.RemedialStage.CLOSED)
+
+        past = services.EntityHistoryService.state_at(
+            self.tenant, models.RemedialAccount, account.pk, timezone.now() - timedelta(days=15)
+        )
+        self.assertIsInstance(past, models.RemedialAccount)
+        self.assertEqual((past.borrower_name, past.stage), ("New Name", models.RemedialStage.LEGAL))
+        self.assertIsNone(services.EntityHistoryService.state_at(
+            self.tenant, models.RemedialAccount, account.pk, timezone.now() - timedelta(days=40)
+        ))
+
+    def test_long_replays_leave_a_snapshot(self):
+        account = models.RemedialAccount(tenant=self.tenant, loan_account_no="LN-4001", borrower_name="Name 0")
+        self._change(account, 60)
+        for day in range(1, 6):
+            self._change(account, 60 - day, borrower_name=f"Name {day}")
+
+        state = audit.entity_state(self.tenant, "RemedialAccount", account.pk, snapshot_after=3)
+        self.assertEqual(state["borrower_name"], "Name 5")
+        snapshot = AuditSnapshot.objects.get(entity_id=str(account.pk))
+        self.assertEqual(snapshot.state["borrower_name"], "Name 5")
+
+        self._change(account, 1, borrower_name="Name 6")
+        with CaptureQueriesContext(connection) as queries:
+            state = audit.entity_state(self.tenant, "RemedialAccount", account.pk, snapshot_after=3)
+        self.assertEqual(state["borrower_name"], "Name 6")
+        self.assertEqual(len(queries), 2)
+        past = audit.entity_state(
+            self.tenant, "RemedialAccount", account.pk, at=timezone.now() - timedelta(days=57, hours=12)
+        )
+        self.assertEqual(past["borrower_name"], "Name 2")
+
+    def test_snapshot_command_covers_busy_entities(self):
+        account = models.RemedialAccount(tenant=self.tenant, loan_account_no="LN-4002", borrower_name="Name 0")
+        self._change(account, 3)
+        self._change(account, 2, borrower_name="Name 1")
+        call_command("snapshot_audit_trail", min_entries=2, stdout=StringIO())
+        self.assertEqual(AuditSnapshot.objects.get(entity_id=str(account.pk)).state["borrower_name"], "Name 1")
+
+
+class AuditTrailTest(BaseRemedialTestCase):
+    def _entry(self, tenant, days_ago):
+        entry = AuditLog.objects.create(
+            tenant=tenant, entity_type="remedial_account", entity_id=str(self.remedial_account.pk)
+        )
+        AuditLog.objects.filter(pk=entry.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        return entry
+
+    def test_trail_is_tenant_scoped_and_bounded_by_date(self):
+        recent = self._entry(self.tenant, 10)
+        older = self._entry(self.tenant, 100)
+        oldest = self._entry(self.tenant, 400)
+        self._entry(self.other_tenant, 10)
+
+        trail = selectors.audit_trail_for_entity(self.tenant, "remedial_account", self.remedial_account.pk)
+        self.assertEqual([entry.pk for entry in trail], [recent.pk, older.pk, oldest.pk])
+
+        trail = selectors.audit_trail_for_entity(
+            self.tenant,
+            "remedial_account",
+            self.remedial_account.pk,
+            since=timezone.now() - timedelta(days=200),
+            until=timezone.now() - timedelta(days=50),
+        )
+        self.assertEqual([entry.pk for entry in trail], [older.pk])
+
+    def test_partition_command_is_a_no_op_without_partitioning(self):
+        out = StringIO()
+        call_command("audit_log_partitions", stdout=out)
+        self.assertIn("not partitioned", out.getvalue())
+
+
+class AuditPartitionSQLTest(SimpleTestCase):
+    def test_month_arithmetic_and_names(self):
+        self.assertEqual(partitions.add_months(date(2026, 11, 1), 3), date(2027, 2, 1))
+        self.assertEqual(partitions.add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+        self.assertEqual(partitions.partition_name(date(2026, 10, 1)), "core_auditlog_p202610")
+        self.assertEqual(partitions.partition_month("core_auditlog_p202610"), date(2026, 10, 1))
+        self.assertIsNone(partitions.partition_month(partitions.LEGACY_PARTITION))
+        self.assertIsNone(partitions.partition_month(partitions.DEFAULT_PARTITION))
+
+    def test_partition_ddl(self):
+        self.assertEqual(
+            partitions.create_partition_statement(date(2026, 12, 1)),
+            "CREATE TABLE IF NOT EXISTS core_auditlog_p202612 PARTITION OF core_auditlog "
+            "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')",
+        )
+        create_table = partitions.create_table_statements(AuditLog, connection)[0]
+        self.assertIn("PRIMARY KEY (id, created_at)", create_table)
+        self.assertIn("PARTITION BY RANGE (created_at)", create_table)
+        self.assertIn(
+            "CREATE INDEX core_audit_entity_trail_idx ON core_auditlog "
+            "(tenant_id, entity_type, entity_id, created_at DESC)",
+            partitions.index_statements(AuditLog),
+        )
@@ -0,0 +1,158 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import override_settings
+from django.utils import timezone
+
+from apps.remedial import models, selectors, services
+
+from .base import BaseRemedialTestCase
+
+
+class DocumentTestCase(BaseRemedialTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        super().tearDown()
+
+    def _upload(self, file_obj, entity_id=None):
+        return services.DocumentService.upload_document(
+            tenant=self.tenant,
+            entity_type="remedial_account",
+            entity_id=entity_id or self.remedial_account.pk,
+            doc_type="demand_letter",
+            file_obj=file_obj,
+            uploaded_by=self.user,
+        )
+
+    def _stored_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(root, name), self.media_root)
+            for root, _, names in os.walk(self.media_root)
+            for name in names
+        )
+
+
+class DocumentUploadTest(DocumentTestCase):
+    def test_in_memory_upload_is_hashed_while_stored(self):
+        content = b"%PDF scan " * 10000
+        document = self._upload(SimpleUploadedFile("letter.pdf", content))
+        document.refresh_from_db()
+        self.assertEqual(document.file_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(document.file_size, len(content))
+        with document.file.open("rb") as stored:
+            self.assertEqual(stored.read(), content)
+
+    def test_temporary_upload_is_streamed_not_moved(self):
+        content = b"0123456789" * 100000
+        upload = TemporaryUploadedFile("scan.pdf", "application/pdf", len(content), None)
+        upload.write(content)
+        upload.seek(0)
+        document = self._upload(upload)
+        self.assertEqual(document.file_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(document.file_size, len(content))
+        self.assertEqual(document.version, 1)
+        self.assertEqual(self._upload(SimpleUploadedFile("scan.pdf", b"v2")).version, 2)
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self._upload(SimpleUploadedFile("id.jpg", b"borrower id"))
+        second = self._upload(SimpleUploadedFile("id-copy.jpg", b"borrower id"), entity_id=self.other_account.pk)
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(second.original_name, "id-copy.jpg")
+        self.assertEqual(self._stored_files(), [first.file.name])
+        blob = models.DocumentBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+
+        services.DocumentService.delete_document(first, self.user)
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self._stored_files(), [second.file.name])
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(models.DocumentBlob.objects.exists())
+        self.assertEqual(self._stored_files(), [])
+
+    def test_failed_upload_leaves_its_file_to_the_sweep(self):
+        kept = self._upload(SimpleUploadedFile("kept.pdf", b"kept"))
+        with mock.patch.object(
+            services.DocumentService, "acquire_blob", side_effect=DatabaseError("connection lost")
+        ), self.assertRaises(DatabaseError):
+            self._upload(SimpleUploadedFile("lost.pdf", b"lost"))
+        self.assertEqual(len(self._stored_files()), 2)
+
+        self.assertEqual(services.DocumentService.sweep_unreferenced_files(), [])
+
+        removed = services.DocumentService.sweep_unreferenced_files(now=timezone.now() + timedelta(days=2))
+        self.assertEqual(len(removed), 1)
+        self.assertEqual(self._stored_files(), [kept.file.name])
+
+    def test_dedupe_command_moves_legacy_files_into_blobs(self):
+        for index in range(2):
+            name = f"remedial/remedial_account/{index}/title.pdf"
+            os.makedirs(os.path.dirname(os.path.join(self.media_root, name)))
+            with open(os.path.join(self.media_root, name), "wb") as legacy_file:
+                legacy_file.write(b"land title")
+            models.RemedialDocument.objects.create(
+                tenant=self.tenant,
+                entity_type="remedial_account",
+                entity_id=self.remedial_account.pk,
+                doc_type="title",
+                file=name,
+                uploaded_by=self.user,
+                version=index + 1,
+            )
+
+        call_command("dedupe_documents", stdout=StringIO())
+        documents = models.RemedialDocument.objects.all()
+        blob = models.DocumentBlob.objects.get()
+        self.assertEqual({document.file.name for document in documents}, {blob.name})
+        self.assertEqual({document.original_name for document in documents}, {"title.pdf"})
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(self._stored_files(), [blob.name])
+
+
+class DocumentVersioningTest(DocumentTestCase):
+    def test_versions_come_from_the_counter_and_latest_is_flagged(self):
+        models.DocumentVersionCounter.objects.create(
+            tenant=self.tenant,
+            entity_type="remedial_account",
+            entity_id=self.remedial_account.pk,
+            doc_type="demand_letter",
+            last_version=4,
+        )
+        first, second = (self._upload(SimpleUploadedFile(f"v{n}.pdf", f"v{n}".encode())) for n in (5, 6))
+        self.assertEqual((first.version, second.version), (5, 6))
+        self.assertEqual([d.pk for d in self.remedial_account.get_documents()], [second.pk])
+        self.assertEqual(
+            [d.pk for d in self.remedial_account.get_documents(latest_only=False)], [second.pk, first.pk]
+        )
+
+        services.DocumentService.delete_document(second, self.user)
+        latest = selectors.document_history_for_entity(
+            self.tenant, "remedial_account", self.remedial_account.pk, latest_only=True
+        )
+        self.assertEqual([d.pk for d in latest], [first.pk])
+        self.assertEqual(self._upload(SimpleUploadedFile("v7.pdf", b"v7")).version, 7)
+
+    def test_current_documents_use_the_latest_index(self):
+        plan = selectors.document_history_for_entity(
+            self.tenant, "remedial_account", self.remedial_account.pk, latest_only=True
+        ).explain()
+        self.assertIn("remedial_document_latest_uniq", plan)
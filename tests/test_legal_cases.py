@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+
+from apps.remedial import models
+
+from .base import BaseRemedialTestCase
+
+
+class NextHearingDateMaintenanceTest(BaseRemedialTestCase):
+    def setUp(self):
+        self.legal_case = self._case("Branch 1")
+
+    def _case(self, branch):
+        return models.LegalCase.objects.create(
+            tenant=self.tenant,
+            remedial_account=self.remedial_account,
+            case_type="regular",
+            status=models.LegalCaseStatus.FILED,
+            court_name="RTC",
+            court_branch=branch,
+            created_by=self.user,
+        )
+
+    def _hearing(self, days_ahead, legal_case=None):
+        return models.CourtHearing.objects.create(
+            tenant=self.tenant,
+            legal_case=legal_case or self.legal_case,
+            hearing_date=date.today() + timedelta(days=days_ahead),
+            hearing_type="pre-trial",
+            status="scheduled",
+        )
+
+    def _next_hearing_date(self, legal_case=None):
+        legal_case = legal_case or self.legal_case
+        legal_case.refresh_from_db()
+        return legal_case.next_hearing_date
+
+    def test_create_and_reschedule_update_case(self):
+        later = self._hearing(10)
+        self.assertEqual(self._next_hearing_date(), later.hearing_date)
+
+        sooner = self._hearing(4)
+        self.assertEqual(self._next_hearing_date(), sooner.hearing_date)
+
+        sooner.hearing_date = date.today() + timedelta(days=12)
+        sooner.save()
+        self.assertEqual(self._next_hearing_date(), later.hearing_date)
+
+    def test_status_change_and_delete_advance_to_next_hearing(self):
+        first = self._hearing(3)
+        second = self._hearing(8)
+
+        first.status = "done"
+        first.save()
+        self.assertEqual(self._next_hearing_date(), second.hearing_date)
+
+        second.delete()
+        self.assertIsNone(self._next_hearing_date())
+
+    def test_moving_hearing_refreshes_both_cases(self):
+        other_case = self._case("Branch 2")
+        hearing = self._hearing(5)
+
+        hearing = models.CourtHearing.objects.get(pk=hearing.pk)
+        hearing.legal_case = other_case
+        hearing.save()
+
+        self.assertIsNone(self._next_hearing_date())
+        self.assertEqual(self._next_hearing_date(other_case), hearing.hearing_date)
@@ -0,0 +1,346 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.remedial import models
+from apps.remedial.notifications import RecipientResolver
+from apps.remedial.services import NotificationService
+from apps.tenancy.models import TenantMembership
+
+from .base import BaseRemedialTestCase, User
+
+
+class NotificationOutboxTest(BaseRemedialTestCase):
+    def setUp(self):
+        super().setUp()
+        self.rule = models.NotificationRule.objects.create(
+            tenant=self.tenant,
+            rule_code="COMPROMISE_DUE_REMINDER",
+            email_to_role="collector",
+            template_code="due",
+        )
+
+    def _queue(self, item=None, recipient="collector@example.com"):
+        item = item or self.schedule_item_due
+        return NotificationService.queue_notifications(
+            self.rule,
+            "CompromiseScheduleItem",
+            [(self.tenant.pk, item.pk, recipient, "Payment due")],
+        )
+
+    def test_queue_is_idempotent_per_rule_entity_recipient_and_day(self):
+        self._queue()
+        self._queue()
+        self._queue(recipient="manager@example.com")
+
+        self.assertEqual(models.NotificationOutbox.objects.count(), 2)
+
+    def test_delivery_sends_batch_and_logs(self):
+        self._queue()
+        self._queue(recipient="manager@example.com")
+
+        output = StringIO()
+        call_command("deliver_notifications", stdout=output)
+
+        self.assertIn("sent=2", output.getvalue())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(
+            models.NotificationOutbox.objects.exclude(status=models.NotificationOutboxStatus.SENT).exists()
+        )
+        self.assertEqual(
+            models.NotificationLog.objects.filter(status=models.NotificationLogStatus.SENT).count(), 2
+        )
+
+    def test_failed_send_backs_off_then_gives_up(self):
+        self._queue()
+        now = timezone.now()
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=OSError("smtp down")
+        ), self.assertLogs("apps.remedial.services", level="ERROR"):
+            counts = NotificationService.deliver_pending_notifications(now=now)
+            self.assertEqual(counts["retried"], 1)
+            entry = models.NotificationOutbox.objects.get()
+            self.assertEqual(entry.status, models.NotificationOutboxStatus.PENDING)
+            self.assertEqual(entry.next_attempt_at, now + NotificationService.RETRY_BACKOFF)
+            self.assertEqual(NotificationService.deliver_pending_notifications(now=now)["sent"], 0)
+
+            for _ in range(1, NotificationService.MAX_DELIVERY_ATTEMPTS):
+                now += timedelta(days=1)
+                NotificationService.deliver_pending_notifications(now=now)
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, models.NotificationOutboxStatus.FAILED)
+        self.assertEqual(entry.attempts, NotificationService.MAX_DELIVERY_ATTEMPTS)
+        self.assertEqual(
+            models.NotificationLog.objects.get().status, models.NotificationLogStatus.FAILED
+        )
+
+    def test_unreachable_mail_server_backs_off_the_batch(self):
+        self._queue()
+        self._queue(recipient="manager@example.com")
+        now = timezone.now()
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.open", side_effect=ConnectionRefusedError("no smtp")
+        ), self.assertLogs("apps.remedial.services", level="ERROR"):
+            counts = NotificationService.deliver_pending_notifications(now=now)
+
+        self.assertEqual(counts, {"sent": 0, "retried": 2, "failed": 0})
+        for entry in models.NotificationOutbox.objects.all():
+            self.assertEqual(entry.status, models.NotificationOutboxStatus.PENDING)
+            self.assertEqual(entry.attempts, 1)
+            self.assertEqual(entry.next_attempt_at, now + NotificationService.RETRY_BACKOFF)
+            self.assertEqual(entry.last_error, "no smtp")
+
+    def test_entries_are_claimed_before_sending(self):
+        self._queue()
+        statuses = []
+
+        def send_messages(messages):
+            statuses.append(models.NotificationOutbox.objects.get().status)
+            return len(messages)
+
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=send_messages):
+            counts = NotificationService.deliver_pending_notifications()
+
+        self.assertEqual(counts["sent"], 1)
+        self.assertEqual(statuses, [models.NotificationOutboxStatus.SENDING])
+        self.assertEqual(models.NotificationOutbox.objects.get().status, models.NotificationOutboxStatus.SENT)
+
+    def test_abandoned_claim_is_retried_after_the_lease(self):
+        self._queue()
+        now = timezone.now()
+        models.NotificationOutbox.objects.update(
+            status=models.NotificationOutboxStatus.SENDING, attempts=1, next_attempt_at=now + timedelta(minutes=5)
+        )
+
+        self.assertEqual(NotificationService.deliver_pending_notifications(now=now)["sent"], 0)
+        counts = NotificationService.deliver_pending_notifications(now=now + NotificationService.SEND_LEASE)
+
+        self.assertEqual(counts["sent"], 1)
+        entry = models.NotificationOutbox.objects.get()
+        self.assertEqual(entry.status, models.NotificationOutboxStatus.SENT)
+        self.assertEqual(entry.attempts, 2)
+
+    def test_scan_command_queues_instead_of_sending(self):
+        self.rule.days_before = 3
+        self.rule.save()
+        self.schedule_item_due.due_date = timezone.now().date() + timedelta(days=3)
+        self.schedule_item_due.save()
+
+        call_command("scan_compromise_due_reminders", stdout=StringIO())
+
+        self.assertEqual(models.NotificationOutbox.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(models.NotificationLog.objects.exists())
+
+
+class RecipientResolverTest(BaseRemedialTestCase):
+    def setUp(self):
+        super().setUp()
+        self.counsel = Group.objects.create(name="counsel")
+        self.user.email = "officer@example.com"
+        self.user.save()
+        self.user.groups.add(self.counsel)
+        TenantMembership.objects.create(tenant=self.tenant, user=self.user)
+        self.other_user.email = "inactive@example.com"
+        self.other_user.is_active = False
+        self.other_user.save()
+        self.other_user.groups.add(self.counsel)
+        TenantMembership.objects.create(tenant=self.tenant, user=self.other_user)
+        self.rule = models.NotificationRule.objects.create(
+            tenant=self.tenant,
+            rule_code="HEARING_REMINDER",
+            email_to_role="counsel",
+            template_code="hearing",
+        )
+        models.NotificationRule.objects.create(
+            rule_code="COMPROMISE_DUE_REMINDER",
+            email_to_role="collections",
+            template_code="due",
+        )
+
+    def test_resolves_roles_in_two_queries_and_scopes_by_tenant(self):
+        resolver = RecipientResolver(use_cache=False)
+
+        with self.assertNumQueries(2):
+            self.assertEqual(resolver.recipients("HEARING_REMINDER", self.tenant.pk), ("officer@example.com",))
+            self.assertEqual(
+                resolver.recipients("COMPROMISE_DUE_REMINDER", self.other_tenant.pk),
+                ("collections@example.com",),
+            )
+            self.assertIsNone(resolver.get("HEARING_REMINDER", self.other_tenant.pk))
+
+    def test_cache_is_shared_across_runs_until_rule_changes(self):
+        RecipientResolver().snapshot
+
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(RecipientResolver().find("HEARING_REMINDER"))
+
+        self.rule.status = models.NotificationRuleStatus.DISABLED
+        self.rule.save()
+
+        self.assertIsNone(RecipientResolver().find("HEARING_REMINDER"))
+
+    def test_role_recipients_are_members_of_the_notified_tenant(self):
+        beta_counsel = User.objects.create_user(username="beta_counsel", email="counsel@beta.example.com")
+        beta_counsel.groups.add(self.counsel)
+        TenantMembership.objects.create(tenant=self.other_tenant, user=beta_counsel)
+        models.NotificationRule.objects.create(
+            rule_code="DEFAULT_NOTICE",
+            email_to_role="counsel",
+            template_code="default",
+        )
+        resolver = RecipientResolver(use_cache=False)
+
+        self.assertEqual(resolver.recipients("HEARING_REMINDER", self.tenant.pk), ("officer@example.com",))
+        self.assertEqual(resolver.recipients("DEFAULT_NOTICE", self.tenant.pk), ("officer@example.com",))
+        self.assertEqual(
+            resolver.recipients("DEFAULT_NOTICE", self.other_tenant.pk), ("counsel@beta.example.com",)
+        )
+
+
+class DigestNotificationTest(BaseRemedialTestCase):
+    def setUp(self):
+        super().setUp()
+        models.NotificationRule.objects.create(
+            tenant=self.tenant,
+            rule_code="COMPROMISE_DUE_REMINDER",
+            days_before=3,
+            email_to_role="collector",
+            template_code="due",
+            delivery_mode=models.NotificationDeliveryMode.DIGEST,
+        )
+        due_date = timezone.now().date() + timedelta(days=3)
+        self.items = [
+            models.CompromiseScheduleItem.objects.create(
+                tenant=self.tenant,
+                compromise_agreement=self.compromise,
+                seq_no=10 + index,
+                due_date=due_date,
+                amount_due=Decimal("100.00"),
+            )
+            for index in range(3)
+        ]
+
+    def test_batches_collect_into_one_message_per_recipient(self):
+        call_command("scan_compromise_due_reminders", "--batch-size", "1", stdout=StringIO())
+
+        entry = models.NotificationOutbox.objects.get()
+        self.assertEqual(entry.status, models.NotificationOutboxStatus.PENDING)
+        self.assertEqual(entry.entity_ids, [str(item.pk) for item in self.items])
+        self.assertIn("Loan Account | Due Date | Amount Due", entry.message)
+        self.assertEqual(entry.message.count("LN-0001"), 3)
+
+        call_command("deliver_notifications", stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("3 CompromiseScheduleItem notifications", mail.outbox[0].subject)
+        log = models.NotificationLog.objects.get()
+        self.assertIsNone(log.entity_id)
+        self.assertEqual(len(log.entity_ids), 3)
+
+    def test_same_day_rerun_adds_nothing(self):
+        call_command("scan_compromise_due_reminders", stdout=StringIO())
+        call_command("deliver_notifications", stdout=StringIO())
+        call_command("scan_compromise_due_reminders", stdout=StringIO())
+
+        self.assertEqual(models.NotificationOutbox.objects.count(), 1)
+        self.assertFalse(
+            models.NotificationOutbox.objects.exclude(status=models.NotificationOutboxStatus.SENT).exists()
+        )
+
+
+    def test_items_found_after_release_open_the_next_digest(self):
+        call_command("scan_compromise_due_reminders", stdout=StringIO())
+        call_command("deliver_notifications", stdout=StringIO())
+        late_item = models.CompromiseScheduleItem.objects.create(
+            tenant=self.tenant,
+            compromise_agreement=self.compromise,
+            seq_no=20,
+            due_date=self.items[0].due_date,
+            amount_due=Decimal("100.00"),
+        )
+
+        output = StringIO()
+        call_command("scan_compromise_due_reminders", stdout=output)
+
+        self.assertIn("reminded=1", output.getvalue())
+        first, second = models.NotificationOutbox.objects.order_by("created_at", "pk")
+        self.assertEqual(first.status, models.NotificationOutboxStatus.SENT)
+        self.assertEqual(second.status, models.NotificationOutboxStatus.PENDING)
+        self.assertEqual(second.entity_ids, [str(late_item.pk)])
+        late_item.refresh_from_db()
+        self.assertIsNotNone(late_item.last_reminder_sent_at)
+
+
+    def test_digest_opened_concurrently_is_appended_to(self):
+        rule = models.NotificationRule.objects.get(rule_code="COMPROMISE_DUE_REMINDER")
+        first, second = self.items[:2]
+        NotificationService.queue_notifications(
+            rule, "CompromiseScheduleItem", [(self.tenant.pk, first.pk, "a@example.com", "due")]
+        )
+        # The lookup misses the digest another shard committed meanwhile.
+        real_select = models.NotificationOutbox.objects.select_for_update
+        with mock.patch.object(
+            models.NotificationOutbox.objects,
+            "select_for_update",
+            side_effect=[models.NotificationOutbox.objects.none(), real_select(), real_select()],
+        ):
+            queued = NotificationService.queue_notifications(
+                rule, "CompromiseScheduleItem", [(self.tenant.pk, second.pk, "a@example.com", "due")]
+            )
+
+        self.assertEqual(queued, {second.pk})
+        entry = models.NotificationOutbox.objects.get()
+        self.assertEqual(entry.entity_ids, [str(first.pk), str(second.pk)])
+
+
+class ReminderDeduplicationTest(BaseRemedialTestCase):
+    def setUp(self):
+        super().setUp()
+        models.NotificationRule.objects.create(
+            tenant=self.tenant,
+            rule_code="COMPROMISE_DUE_REMINDER",
+            days_before=3,
+            email_to_role="collector",
+            template_code="due",
+        )
+        self.schedule_item_due.due_date = timezone.now().date() + timedelta(days=3)
+        self.schedule_item_due.save()
+
+    def _scan(self):
+        output = StringIO()
+        call_command("scan_compromise_due_reminders", stdout=output)
+        return output.getvalue()
+
+    def test_rerun_skips_queued_and_delivered_reminders(self):
+        self.assertIn("reminded=1", self._scan())
+        self.assertIn("skipped_duplicate=1", self._scan())
+
+        call_command("deliver_notifications", stdout=StringIO())
+        # A later day's idempotency key differs; the delivery log still counts.
+        models.NotificationOutbox.objects.all().delete()
+
+        self.assertIn("skipped_duplicate=1", self._scan())
+        self.assertFalse(models.NotificationOutbox.objects.exists())
+
+    def test_lookup_is_one_query_per_batch(self):
+        items = [self.schedule_item_due, self.schedule_item_paid]
+
+        with self.assertNumQueries(1):
+            notified = NotificationService.already_notified(
+                "COMPROMISE_DUE_REMINDER",
+                "CompromiseScheduleItem",
+                [item.pk for item in items],
+                timezone.now() - timedelta(days=3),
+            )
+
+        self.assertEqual(notified, set())
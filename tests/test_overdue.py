@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from apps.core.models import AuditLog
+from apps.remedial import models
+from apps.remedial.services import ScheduleItemService
+
+from .base import BaseRemedialTestCase
+
+
+class OverdueEngineTest(BaseRemedialTestCase):
+    def setUp(self):
+        self.compromise.status = models.CompromiseStatus.ACTIVE
+        self.compromise.save()
+
+    def _item(self, seq_no, days_ago, **kwargs):
+        return models.CompromiseScheduleItem.objects.create(
+            tenant=self.tenant,
+            compromise_agreement=self.compromise,
+            seq_no=seq_no,
+            due_date=date.today() - timedelta(days=days_ago),
+            amount_due=Decimal("100.00"),
+            **kwargs,
+        )
+
+    def test_marks_items_past_grace_overdue(self):
+        within_grace = self._item(10, 2)
+        past_grace = self._item(11, 5)
+        paid_up = self._item(12, 5, amount_paid=Decimal("100.00"))
+
+        counts = ScheduleItemService.mark_overdue_schedule_items()
+
+        self.assertEqual(counts, {self.tenant.pk: {"overdue": 1, "defaulted": 0}})
+        within_grace.refresh_from_db()
+        past_grace.refresh_from_db()
+        paid_up.refresh_from_db()
+        self.assertEqual(within_grace.status, models.ScheduleStatus.DUE)
+        self.assertEqual(past_grace.status, models.ScheduleStatus.OVERDUE)
+        self.assertEqual(paid_up.status, models.ScheduleStatus.DUE)
+        entry = AuditLog.objects.get(entity_type="CompromiseScheduleItem", entity_id=str(past_grace.pk))
+        self.assertEqual(entry.before_json, {"status": models.ScheduleStatus.DUE})
+        self.assertEqual(entry.after_json, {"status": models.ScheduleStatus.OVERDUE})
+
+    def test_defaults_agreement_past_threshold(self):
+        self._item(10, 31, status=models.ScheduleStatus.OVERDUE)
+
+        counts = ScheduleItemService.mark_overdue_schedule_items()
+
+        self.assertEqual(counts[self.tenant.pk]["defaulted"], 1)
+        self.compromise.refresh_from_db()
+        self.assertEqual(self.compromise.status, models.CompromiseStatus.DEFAULTED)
+
+    def test_default_waits_for_the_grace_period(self):
+        self.compromise.grace_days = 10
+        self.compromise.default_threshold_days = 5
+        self.compromise.save()
+        item = self._item(10, 7)
+
+        self.assertEqual(ScheduleItemService.mark_overdue_schedule_items(), {})
+        self.compromise.refresh_from_db()
+        self.assertEqual(self.compromise.status, models.CompromiseStatus.ACTIVE)
+
+        counts = ScheduleItemService.mark_overdue_schedule_items(today=item.due_date + timedelta(days=11))
+        self.assertEqual(counts, {self.tenant.pk: {"overdue": 1, "defaulted": 1}})
+
+    def test_scan_is_idempotent(self):
+        self._item(10, 40)
+
+        ScheduleItemService.mark_overdue_schedule_items()
+        audit_count = AuditLog.objects.count()
+
+        self.assertEqual(ScheduleItemService.mark_overdue_schedule_items(), {})
+        self.assertEqual(AuditLog.objects.count(), audit_count)
+
+    def test_respects_queryset_scope(self):
+        item = self._item(10, 5)
+
+        ScheduleItemService.mark_overdue_schedule_items(
+            models.CompromiseScheduleItem.objects.exclude(pk=item.pk)
+        )
+
+        item.refresh_from_db()
+        self.assertEqual(item.status, models.ScheduleStatus.DUE)
+
+    def test_processes_every_row_across_chunks(self):
+        items = [self._item(10 + n, 5 + n) for n in range(5)]
+
+        counts = ScheduleItemService.mark_overdue_schedule_items(chunk_size=2)
+
+        self.assertEqual(counts, {self.tenant.pk: {"overdue": 5, "defaulted": 0}})
+        self.assertEqual(
+            models.CompromiseScheduleItem.objects.filter(
+                pk__in=[item.pk for item in items], status=models.ScheduleStatus.OVERDUE
+            ).count(),
+            5,
+        )
+        self.assertEqual(AuditLog.objects.filter(entity_type="CompromiseScheduleItem").count(), 5)
@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.http import Http404
+from django.test import RequestFactory
+from django.utils import timezone
+from django_htmx.middleware import HtmxDetails
+
+from apps.remedial import models
+from apps.remedial.views import CompromiseListView, WriteOffRequestListView
+
+from .base import BaseRemedialTestCase
+
+
+class CursorPaginationTest(BaseRemedialTestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+        created_at = timezone.now()
+        for n in range(24):
+            agreement = models.CompromiseAgreement.objects.create(
+                tenant=self.tenant,
+                remedial_account=self.remedial_account,
+                agreement_no=f"AG-P{n:03d}",
+                settlement_amount=Decimal("100.00"),
+                created_by=self.user,
+            )
+            # Half the rows share a timestamp so page boundaries fall on ties.
+            models.CompromiseAgreement.objects.filter(pk=agreement.pk).update(
+                created_at=created_at - timedelta(minutes=n // 2)
+            )
+
+    def _get(self, view, params=None, htmx=False):
+        headers = {"HX-Request": "true"} if htmx else {}
+        request = self.factory.get("/remedial/compromises/", params or {}, headers=headers)
+        request.user = self.user
+        request.tenant = self.tenant
+        request.htmx = HtmxDetails(request)
+        response = view.as_view()(request)
+        response.render()
+        return response
+
+    def test_pages_cover_every_row_once_in_order(self):
+        seen, cursor = [], None
+        while True:
+            response = self._get(CompromiseListView, {"cursor": cursor} if cursor else None)
+            page = response.context_data["page_obj"]
+            seen.extend(agreement.pk for agreement in page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+
+        expected = list(
+            models.CompromiseAgreement.objects.filter(tenant=self.tenant)
+            .order_by("-created_at", "-pk")
+            .values_list("pk", flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_htmx_request_renders_rows_with_load_more(self):
+        response = self._get(CompromiseListView, htmx=True)
+
+        content = response.content.decode()
+        self.assertEqual(response.template_name, ["remedial/partials/compromise_rows.html"])
+        self.assertNotIn("<table", content)
+        self.assertIn('id="load-more-row"', content)
+        self.assertIn("hx-get=", content)
+
+    def test_invalid_cursor_is_not_found(self):
+        with self.assertRaises(Http404):
+            self._get(CompromiseListView, {"cursor": "not-a-cursor"})
+
+    def test_nullable_ordering_pages_through_nulls(self):
+        for n in range(25):
+            models.WriteOffRequest.objects.create(
+                tenant=self.tenant,
+                remedial_account=self.remedial_account,
+                recommended_by=self.user,
+                board_decision_date=date(2024, 1, 1) + timedelta(days=n) if n % 3 else None,
+            )
+
+        seen, cursor = [], None
+        while True:
+            response = self._get(WriteOffRequestListView, {"cursor": cursor} if cursor else None)
+            page = response.context_data["page_obj"]
+            seen.extend(writeoff.pk for writeoff in page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.remedial import models, selectors
+from apps.remedial.services import PortfolioSummaryService, ScheduleItemService
+
+from .base import BaseRemedialTestCase
+
+
+class PortfolioSummaryTest(BaseRemedialTestCase):
+    def _snapshot(self):
+        return {
+            "accounts": list(selectors.report_accounts_by_stage(self.tenant)),
+            "compromises": list(selectors.report_compromise_performance(self.tenant)),
+            "payments": list(selectors.report_payments_summary(self.tenant)),
+            "summary": selectors.summary_statistics(self.tenant),
+        }
+
+    def test_incremental_updates_match_full_rebuild(self):
+        self.compromise.status = models.CompromiseStatus.ACTIVE
+        self.compromise.save()
+        self.schedule_item_due.status = models.ScheduleStatus.PAID
+        self.schedule_item_due.save()
+        models.CompromisePayment.objects.create(
+            tenant=self.tenant,
+            compromise_agreement=self.compromise,
+            amount=Decimal("100.00"),
+            received_by=self.user,
+        )
+        self.remedial_account.stage = models.RemedialStage.COMPROMISE
+        self.remedial_account.save()
+
+        incremental = self._snapshot()
+        call_command("rebuild_portfolio_summary", stdout=StringIO())
+
+        self.assertEqual(self._snapshot(), incremental)
+        self.assertEqual(incremental["summary"]["active_compromises"], 1)
+        self.assertEqual(incremental["summary"]["total_settlement"], Decimal("1500.00"))
+        self.assertEqual(
+            [(row["stage"], row["count"]) for row in incremental["accounts"]],
+            [(models.RemedialStage.COMPROMISE, 1)],
+        )
+        [compromise_row] = incremental["compromises"]
+        self.assertEqual(compromise_row["total_paid"], Decimal("350.00"))
+        self.assertEqual(compromise_row["completion_rate"], 1.0)
+
+    def test_status_changes_move_payments_and_deletes_remove_figures(self):
+        self.compromise.status = models.CompromiseStatus.ACTIVE
+        self.compromise.save()
+        models.CompromiseScheduleItem.objects.create(
+            tenant=self.tenant,
+            compromise_agreement=self.compromise,
+            seq_no=3,
+            due_date=date(2020, 1, 1),
+            amount_due=Decimal("100.00"),
+        )
+
+        ScheduleItemService.mark_overdue_schedule_items()
+
+        [payments] = selectors.report_payments_summary(self.tenant)
+        self.assertEqual(payments["compromise_agreement__status"], models.CompromiseStatus.DEFAULTED)
+        self.assertEqual(payments["total_amount"], Decimal("250.00"))
+
+        self.compromise.delete()
+
+        self.assertEqual(self._snapshot()["compromises"], [])
+        self.assertEqual(self._snapshot()["payments"], [])
+
+    def test_each_grain_has_a_single_row(self):
+        grain = models.PortfolioSummary.objects.filter(
+            tenant=self.tenant, metric=models.PortfolioMetric.COMPROMISES, day=None
+        )
+        [row] = grain.all()
+        for day in (None, timezone.localdate()):
+            models.PortfolioSummary.objects.get_or_create(
+                tenant=self.tenant, metric=row.metric, day=day, stage=row.stage, status=row.status
+            )
+            with self.subTest(day=day), self.assertRaises(IntegrityError), transaction.atomic():
+                models.PortfolioSummary.objects.create(
+                    tenant=self.tenant, metric=row.metric, day=day, stage=row.stage, status=row.status
+                )
+
+        PortfolioSummaryService.apply([((self.tenant.pk, row.metric, None, row.stage, row.status), {"count": 2})])
+
+        self.assertEqual([summary.count for summary in grain.all()], [row.count + 2])
+
+    def test_date_bounds_read_summary_and_datetime_bounds_read_raw_tables(self):
+        today = timezone.localdate()
+        self.assertEqual(self._count_accounts(start_date=today, end_date=today), 1)
+        self.assertEqual(self._count_accounts(end_date=today - timedelta(days=1)), 0)
+
+        models.PortfolioSummary.objects.all().delete()
+        self.assertEqual(self._count_accounts(end_date=today), 0)
+        self.assertEqual(self._count_accounts(end_date=timezone.now()), 1)
+
+    def _count_accounts(self, **bounds):
+        return sum(row["count"] for row in selectors.report_accounts_by_stage(self.tenant, **bounds))
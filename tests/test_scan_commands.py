@@ -0,0 +1,230 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.remedial import models
+from apps.remedial.management.workers import ScanPartition
+
+from .base import BaseRemedialTestCase
+
+
+class ChunkedScanCommandTest(BaseRemedialTestCase):
+    def setUp(self):
+        action = models.RecoveryAction.objects.create(
+            tenant=self.tenant,
+            remedial_account=self.remedial_account,
+            action_type=models.RecoveryActionType.FORECLOSURE,
+        )
+        self.milestones = [
+            models.RecoveryMilestone.objects.create(
+                tenant=self.tenant,
+                recovery_action=action,
+                milestone_type=f"step-{index}",
+                target_date=date.today() - timedelta(days=1),
+            )
+            for index in range(5)
+        ]
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command("scan_recovery_milestones_overdue", *args, stdout=out)
+        return out.getvalue()
+
+    def test_processes_all_rows_in_batches(self):
+        output = self._run("--batch-size", "2")
+
+        self.assertIn("escalated=5", output)
+        self.assertFalse(models.RecoveryMilestone.objects.filter(status="pending").exists())
+        checkpoint = models.ScanCheckpoint.objects.get(
+            command="scan_recovery_milestones_overdue", tenant=self.tenant
+        )
+        self.assertEqual(checkpoint.processed_count, 5)
+        self.assertIsNotNone(checkpoint.completed_at)
+        self.assertEqual(checkpoint.last_pk, "")
+
+    def test_resumes_after_last_committed_batch(self):
+        models.ScanCheckpoint.objects.create(
+            command="scan_recovery_milestones_overdue",
+            tenant=self.tenant,
+            run_key=date.today().isoformat(),
+            last_pk=str(self.milestones[2].pk),
+            processed_count=3,
+        )
+
+        output = self._run()
+
+        self.assertIn("Resuming", output)
+        statuses = [m.status for m in models.RecoveryMilestone.objects.order_by("pk")]
+        self.assertEqual(statuses, ["pending"] * 3 + ["overdue"] * 2)
+
+    def test_checkpoint_from_an_earlier_day_is_not_resumed(self):
+        models.ScanCheckpoint.objects.create(
+            command="scan_recovery_milestones_overdue",
+            tenant=self.tenant,
+            run_key=(date.today() - timedelta(days=1)).isoformat(),
+            last_pk=str(self.milestones[-1].pk),
+            processed_count=5,
+        )
+
+        output = self._run()
+
+        self.assertNotIn("Resuming", output)
+        self.assertIn("escalated=5", output)
+        checkpoint = models.ScanCheckpoint.objects.get(
+            command="scan_recovery_milestones_overdue", tenant=self.tenant
+        )
+        self.assertEqual(checkpoint.run_key, date.today().isoformat())
+        self.assertEqual(checkpoint.processed_count, 5)
+
+    def test_restart_ignores_checkpoint(self):
+        models.ScanCheckpoint.objects.create(
+            command="scan_recovery_milestones_overdue",
+            tenant=self.tenant,
+            last_pk=str(self.milestones[2].pk),
+        )
+
+        self._run("--restart")
+
+        self.assertFalse(models.RecoveryMilestone.objects.filter(status="pending").exists())
+
+    def test_sharded_scan_covers_every_row_once(self):
+        output = self._run("--shards", "3", "--batch-size", "1")
+
+        self.assertIn("escalated=5", output)
+        self.assertEqual(
+            models.ScanCheckpoint.objects.filter(
+                command="scan_recovery_milestones_overdue", tenant=self.tenant
+            ).count(),
+            3,
+        )
+
+    def test_workers_fall_back_to_serial_without_postgresql(self):
+        output = self._run("--workers", "2", "--shards", "2")
+
+        self.assertIn("--workers needs PostgreSQL", output)
+        self.assertIn("escalated=5", output)
+
+    def test_partition_lock_keys_are_distinct_int4(self):
+        partitions = [
+            ScanPartition(tenant_id, shard, 4, "")
+            for tenant_id in (None, self.tenant.pk, self.other_tenant.pk)
+            for shard in range(4)
+        ]
+        keys = {partition.lock_key for partition in partitions}
+        self.assertEqual(len(keys), len(partitions))
+        self.assertTrue(all(-(2 ** 31) <= key < 2 ** 31 for key in keys))
+
+
+class RollupNextHearingDateTest(BaseRemedialTestCase):
+    def setUp(self):
+        super().setUp()
+        self.legal_case = models.LegalCase.objects.create(
+            tenant=self.tenant,
+            remedial_account=self.remedial_account,
+            case_type="regular",
+            status=models.LegalCaseStatus.FILED,
+            court_name="RTC",
+            court_branch="Branch 1",
+            next_hearing_date=date.today() - timedelta(days=3),
+            created_by=self.user,
+        )
+        models.NotificationRule.objects.create(
+            tenant=self.tenant,
+            rule_code="HEARING_REMINDER",
+            email_to_role="counsel",
+            template_code="hearing",
+        )
+
+    def _hearing(self, days_ahead, status="scheduled"):
+        return models.CourtHearing.objects.create(
+            tenant=self.tenant,
+            legal_case=self.legal_case,
+            hearing_date=date.today() + timedelta(days=days_ahead),
+            hearing_type="pre-trial",
+            status=status,
+        )
+
+    def test_rolls_up_earliest_scheduled_hearing_and_reminds(self):
+        self._hearing(-1)
+        self._hearing(2, status="cancelled")
+        upcoming = self._hearing(5)
+        self._hearing(20)
+        # Simulate drift the hearing signals could not see.
+        models.LegalCase.objects.filter(pk=self.legal_case.pk).update(next_hearing_date=date.today())
+
+        output = StringIO()
+        call_command("rollup_next_hearing_date", stdout=output)
+
+        self.assertIn("reminded=1, scanned=1, updated=1", output.getvalue())
+        self.legal_case.refresh_from_db()
+        upcoming.refresh_from_db()
+        self.assertEqual(self.legal_case.next_hearing_date, upcoming.hearing_date)
+        self.assertIsNotNone(upcoming.reminder_sent_at)
+        self.assertTrue(
+            models.NotificationOutbox.objects.filter(entity_id=upcoming.pk, sent_to="counsel@example.com").exists()
+        )
+
+        call_command("rollup_next_hearing_date", stdout=StringIO())
+        self.assertEqual(models.NotificationOutbox.objects.count(), 1)
+
+    def test_repair_pass_skips_cases_outside_the_window(self):
+        models.LegalCase.objects.filter(pk=self.legal_case.pk).update(
+            next_hearing_date=date.today() + timedelta(days=30)
+        )
+
+        call_command("rollup_next_hearing_date", stdout=StringIO())
+        self.legal_case.refresh_from_db()
+        self.assertIsNotNone(self.legal_case.next_hearing_date)
+
+        call_command("rollup_next_hearing_date", "--full", stdout=StringIO())
+        self.legal_case.refresh_from_db()
+        self.assertIsNone(self.legal_case.next_hearing_date)
+
+    def test_repair_pass_fills_missing_dates_of_scheduled_cases(self):
+        hearing = self._hearing(60)
+        models.LegalCase.objects.filter(pk=self.legal_case.pk).update(next_hearing_date=None)
+
+        call_command("rollup_next_hearing_date", stdout=StringIO())
+
+        self.legal_case.refresh_from_db()
+        self.assertEqual(self.legal_case.next_hearing_date, hearing.hearing_date)
+
+    def test_clears_date_when_no_hearing_is_scheduled(self):
+        call_command("rollup_next_hearing_date", stdout=StringIO())
+
+        self.legal_case.refresh_from_db()
+        self.assertIsNone(self.legal_case.next_hearing_date)
+
+    def test_query_count_does_not_grow_with_cases(self):
+        def run():
+            with CaptureQueriesContext(connection) as queries:
+                call_command("rollup_next_hearing_date", "--batch-size", "100", stdout=StringIO())
+            return len(queries)
+
+        run()
+        self._hearing(3)
+        single_case_queries = run()
+
+        for index in range(5):
+            case = models.LegalCase.objects.create(
+                tenant=self.tenant,
+                remedial_account=self.remedial_account,
+                case_type="regular",
+                status=models.LegalCaseStatus.ACTIVE,
+                court_name="RTC",
+                court_branch=f"Branch {index}",
+                created_by=self.user,
+            )
+            models.CourtHearing.objects.create(
+                tenant=self.tenant,
+                legal_case=case,
+                hearing_date=date.today() + timedelta(days=3),
+                hearing_type="pre-trial",
+                status="scheduled",
+            )
+
+        self.assertEqual(run(), single_case_queries)
+        self.assertEqual(models.NotificationOutbox.objects.count(), 6)
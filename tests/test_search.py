@@ -0,0 +1,152 @@
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.remedial import models, search, selectors
+from apps.remedial.forms import RemedialAccountSearchForm
+from apps.remedial.views import AccountSearchView, officer_options, search_typeahead
+
+from .base import BaseRemedialTestCase
+
+
+class AccountSearchTest(BaseRemedialTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_borrower = models.RemedialAccount.objects.create(
+            tenant=cls.tenant, loan_account_no="LN-9100", borrower_name="Mark Janssen"
+        )
+
+    def _search(self, query, tenant=None):
+        queryset = search.filter_queryset(models.RemedialAccount.objects.all(), query, tenant or self.tenant)
+        return set(queryset.values_list("loan_account_no", flat=True))
+
+    def test_loan_number_prefix_and_borrower_word_prefix(self):
+        self.assertEqual(self._search("LN-00"), {"LN-0001"})
+        self.assertEqual(self._search("ln-9"), {"LN-9100"})
+        self.assertEqual(self._search("jan"), {"LN-0001", "LN-9100"})
+        self.assertEqual(self._search("jane borr"), {"LN-0001"})
+
+    def test_results_are_scoped_to_tenant(self):
+        self.assertEqual(self._search("LN-0002"), set())
+        self.assertEqual(self._search("LN-0002", tenant=self.other_tenant), {"LN-0002"})
+
+    def test_index_follows_updates_and_deletes(self):
+        self.other_borrower.borrower_name = "Maria Santos"
+        self.other_borrower.save()
+        self.assertEqual(self._search("santos"), {"LN-9100"})
+        self.assertEqual(self._search("janssen"), set())
+
+        self.other_borrower.delete()
+        self.assertEqual(self._search("santos"), set())
+
+    def test_typeahead_ranks_reference_matches_across_entities(self):
+        models.LegalCase.objects.create(
+            tenant=self.tenant,
+            remedial_account=self.remedial_account,
+            case_type="regular",
+            case_number="LN-CASE-1",
+            court_name="RTC",
+            court_branch="Branch 1",
+            created_by=self.user,
+        )
+        hits = search.typeahead(self.tenant, "LN-")
+        self.assertEqual(
+            {(hit.entity_type, hit.reference) for hit in hits},
+            {("remedial_account", "LN-0001"), ("remedial_account", "LN-9100"), ("legal_case", "LN-CASE-1")},
+        )
+        self.assertEqual(search.typeahead(self.tenant, "A"), [])
+
+        hit = search.typeahead(self.tenant, "AG-0", entity_types=["compromise_agreement"])[0]
+        self.assertEqual(hit.pk, self.compromise.pk)
+
+    def test_typeahead_view_renders_links(self):
+        request = RequestFactory().get("/remedial/search/typeahead/", {"q": "LN-00"})
+        request.user = self.user
+        request.tenant = self.tenant
+        response = search_typeahead(request)
+        self.assertContains(response, reverse("remedial:account-detail", args=[self.remedial_account.pk]))
+
+    def test_typeahead_requires_login(self):
+        response = self.client.get(reverse("remedial:search-typeahead"), {"q": "LN-00"})
+        self.assertEqual(response.status_code, 302)
+
+    def test_post_migrate_restores_dropped_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER remedial_search_remedial_account_ai")
+        search.ensure_sqlite_triggers(using="default")
+
+        models.RemedialAccount.objects.create(tenant=self.tenant, loan_account_no="LN-7777", borrower_name="New")
+        self.assertEqual(self._search("LN-77"), {"LN-7777"})
+
+
+class AccountSearchViewTest(BaseRemedialTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.litigation = models.RemedialAccount.objects.create(
+            tenant=cls.tenant,
+            loan_account_no="LN-5000",
+            borrower_name="Pedro Litigant",
+            stage=models.RemedialStage.LEGAL,
+            assigned_officer=cls.other_user,
+        )
+        models.RemedialAccount.objects.filter(pk=cls.other_account.pk).update(assigned_officer=cls.user)
+
+    def _get(self, view, params):
+        request = RequestFactory().get("/remedial/accounts/search/", params)
+        request.user = self.user
+        request.tenant = self.tenant
+        response = view(request)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    def test_filters_by_stage_and_officer(self):
+        view = AccountSearchView.as_view()
+        response = self._get(view, {"stage": models.RemedialStage.LEGAL})
+        self.assertEqual([a.pk for a in response.context_data["accounts"]], [self.litigation.pk])
+
+        response = self._get(view, {"assigned_officer": self.user.pk, "borrower_name": "jane"})
+        self.assertEqual([a.pk for a in response.context_data["accounts"]], [self.remedial_account.pk])
+
+    def test_officer_picker_renders_lazily(self):
+        form = RemedialAccountSearchForm(tenant=self.tenant)
+        with CaptureQueriesContext(connection) as queries:
+            html = str(form["assigned_officer"])
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(html.count("<option"), 1)
+        self.assertIn(reverse("remedial:officer-options"), html)
+
+    def test_officer_options_are_tenant_scoped(self):
+        response = self._get(officer_options, {})
+        names = {self.user.username, self.other_user.username}
+        self.assertEqual({name for name in names if name in response.content.decode()}, names)
+
+        response = self._get(officer_options, {"selected": self.other_user.pk})
+        self.assertContains(response, f'value="{self.other_user.pk}" selected')
+
+        request = RequestFactory().get("/")
+        request.user = self.user
+        request.tenant = self.other_tenant
+        self.assertNotContains(officer_options(request), self.other_user.username)
+
+    def test_search_endpoints_require_login(self):
+        for name in ("remedial:account-search", "remedial:officer-options"):
+            with self.subTest(name=name):
+                self.assertEqual(self.client.get(reverse(name)).status_code, 302)
+
+    def test_filters_use_tenant_leading_indexes(self):
+        index_names = {
+            tuple(index.fields): index.name for index in models.RemedialAccount._meta.indexes
+        }
+        plan = selectors.search_remedial_accounts(
+            self.tenant, stage=models.RemedialStage.LEGAL, status=models.RemedialStatus.ACTIVE
+        ).explain()
+        self.assertIn(index_names[("tenant", "stage", "status", "created_at")], plan)
+
+        plan = selectors.search_remedial_accounts(
+            self.tenant, officer=self.user, stage=models.RemedialStage.PRE_LEGAL
+        ).explain()
+        self.assertIn(index_names[("tenant", "assigned_officer", "stage", "created_at")], plan)
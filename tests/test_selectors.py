@@ -1,4 +1,12 @@
-from apps.remedial import selectors
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.remedial import models, selectors
+from apps.tenancy.models import Tenant
 
 from .base import BaseRemedialTestCase
 
@@ -16,3 +24,59 @@ class TenantSelectorTest(BaseRemedialTestCase):
         self.assertEqual(other_overview["compromises_count"], 0)
         self.assertEqual(other_overview["legal_cases_count"], 0)
         self.assertEqual(other_overview["write_offs_count"], 0)
+
+    def test_overview_is_one_query_then_cached_until_a_write(self):
+        with self.assertNumQueries(1):
+            selectors.get_dashboard_overview_data(self.tenant)
+        with self.assertNumQueries(0):
+            selectors.get_dashboard_overview_data(self.tenant)
+
+        models.RecoveryAction.objects.create(
+            tenant=self.tenant,
+            remedial_account=self.remedial_account,
+            action_type=models.RecoveryActionType.FORECLOSURE,
+        )
+
+        self.assertEqual(selectors.get_dashboard_overview_data(self.tenant)["recovery_actions_count"], 1)
+        self.assertEqual(selectors.get_dashboard_overview_data(self.other_tenant)["recovery_actions_count"], 0)
+
+    def test_dashboard_metrics_include_quality_issues(self):
+        metrics = selectors.get_dashboard_metrics(self.tenant)
+
+        self.assertEqual(metrics["summary"]["total_accounts"], 1)
+        self.assertEqual(metrics["quality_issues"], [])
+
+
+class CompromiseAggregationTest(BaseRemedialTestCase):
+    def setUp(self):
+        super().setUp()
+        for _ in range(4):
+            models.CompromisePayment.objects.create(
+                tenant=self.tenant,
+                compromise_agreement=self.compromise,
+                amount=Decimal("100.00"),
+                received_by=self.user,
+            )
+
+    def test_payments_are_not_multiplied_by_schedule_items(self):
+        until = timezone.now() + timedelta(days=1)
+        self.compromise.compromise_signed_date = timezone.localdate()
+        self.compromise.save()
+
+        [performance] = selectors.report_compromise_performance(self.tenant, end_date=until)
+        [summary] = selectors.dashboard_compromise_summary(self.tenant)
+
+        # 250.00 from the base fixture plus four payments of 100.00.
+        self.assertEqual(performance["total_paid"], Decimal("650.00"))
+        self.assertEqual(performance["completion_rate"], 0.5)
+        self.assertEqual(summary["total_paid"], Decimal("650.00"))
+        self.assertEqual(summary["count"], 1)
+
+    def test_benchmark_rolls_back_seed_data(self):
+        output = StringIO()
+        call_command(
+            "benchmark_compromise_reports", "--agreements", "2", "--items", "3", "--payments", "5", stdout=output
+        )
+
+        self.assertNotIn("WRONG (got", output.getvalue().split("joined aggregate")[0])
+        self.assertFalse(Tenant.objects.filter(code__startswith="bench-").exists())
@@ -0,0 +1,107 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from apps.tenancy.config import get_tenant_config
+from apps.tenancy.forms import TenantSettingForm
+from apps.tenancy.middleware import TenantMiddleware
+from apps.tenancy.models import TenantDomain, TenantSetting, TenantStatus
+from apps.tenancy.resolver import resolver
+
+from .base import BaseRemedialTestCase
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class TenantMiddlewareTest(BaseRemedialTestCase):
+    def setUp(self):
+        super().setUp()
+        resolver.clear()
+        self.factory = RequestFactory()
+        self.middleware = TenantMiddleware(lambda request: HttpResponse(getattr(request.tenant, "code", "")))
+
+    def _resolve(self, path="/", host="testserver"):
+        return self.middleware(self.factory.get(path, HTTP_HOST=host))
+
+    def test_path_prefix_resolves_without_queries_once_warm(self):
+        self.assertEqual(self._resolve("/t/alpha/accounts/").content, b"alpha")
+        self.assertEqual(self._resolve("/t/unknown/").content, b"")
+        with self.assertNumQueries(0):
+            self.assertEqual(self._resolve("/t/alpha/accounts/").content, b"alpha")
+            self.assertEqual(self._resolve("/t/unknown/").content, b"")
+
+    def test_host_header_resolves_tenant_domain(self):
+        TenantDomain.objects.create(tenant=self.other_tenant, domain="beta.example.com")
+        self.assertEqual(self._resolve(host="BETA.example.com:8000").content, b"beta")
+        with self.assertNumQueries(0):
+            self.assertEqual(self._resolve(host="beta.example.com").content, b"beta")
+        self.assertEqual(self._resolve(host="other.example.com").content, b"")
+
+    def test_suspending_tenant_invalidates_cache(self):
+        self._resolve("/t/alpha/")
+        self.tenant.status = TenantStatus.SUSPENDED
+        self.tenant.save()
+
+        self.assertEqual(self._resolve("/t/alpha/").status_code, 403)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._resolve("/t/alpha/").status_code, 403)
+
+        self.tenant.status = TenantStatus.ACTIVE
+        self.tenant.save()
+        self.assertEqual(self._resolve("/t/alpha/").status_code, 200)
+
+    def test_domain_map_prefers_exact_then_longest_wildcard_then_primary(self):
+        TenantDomain.objects.create(tenant=self.tenant, domain="*.banks.example.com")
+        TenantDomain.objects.create(tenant=self.other_tenant, domain="*.beta.banks.example.com")
+        TenantDomain.objects.create(tenant=self.tenant, domain="beta.banks.example.com")
+        TenantDomain.objects.create(tenant=self.tenant, domain="shared.example.com")
+        TenantDomain.objects.create(tenant=self.other_tenant, domain="shared.example.com", is_primary=True)
+
+        self.assertEqual(self._resolve(host="alpha.banks.example.com").content, b"alpha")
+        self.assertEqual(self._resolve(host="portal.beta.banks.example.com").content, b"beta")
+        self.assertEqual(self._resolve(host="beta.banks.example.com").content, b"alpha")
+        self.assertEqual(self._resolve(host="shared.example.com").content, b"beta")
+        with self.assertNumQueries(0):
+            self.assertEqual(self._resolve(host="x.banks.example.com").content, b"alpha")
+            self.assertEqual(self._resolve(host="banks.example.com").content, b"")
+
+    def test_domain_changes_rebuild_map(self):
+        self.assertEqual(self._resolve(host="new.example.com").content, b"")
+        domain = TenantDomain.objects.create(tenant=self.tenant, domain="new.example.com")
+        self.assertEqual(self._resolve(host="new.example.com").content, b"alpha")
+        domain.delete()
+        self.assertEqual(self._resolve(host="new.example.com").content, b"")
+
+
+class TenantConfigTest(BaseRemedialTestCase):
+    def test_defaults_overrides_and_invalid_values(self):
+        TenantSetting.objects.create(tenant=self.tenant, key="list_page_size", value="50")
+        TenantSetting.objects.create(tenant=self.tenant, key="hearing_reminder_days", value=-1)
+        TenantSetting.objects.create(tenant=self.tenant, key="custom_flag", value={"on": True})
+
+        with self.assertLogs("apps.tenancy.config", "WARNING"):
+            config = self.tenant.config
+        self.assertEqual(config["list_page_size"], 50)
+        self.assertEqual(config.hearing_reminder_days, 7)
+        self.assertEqual(config["custom_flag"], {"on": True})
+        self.assertEqual(self.other_tenant.config["list_page_size"], 20)
+        self.assertEqual(get_tenant_config(None)["list_page_size"], 20)
+
+    def test_config_is_cached_until_a_setting_changes(self):
+        setting = TenantSetting.objects.create(tenant=self.tenant, key="list_page_size", value=30)
+        self.assertEqual(self.tenant.config["list_page_size"], 30)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.tenant.config["list_page_size"], 30)
+
+        setting.value = 40
+        setting.save()
+        self.assertEqual(self.tenant.config["list_page_size"], 40)
+        setting.delete()
+        self.assertEqual(self.tenant.config["list_page_size"], 20)
+
+    def test_setting_form_validates_registered_values(self):
+        form = TenantSettingForm(data={"key": "list_page_size", "value": "1000"})
+        self.assertFalse(form.is_valid())
+        self.assertIn("value", form.errors)
+
+        form = TenantSettingForm(data={"key": "list_page_size", "value": "25"})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["value"], 25)